@@ -1,16 +1,48 @@
+import time
+_IMPORT_STARTED = time.perf_counter()  # for the startup report in create_app()
+
 import os
-from flask import Flask, render_template, request, redirect, flash, url_for, session
+import hmac
+import math
+import threading
+from werkzeug.middleware.proxy_fix import ProxyFix
+from flask import Flask, render_template, request, redirect, flash, url_for, session, Response, make_response, current_app
 from dotenv import load_dotenv
 from datetime import datetime
-from architectural_patterns import CatRepository, UserRepository, AdminRepository
+from architectural_patterns import CatRepository, UserRepository, AdminRepository, DEFAULT_PAGE_SIZE
+from notifications import NotificationQueue, build_worker_pool_from_env
+from query_stats import query_stats
+from cache import repository_cache
+from credentials import password_hasher, build_throttle_from_env, HasherBusyError
+import page_cache
+import session_store
+from session_store import revoke_user_sessions, current_user
+import image_pipeline
+from image_pipeline import ImageValidationError
+from page_cache import cache_page
+import exports
+import dashboard_stats
+import cat_intake
+from cat_intake import IntakeError
+import application_intake
+from application_intake import WriterBusyError
 
 # Import your design patterns
 from design_patterns import (
     DatabaseConnection, 
+    DatabaseUnavailableError,
+    PoolTimeoutError,
     CatBuilder, 
+    CatGallery,
+    AgeRangeFilter,
+    StatusFilter,
+    BreedFilter,
+    VaccinationFilter,
     UserFactory,
     mock_session, 
     admin_required,
+    foster_required,
+    adopter_required,
     AdoptionSubject,
     UserNotificationObserver
 )
@@ -23,58 +55,172 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = "dont_tell_anyone_my_secret"
 
-# --- DATABASE SETUP (SINGLETON PATTERN) ---
-# We initialize the connection once. 
-# Even if we call this multiple times, it returns the same connection instance.
-db_conn = DatabaseConnection().get_connection()
-if db_conn is None:
-    raise RuntimeError("❌ CRITICAL ERROR: Could not connect to the database. Check your DATABASE_URL and logs.")
-else:
-    print("✅ Database connection established successfully.")
+# Logins are throttled per IP and username (in memory, no side effects)
+login_throttle = build_throttle_from_env()
 
 
-# Function to get available cats using the CatRepository
-def get_available_cats(db_conn):
+# ==========================================
+# APPLICATION FACTORY
+# ==========================================
+# Importing this module only defines the routes. create_app() does the
+# startup work (hooks, background workers, the hashing pool) and never waits
+# on the database: the connection pool opens connections on first use and
+# retries transient failures, so a worker boots even while the DB is down.
+# Run with:  gunicorn "app:create_app()"
+def create_app(config=None):
+    if "whiskers" in app.extensions:
+        return app  # already initialized (tests / scripts calling it twice)
+    app.config.update(config or {})
+    timings = {"imports": time.perf_counter() - _IMPORT_STARTED}
+
+    def step(name, fn):
+        started = time.perf_counter()
+        result = fn()
+        timings[name] = time.perf_counter() - started
+        return result
+
+    # --- REVERSE PROXY ---
+    # On Render/Heroku every request arrives through the platform's router, so
+    # remote_addr is the router's address. Trust the X-Forwarded-For/-Proto it
+    # appends (and only that many hops) so the login throttle sees client IPs.
+    hops = int(app.config.get("TRUSTED_PROXY_HOPS", os.environ.get("TRUSTED_PROXY_HOPS", 1)))
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # --- DATABASE SETUP (SINGLETON PATTERN) ---
+    # The pool is created once; each request checks out its own connection
+    # and returns it on teardown.
+    db = step("database", DatabaseConnection)
+    db.init_app(app)
+    if os.environ.get("DB_POOL_WARM", "").lower() in ("1", "true", "yes"):
+        # Pre-open connections without delaying startup
+        threading.Thread(target=db.warm, name="db-pool-warm", daemon=True).start()
+
+    # Server-side sessions: the cookie only holds an id, sessions can be revoked
+    step("sessions", lambda: session_store.init_app(app))
+    # Per-query timing, Server-Timing headers and the slow-query log
+    step("query_stats", lambda: query_stats.init_app(app))
+    # Cached cat cards and anonymous full-page caching (ETag / 304)
+    step("page_cache", lambda: page_cache.init_app(app))
+    # Uploaded cat photos and their thumbnails, served from /media/
+    step("image_pipeline", lambda: image_pipeline.init_app(app))
+
+    # --- CREDENTIALS ---
+    # Password hashing runs in a small process pool; start it before any
+    # background threads exist (the pool forks).
+    step("password_hasher", password_hasher.start)
+
+    # --- NOTIFICATIONS (OBSERVER PATTERN, ASYNC DELIVERY) ---
+    # Observers only enqueue emails; background workers deliver them so the
+    # admin's decision request never waits on the mail server.
+    queue = step("notification_queue", lambda: NotificationQueue(
+        os.environ.get("NOTIFICATION_DB", "notifications.db")))
+    app.extensions["notification_queue"] = queue
+    if app.config.get("START_NOTIFICATION_WORKERS", True):
+        app.extensions["notification_workers"] = step(
+            "notification_workers", lambda: build_worker_pool_from_env(queue).start())
+
+    # --- DASHBOARD COUNTERS ---
+    # Writes keep dashboard_stats current; the reconciler repairs any drift
+    # (every worker has one, but only one worker recounts per round)
+    if app.config.get("START_STATS_RECONCILER", True):
+        app.extensions["stats_reconciler"] = step(
+            "stats_reconciler", lambda: dashboard_stats.build_reconciler_from_env().start())
+
+    # --- ADOPTION APPLICATIONS ---
+    # Concurrent submissions are coalesced into batched transactions
+    if app.config.get("START_APPLICATION_WRITER", True):
+        app.extensions["application_writer"] = step(
+            "application_writer", lambda: application_intake.build_writer_from_env().start())
+
+    timings["total"] = time.perf_counter() - _IMPORT_STARTED
+    app.extensions["whiskers"] = {"startup_seconds": timings}
+    print("🚀 Startup: " + ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in timings.items()))
+    return app
+
+
+@app.errorhandler(DatabaseUnavailableError)
+@app.errorhandler(PoolTimeoutError)
+def database_unavailable(e):
+    # Transient outage or exhausted pool: tell clients (and load balancers) to retry
+    print(f"❌ {e}")
+    return "<h1>We're having trouble reaching our database. Please try again shortly.</h1>", 503, {"Retry-After": "5"}
+
+
+# Function to get one page of available cats using the CatRepository
+def get_available_cats(db_conn, after_id=None, page_size=DEFAULT_PAGE_SIZE, gallery=None):
     cat_repo = CatRepository(db_conn)
-    return cat_repo.get_available_cats()
+    return cat_repo.get_available_cats_page(after_id=after_id, page_size=page_size, gallery=gallery)
 
 
+# --- FILTERING (STRATEGY PATTERN) ---
+# Turns the gallery's query parameters into filter strategies that
+# CatRepository compiles into its WHERE clause.
+def build_gallery_filters(args):
+    gallery = CatGallery()
+    active = {}  # the filters in use, so pagination links can keep them
 
-# This route maps the root URL "/" to this function
-@app.route("/")
-def home():
-    # --- DATA CREATION (BUILDER PATTERN) ---
-    # Using the Builder Pattern to create complex Cat objects
-    
+    min_age = args.get("min_age", type=int)
+    max_age = args.get("max_age", type=int)
+    if min_age is not None or max_age is not None:
+        gallery.add_filter(AgeRangeFilter(), (min_age, max_age))
+        active.update({k: v for k, v in (("min_age", min_age), ("max_age", max_age)) if v is not None})
+
+    for param, strategy in (("status", StatusFilter()),
+                            ("breed", BreedFilter()),
+                            ("vaccination", VaccinationFilter())):
+        value = args.get(param, "").strip()
+        if value:
+            gallery.add_filter(strategy, value)
+            active[param] = value
+
+    return gallery, active
+
+
+
+# --- DATA CREATION (BUILDER PATTERN) ---
+# Using the Builder Pattern to create complex Cat objects.
+# The featured cats never change, so they are built once at startup
+# instead of on every visit to the landing page.
+def build_featured_cats():
     cat1 = (CatBuilder()
             .set_name("Mochi")
             .set_age("3 Months (Kitten)")
             .set_story("Found in a cardboard box during a storm, Mochi is a tiny survivor with a huge heart.")
             .set_status("Available")
-            .set_image("https://images.unsplash.com/photo-1591871937573-74dbba515c4c?w=600&auto=format&fit=crop&q=60&ixlib=rb-4.1.0&ixid=M3wxMjA3fDB8MHxzZWFyY2h8MTR8fGtpdHRlbnxlbnwwfHwwfHx8MA%3D%3D")
+            .set_image("https://images.unsplash.com/photo-1591871937573-74dbba515c4c?auto=format&fit=crop&w=400&h=250&q=70")
             .build())
     cat2 = (CatBuilder()
             .set_name("Luna")
             .set_age("4 Years (Adult)")
             .set_story("Luna is a calm, sophisticated lady who enjoys birdwatching from the window.")
             .set_status("Available")
-            .set_image("https://images.unsplash.com/photo-1514888286974-6c03e2ca1dba?auto=format&fit=crop&w=400&q=80")
+            .set_image("https://images.unsplash.com/photo-1514888286974-6c03e2ca1dba?auto=format&fit=crop&w=400&h=250&q=70")
             .build())
     cat3 = (CatBuilder()
             .set_name("Oscar Sr")
             .set_age("12 Years (Senior)")
             .set_story("Oscar is a wise soul who just wants a warm lap to sleep on.")
             .set_status("Urgent")
-            .set_image("https://images.unsplash.com/photo-1573865526739-10659fec78a5?auto=format&fit=crop&w=400&q=80")
+            .set_image("https://images.unsplash.com/photo-1573865526739-10659fec78a5?auto=format&fit=crop&w=400&h=250&q=70")
             .build())
 
+    # (Images are requested from the CDN at the card's display size, as WebP/AVIF via auto=format)
     # Convert objects to dicts so Jinja template can render them easily
     # (assuming your HTML uses cat.name, cat.story, etc.)
-    featured_cats = [cat1.to_dict(), cat2.to_dict(), cat3.to_dict()]
+    return [cat1.to_dict(), cat2.to_dict(), cat3.to_dict()]
+
+FEATURED_CATS = build_featured_cats()
+
+
+# This route maps the root URL "/" to this function
+@app.route("/")
+@cache_page()
+def home():
+    # No timestamps in here: the page is cached for anonymous visitors (the
+    # template shows the time client-side)
     return render_template("hello_there.html", 
-                           featured_cats=featured_cats,
-                           today=datetime.today().strftime("%A, %B %d, %Y"),
-                           date=datetime.now(),
+                           featured_cats=FEATURED_CATS,
                            name=None)
     #..
 @app.route("/hello/")
@@ -82,25 +228,60 @@ def home():
 def hello_there(name = None):
     return render_template(
         "hello_there.html",
-        name=name,
-        date=datetime.now()
+        name=name
     )
 
 # --- DEMONSTRATION OF DECORATOR PATTERN ---
 @app.route("/admin")
 @admin_required
 def admin_panel():
-    return render_template("admin.html", user=session.get("username"))
+    return render_admin_home()
+
+
+def render_admin_home():
+    # Display name from the cached profile (no DB query); the built-in Admin has no profile row
+    profile = current_user()
+    # Counters come from the small dashboard_stats table, not COUNT(*) over cats/applications
+    stats = dashboard_stats.summary(DatabaseConnection().get_connection())
+    return render_template("admin.html", user=profile["full_name"] if profile else session.get("username"),
+                           stats=stats)
 
 # --- NAVIGATION LINKS DEMONSTRATION ---
 # 2. Gallery Link -> href="{{ url_for('gallery') }}"
 @app.route("/gallery")
+@cache_page()
 def gallery():
-    # 1. Fetch the data from the database
-    available_cats = get_available_cats(db_conn)
+    # 1. Read the keyset cursor (?after=<cat_id>) and page size from the URL
+    after_id = request.args.get("after", type=int)
+    page_size = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+
+    gallery_filters, active_filters = build_gallery_filters(request.args)
+
+    # 2. Fetch one filtered page of data from the database
+    available_cats, next_cursor = get_available_cats(DatabaseConnection().get_read_connection(),
+                                                     after_id, page_size, gallery_filters)
     
-    # 2. Pass the filtered data to the template
-    return render_template("gallery.html", cats=available_cats)
+    # 3. Pass the page (and the cursor for the next one) to the template
+    return render_template("gallery.html", cats=available_cats,
+                           next_cursor=next_cursor, after=after_id, page_size=page_size,
+                           filters=active_filters)
+
+# --- SEARCH ---
+# Ranked full-text search (?q=calico kitten&page=2); ?format=json returns just the data
+@app.route("/search")
+@cache_page()
+def search():
+    query = request.args.get("q", "").strip()
+    page = max(1, request.args.get("page", 1, type=int))
+    page_size = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+
+    cat_repo = CatRepository(DatabaseConnection().get_read_connection())
+    results, has_more = cat_repo.search_cats(query, page=page, page_size=page_size)
+
+    if request.args.get("format") == "json":
+        return {"query": query, "page": page, "has_more": has_more, "cats": [cat.to_dict() for cat in results]}
+    return render_template("gallery.html", cats=results, query=query, page=page,
+                           has_more=has_more, page_size=page_size, filters={})
 
 # 3. About Link -> href="{{ url_for('about') }}"
 @app.route("/about")
@@ -118,17 +299,38 @@ def login():
         #......
         # Hardcoded Admin Backdoor
         if username == "Admin" and password == "67890":
+            session.regenerate()
             session["user_id"] = 0
             session["username"] = "Admin"
             session["role"] = "admin"
             session["logged_in"] = True
             return redirect(url_for("admin_dashboard"))
 
+        # Throttle before doing any work: a login storm must not starve other pages
+        retry_after = login_throttle.check(request.remote_addr, username)
+        if retry_after:
+            response = make_response(render_template(
+                "login.html", error="Too many login attempts. Please wait a moment and try again."), 429)
+            response.headers["Retry-After"] = str(math.ceil(retry_after))
+            return response
+
         # Database Login
         repo = UserRepository()
         user = repo.get_user_by_username(username)
-        
-        if user and user['password'] == password:
+        # Checking the hash takes a while; give the DB connection back to the pool meanwhile
+        DatabaseConnection().release_connection()
+
+        try:
+            matches, new_hash = password_hasher.verify(user["password"], password) if user else (False, None)
+        except HasherBusyError:
+            return render_template("login.html", error="We're busy right now. Please try again in a moment."), 503
+
+        if matches:
+            if new_hash:
+                # Legacy plaintext password or an outdated hash cost: upgrade it in place
+                repo.update_password_hash(user["user_id"], new_hash)
+            # New session id on login, so an id planted before login is worthless
+            session.regenerate()
             session["user_id"] = user["user_id"]
             session["username"] = user["username"]
             session["role"] = user["role"]
@@ -146,7 +348,7 @@ def login():
 @admin_required
 def admin_dashboard():
     # Main Menu
-    return render_template("admin.html", user=session.get("username"))
+    return render_admin_home()
 
 @app.route("/admin/users")
 @admin_required
@@ -157,15 +359,71 @@ def admin_users():
 
     return render_template("admin_users.html", users=users)
 
+@app.route("/admin/users/<int:user_id>/revoke-sessions", methods=["POST"])
+@admin_required
+def admin_revoke_sessions(user_id):
+    # Sessions live server-side, so this logs the user out of every browser at once
+    revoked = revoke_user_sessions(user_id)
+    UserRepository.invalidate_profile(user_id)
+    flash(f"Signed user #{user_id} out of {revoked} session(s).", "success")
+    return redirect(url_for("admin_users"))
+
 @app.route("/admin/cats")
 @admin_required
 def admin_cats():
     # Reusing CatRepository to get inventory
-    repo = CatRepository(conn=db_conn)
+    repo = CatRepository(conn=DatabaseConnection().get_read_connection())
     # We ideally want ALL cats, even adopted ones, but for now we use available
-    cats = repo.get_available_cats()
+    after_id = request.args.get("after", type=int)
+    page_size = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    cats, next_cursor = repo.get_available_cats_page(after_id=after_id, page_size=page_size)
         
-    return render_template("admin_cats.html", cats=cats)
+    return render_template("admin_cats.html", cats=cats,
+                           next_cursor=next_cursor, after=after_id, page_size=page_size)
+
+@app.route("/admin/cats/<int:cat_id>/photos", methods=["POST"])
+@admin_required
+def admin_upload_cat_photo(cat_id):
+    repo = CatRepository(conn=DatabaseConnection().get_connection())
+    if not repo.cat_exists(cat_id):
+        return "Cat not found", 404
+    upload = request.files.get("photo")
+    if not upload or not upload.filename:
+        flash("Choose a photo to upload.", "error")
+        return redirect(url_for("admin_cats"))
+    created = []
+    try:
+        # Thumbnails are generated here, once, instead of resizing on every page view
+        urls = image_pipeline.process_upload(upload.read(), created)
+    except ImageValidationError as e:
+        flash(str(e), "error")
+        return redirect(url_for("admin_cats"))
+
+    # add_photo() checks again, with the cat locked, in case it was removed meanwhile
+    if repo.add_photo(cat_id, urls, primary=bool(request.form.get("primary"))) is None:
+        image_pipeline.discard_files(created)
+        flash(f"Could not save the photo for cat #{cat_id}.", "error")
+    else:
+        flash(f"Photo added to cat #{cat_id}.", "success")
+    return redirect(url_for("admin_cats"))
+
+# --- EXPORTS: /admin/export/applications.csv, /admin/export/cats.ndjson, ... ---
+@app.route("/admin/export/<any(cats, users, applications):kind>.<any(csv, ndjson):fmt>")
+@admin_required
+def admin_export(kind, fmt):
+    # Each export holds a database connection while it streams, so only a few may run at once
+    if not exports.export_slots.acquire(blocking=False):
+        return "<h1>Another export is already running. Please try again shortly.</h1>", 503, {"Retry-After": "30"}
+    # Runs the query before the response starts, so a database error still gets a 503 page
+    body = exports.ExportStream(fmt, AdminRepository.EXPORTS[kind][0], AdminRepository().stream_export(kind),
+                                on_close=exports.export_slots.release)
+
+    filename = f"whiskers-{kind}-{datetime.now():%Y%m%d}.{fmt}"
+    response = Response(body, mimetype=exports.FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"  # nginx: pass chunks through as they are produced
+    return response
 
 @app.route("/admin/applications")
 @admin_required
@@ -174,6 +432,66 @@ def admin_applications():
     apps = repo.get_pending_applications()
     return render_template("admin_applications.html", applications=apps)
 
+# --- OBSERVER PATTERN: notify everyone affected by a batch of decisions ---
+def notify_decisions(rows):
+    queue = current_app.extensions["notification_queue"]
+    for row in rows:
+        adoption_subject = AdoptionSubject(row["app_id"])
+        
+        # Add Adopter Observer
+        adoption_subject.attach(UserNotificationObserver(
+            row["applicant_name"], row["applicant_email"], "adopter", queue=queue))
+        
+        # Add Foster Observer (the cat's foster carer, or a generic address if unknown)
+        adoption_subject.attach(UserNotificationObserver(
+            row["foster_name"] or "Foster Parent", row["foster_email"] or "foster@example.com", "foster",
+            queue=queue))
+
+        adoption_subject.process_decision(row["status"], row["reason"])
+
+
+@app.route("/admin/applications/bulk", methods=["POST"])
+@admin_required
+def admin_bulk_process():
+    app_ids = request.form.getlist("app_ids", type=int)
+    action = request.form.get("action")
+    reason = request.form.get("reason", "").strip()
+
+    if not app_ids:
+        flash("Select at least one application.", "warning")
+        return redirect(url_for("admin_applications"))
+    if action == "decline" and not reason:
+        flash("A rejection reason is required to decline applications.", "error")
+        return redirect(url_for("admin_applications"))
+    if action not in ("approve", "decline"):
+        return "Error: Unknown action.", 400
+
+    # The versions the admin was looking at, so rows changed since then are conflicts
+    versions = {app_id: request.form.get(f"version_{app_id}", type=int) for app_id in app_ids}
+    versions = {app_id: version for app_id, version in versions.items() if version is not None}
+
+    new_status = "Approved" if action == "approve" else "Rejected"
+    result = AdminRepository().decide_applications(app_ids, new_status, reason or None, versions)
+    if result is None:
+        flash("Database Error. No applications were changed.", "error")
+        return redirect(url_for("admin_applications"))
+    if result["conflicts"]:
+        ids = ", ".join(f"#{app_id}" for app_id in result["conflicts"])
+        flash(f"Another admin changed application(s) {ids} while you were deciding. "
+              "No applications were changed; please review the list again.", "error")
+        return redirect(url_for("admin_applications"))
+
+    notify_decisions(result["notifications"])
+    skipped = len(app_ids) - len(result["decided"])
+    message = f"{len(result['decided'])} application(s) {new_status.lower()}."
+    if result["auto_rejected"]:
+        message += f" {len(result['auto_rejected'])} competing application(s) auto-rejected."
+    if skipped:
+        message += f" {skipped} skipped (already processed or cat no longer available)."
+    flash(message, "success" if not skipped else "warning")
+    return redirect(url_for("admin_applications"))
+
+
 @app.route("/admin/process/<int:app_id>", methods=["GET", "POST"])
 @admin_required
 def admin_process_adoption(app_id):
@@ -182,43 +500,40 @@ def admin_process_adoption(app_id):
     if request.method == "POST":
         action = request.form.get("action") # 'approve' or 'decline'
         reason = request.form.get("reason", "")
-        
-        # 1. Fetch details to setup Observers
-        details = repo.get_application_details(app_id)
-        if not details:
-            return "Application not found", 404
 
-        # 2. Setup Observer Pattern
-        adoption_subject = AdoptionSubject(app_id)
-        
-        # Add Adopter Observer
-        adopter_observer = UserNotificationObserver(details['applicant_name'], details['applicant_email'], "adopter")
-        adoption_subject.attach(adopter_observer)
-        
-        # Add Foster Observer (Mocking a generic foster for now, or fetching if we had one)
-        foster_observer = UserNotificationObserver("Foster Parent", "foster@example.com", "foster")
-        adoption_subject.attach(foster_observer)
-
-        # 3. Process Logic
-        if action == "approve":
-            # Update DB
-            success = repo.update_application_status(app_id, "Approved")
-            if success:
-                # Trigger Observers
-                adoption_subject.process_decision("Approved")
-                flash("Adoption Approved! Emails sent.", "success")
+        if action == "decline" and not reason:
+            return "Error: Rejection reason required.", 400
+        if action not in ("approve", "decline"):
+            return "Error: Unknown action.", 400
+
+        # 1. Update DB (one transaction; also returns who to notify)
+        new_status = "Approved" if action == "approve" else "Rejected"
+        version = request.form.get("version", type=int)
+        result = repo.decide_applications([app_id], new_status, reason or None,
+                                          {app_id: version} if version is not None else None)
+
+        if result is None:
+            flash("Database Error.", "error")
+        elif result["conflicts"]:
+            # Someone else decided first: show the application as it is now
+            details = repo.get_application_details(app_id)
+            if not details:
+                return "Application not found", 404
+            return render_template("admin_process_adoption.html", app=details,
+                                   conflict="Another admin changed this application while you were "
+                                            "reviewing it. Nothing was saved; check its current status below."), 409
+        elif app_id not in result["decided"]:
+            # Nothing changed: either it doesn't exist or it was already processed
+            if not repo.get_application_details(app_id):
+                return "Application not found", 404
+            flash("This application was already processed (or its cat is no longer available).", "warning")
+        else:
+            # 2. Trigger Observers
+            notify_decisions(result["notifications"])
+            if new_status == "Approved":
+                flash("Adoption Approved! Emails queued.", "success")
             else:
-                flash("Database Error.", "error")
-                
-        elif action == "decline":
-            if not reason:
-                return "Error: Rejection reason required.", 400
-            
-            # Update DB
-            repo.update_application_status(app_id, "Rejected", reason)
-            # Trigger Observers
-            adoption_subject.process_decision("Rejected", reason)
-            flash("Adoption Declined. Applicant notified.", "warning")
+                flash("Adoption Declined. Applicant notified.", "warning")
 
         return redirect(url_for("admin_applications"))
 
@@ -227,6 +542,90 @@ def admin_process_adoption(app_id):
     return render_template("admin_process_adoption.html", app=details)
 
 
+@app.route("/admin/metrics")
+def admin_metrics():
+    # Prometheus scrapers can't log in, so they may present METRICS_TOKEN instead
+    token = os.environ.get("METRICS_TOKEN")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not (token and supplied and hmac.compare_digest(token, supplied)):
+        if str(session.get("role")).lower() != "admin":
+            return "<h1>Access Denied: Admin privileges required.</h1>", 403
+
+    db = DatabaseConnection()
+    pool = db.pool.stats()
+    extra = [
+        "# HELP whiskers_db_pool_connections Open connections in the pool by state.",
+        "# TYPE whiskers_db_pool_connections gauge",
+        f'whiskers_db_pool_connections{{state="idle"}} {pool["idle"]}',
+        f'whiskers_db_pool_connections{{state="in_use"}} {pool["size"] - pool["idle"]}',
+        f'whiskers_db_pool_connections{{state="max"}} {pool["max_size"]}',
+        "# HELP whiskers_db_pool_waits_total Checkouts that found no free connection and had to wait.",
+        "# TYPE whiskers_db_pool_waits_total counter",
+        f"whiskers_db_pool_waits_total {pool['waits']}",
+        "# HELP whiskers_db_pool_wait_seconds_total Time requests spent waiting for a connection.",
+        "# TYPE whiskers_db_pool_wait_seconds_total counter",
+        f"whiskers_db_pool_wait_seconds_total {pool['wait_seconds']:.6f}",
+        "# HELP whiskers_db_pool_max_wait_seconds Longest wait for a connection so far.",
+        "# TYPE whiskers_db_pool_max_wait_seconds gauge",
+        f"whiskers_db_pool_max_wait_seconds {pool['max_wait_seconds']:.6f}",
+        "# HELP whiskers_db_pool_timeouts_total Checkouts that gave up (the request got a 503).",
+        "# TYPE whiskers_db_pool_timeouts_total counter",
+        f"whiskers_db_pool_timeouts_total {pool['timeouts']}",
+        "# HELP whiskers_worker_pid Process id of the worker that served this scrape.",
+        "# TYPE whiskers_worker_pid gauge",
+        f"whiskers_worker_pid {os.getpid()}",
+    ]
+    if db.replicas:
+        replicas = db.replicas.stats()
+        extra += ["# HELP whiskers_db_replica_lag_seconds Replication lag at the last check.",
+                  "# TYPE whiskers_db_replica_lag_seconds gauge"]
+        extra += [f'whiskers_db_replica_lag_seconds{{replica="{r["name"]}"}} {r["lag"]}' for r in replicas]
+        extra += ["# HELP whiskers_db_replica_up 0 while a replica is skipped after a connection failure.",
+                  "# TYPE whiskers_db_replica_up gauge"]
+        extra += [f'whiskers_db_replica_up{{replica="{r["name"]}"}} {int(r["up"])}' for r in replicas]
+        extra += ["# HELP whiskers_db_reads_total Read-only units of work by where they were served.",
+                  "# TYPE whiskers_db_reads_total counter"]
+        extra += [f'whiskers_db_reads_total{{target="{r["name"]}"}} {r["reads"]}' for r in replicas]
+        extra += [f'whiskers_db_reads_total{{target="primary_fallback"}} {db.replicas.fallbacks}']
+    extra += [
+        "# HELP whiskers_cache_events_total Repository cache hits, misses and invalidations.",
+        "# TYPE whiskers_cache_events_total counter",
+    ]
+    for namespace, counters in repository_cache.stats().items():
+        extra += [f'whiskers_cache_events_total{{namespace="{namespace}",event="{event}"}} {value}'
+                  for event, value in counters.items()]
+    extra += ["# HELP whiskers_startup_seconds Time spent importing and initializing this worker, by phase.",
+              "# TYPE whiskers_startup_seconds gauge"]
+    extra += [f'whiskers_startup_seconds{{phase="{phase}"}} {seconds:.6f}'
+              for phase, seconds in current_app.extensions["whiskers"]["startup_seconds"].items()]
+    writer = current_app.extensions.get("application_writer")
+    if writer:
+        counts = writer.stats()
+        extra += [
+            "# HELP whiskers_application_batches_total Transactions the application writer has committed (or attempted).",
+            "# TYPE whiskers_application_batches_total counter",
+            f"whiskers_application_batches_total {counts['batches']}",
+            "# HELP whiskers_application_submissions_total Submissions written through the application writer.",
+            "# TYPE whiskers_application_submissions_total counter",
+            f"whiskers_application_submissions_total {counts['submissions']}",
+            "# HELP whiskers_application_largest_batch Most submissions written in one transaction.",
+            "# TYPE whiskers_application_largest_batch gauge",
+            f"whiskers_application_largest_batch {counts['largest_batch']}",
+            "# HELP whiskers_application_rejected_total Submissions turned away with a 503 because the queue was full.",
+            "# TYPE whiskers_application_rejected_total counter",
+            f"whiskers_application_rejected_total {counts['rejected']}",
+            "# HELP whiskers_application_queue Submissions waiting for the writer.",
+            "# TYPE whiskers_application_queue gauge",
+            f"whiskers_application_queue {counts['queued']}",
+        ]
+    extra += ["# HELP whiskers_notification_jobs Email jobs in the delivery queue by status.",
+              "# TYPE whiskers_notification_jobs gauge"]
+    extra += [f'whiskers_notification_jobs{{status="{status}"}} {count}'
+              for status, count in current_app.extensions["notification_queue"].counts().items()]
+
+    return Response(query_stats.render_prometheus(extra), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/logout")
 def logout():
     session.clear() # Wipes the cookie
@@ -262,8 +661,11 @@ def register():
         if user_repo.get_user_by_username(username):
             return render_template("register.html", error="That username is already taken!")
 
-        # Create the user
-        new_id = user_repo.create_user(username, email, password, full_name, user_type)
+        # Create the user (the password is hashed before it is stored)
+        try:
+            new_id = user_repo.create_user(username, email, password, full_name, user_type)
+        except HasherBusyError:
+            return render_template("register.html", error="We're busy right now. Please try again in a moment.")
         
         if new_id:
             print(f"✅ User Created: {username} (ID: {new_id})")
@@ -273,5 +675,98 @@ def register():
 
     return render_template("register.html")
 
+# ==========================================
+# FOSTER ROUTES
+# ==========================================
+# One cat from the form, or a whole spreadsheet of cats (+ their photos) in one post
+@app.route("/foster/cats/new", methods=["GET", "POST"])
+@foster_required
+def foster_add_cat():
+    if request.method == "GET":
+        return render_template("foster/add_cat.html", columns=cat_intake.COLUMNS,
+                               max_cats=cat_intake.MAX_CATS_PER_UPLOAD)
+
+    spreadsheet = request.files.get("spreadsheet")
+    photos = {f.filename: f.read() for f in request.files.getlist("photos") if f and f.filename}
+    from_spreadsheet = bool(spreadsheet and spreadsheet.filename)
+    if from_spreadsheet:
+        try:
+            rows = cat_intake.read_spreadsheet(spreadsheet.filename, spreadsheet.read())
+        except IntakeError as e:
+            return render_add_cat_errors([str(e)])
+    else:
+        rows = [{column: request.form.get(column, "").strip() for column in cat_intake.COLUMNS}]
+        photo = request.files.get("photo")
+        if photo and photo.filename:
+            photos[photo.filename] = photo.read()
+            rows[0]["photo"] = photo.filename
+
+    # Everything is validated (and photos resized) before a single row is written
+    cats, photo_urls, errors = cat_intake.build_batch(rows, photos, numbered=from_spreadsheet)
+    if errors:
+        return render_add_cat_errors(errors)
+
+    repo = CatRepository(conn=DatabaseConnection().get_connection())
+    cat_ids = repo.add_cats(session["user_id"], cats, photo_urls)
+    if cat_ids is None:
+        return render_add_cat_errors(["Your cats could not be saved. Please try again."], 500)
+    flash(f"Added {len(cat_ids)} cat(s) to the gallery: {', '.join(cat.name for cat in cats)}.", "success")
+    return redirect(url_for("foster_add_cat"))
+
+
+def render_add_cat_errors(errors, status=400):
+    return render_template("foster/add_cat.html", columns=cat_intake.COLUMNS,
+                           max_cats=cat_intake.MAX_CATS_PER_UPLOAD, errors=errors, form=request.form), status
+
+# ==========================================
+# ADOPTER ROUTES
+# ==========================================
+# What each ApplicationRepository outcome means for the client
+APPLICATION_RESPONSES = {
+    "created": (201, None),
+    "replayed": (200, None),
+    "duplicate": (409, "You already have a pending application for this cat."),
+    "key_reused": (422, "This Idempotency-Key was already used for an application for another cat."),
+    "unavailable": (409, "This cat has already been adopted."),
+    "not_found": (404, "There is no cat with that id."),
+    "error": (500, "Your application could not be saved. Please try again."),
+}
+
+# Submit an application: JSON {"cat_id": 12, "answers": {...}} or a form post with the
+# answers as fields. Send an Idempotency-Key header so retries can't apply twice.
+@app.route("/applications", methods=["POST"])
+@adopter_required
+def submit_application():
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        answers = data.get("answers") if isinstance(data.get("answers"), dict) else {}
+    else:
+        data = answers = request.form
+    try:
+        key = application_intake.read_idempotency_key(request.headers, data)
+    except ValueError as e:
+        return {"errors": [str(e)]}, 400
+    cat_id, answers_json, problems = application_intake.validate_submission(data, answers)
+    if problems:
+        return {"errors": problems}, 400
+
+    writer = current_app.extensions.get("application_writer")
+    try:
+        if writer:
+            result = writer.submit(session["user_id"], cat_id, answers_json, key)
+        else:
+            # No background writer (scripts, tests): a batch of one on the request's connection
+            result = application_intake.write_batch(DatabaseConnection().get_connection(),
+                                                    [(session["user_id"], cat_id, answers_json, key)])[0]
+    except WriterBusyError as e:
+        return {"error": str(e)}, 503, {"Retry-After": "2"}
+
+    status, error = APPLICATION_RESPONSES[result["outcome"]]
+    body = {"outcome": result["outcome"], "application_id": result["app_id"], "cat_id": cat_id,
+            "application_status": result["status"]}
+    if error:
+        body["error"] = error
+    return body, status
+
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
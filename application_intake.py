@@ -0,0 +1,234 @@
+# application_intake.py
+"""
+Adopter intake: validating adoption applications and writing them in batches.
+
+POST /applications takes a cat and the adopter's questionnaire answers
+(JSON or a form post). Clients should send an `Idempotency-Key` header (a
+UUID works): if the response is lost and the request is retried with the
+same key, the adopter gets the application the first attempt created
+instead of a second one.
+
+Writes go through ApplicationWriter, a per-worker background thread that
+coalesces concurrent submissions: whatever has queued up while the
+previous batch was committing (plus up to APPLICATION_BATCH_WAIT_MS more)
+is filed by ApplicationRepository.submit_applications() in ONE transaction.
+A surge of applications (a viral kitten post) therefore becomes a handful
+of commits rather than one per request. A full queue or a slow database
+answers 503 with Retry-After; retrying with the same key is safe.
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HOME_TYPES = ("apartment", "house with garden", "shared flat", "townhouse")
+MAX_OTHER_PETS = 20
+MAX_TEXT = 2000
+IDEMPOTENCY_KEY = re.compile(r"[A-Za-z0-9_.:-]{1,64}")
+
+
+class WriterBusyError(RuntimeError):
+    """The writer couldn't take (or finish) a submission in time; the client should retry."""
+
+
+# ==========================================
+# 1. VALIDATION
+# ==========================================
+def _whole_number(value, low, high):
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return number if low <= number <= high else None
+
+
+def validate_submission(data, answers):
+    """
+    Checks the cat id and the questionnaire answers.
+
+    Args:
+        data (Mapping): the request fields (needs `cat_id`).
+        answers (Mapping): the questionnaire answers.
+
+    Returns:
+        tuple: (cat_id, answers_json, problems) - problems is a list of
+        messages; when it is non-empty nothing should be saved.
+    """
+    problems = []
+    cat_id = _whole_number(data.get("cat_id"), 1, 2 ** 31 - 1)
+    if cat_id is None:
+        problems.append("cat_id must be the id of a cat")
+
+    home_type = str(answers.get("home_type") or "").strip().lower()
+    if home_type not in HOME_TYPES:
+        problems.append(f"home_type must be one of: {', '.join(HOME_TYPES)}")
+    other_pets = _whole_number(answers.get("other_pets"), 0, MAX_OTHER_PETS)
+    if other_pets is None:
+        problems.append(f"other_pets must be a whole number between 0 and {MAX_OTHER_PETS}")
+    hours_alone = _whole_number(answers.get("hours_alone_per_day"), 0, 24)
+    if hours_alone is None:
+        problems.append("hours_alone_per_day must be a whole number between 0 and 24")
+    experience = str(answers.get("experience") or "").strip()
+    if len(experience) > MAX_TEXT:
+        problems.append(f"experience must be at most {MAX_TEXT} characters")
+
+    if problems:
+        return None, None, problems
+    # Same shape as the applications generate_data.py produces
+    stored = {"home_type": home_type, "other_pets": other_pets, "hours_alone_per_day": hours_alone}
+    if experience:
+        stored["experience"] = experience
+    return cat_id, json.dumps(stored), []
+
+
+def read_idempotency_key(headers, data):
+    """The `Idempotency-Key` header (or `idempotency_key` field): None if absent, ValueError if malformed."""
+    key = (headers.get("Idempotency-Key") or data.get("idempotency_key") or "").strip()
+    if not key:
+        return None
+    if not IDEMPOTENCY_KEY.fullmatch(key):
+        raise ValueError("Idempotency-Key must be 1-64 letters, digits or the characters _ . : -")
+    return key
+
+
+# ==========================================
+# 2. WRITING
+# ==========================================
+def write_batch(conn, submissions):
+    """
+    Files `submissions` (see ApplicationRepository.submit_applications) on
+    `conn`. If the batch's transaction fails, each submission is retried on
+    its own so one bad row can't fail everyone else's application.
+
+    Returns:
+        list: one result dict per submission ({"outcome": "error"} on failure).
+    """
+    from architectural_patterns import ApplicationRepository
+    repo = ApplicationRepository(conn)
+    results = repo.submit_applications(submissions)
+    if results is not None:
+        return results
+    if len(submissions) == 1:
+        return [{"outcome": "error", "app_id": None, "status": None}]
+    return [write_batch(conn, [submission])[0] for submission in submissions]
+
+
+class _Submission:
+    __slots__ = ("params", "done", "result")
+
+    def __init__(self, params):
+        self.params = params
+        self.done = threading.Event()
+        self.result = None
+
+
+class ApplicationWriter:
+    """
+    Coalesces submissions from all request threads into batched
+    transactions, on a daemon thread with its own pooled connection.
+    """
+
+    def __init__(self, max_batch=100, max_wait=0.005, max_queue=1000, timeout=10.0):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._counts = {"batches": 0, "submissions": 0, "largest_batch": 0, "rejected": 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="application-writer", daemon=True)
+        self._thread.start()
+        print(f"[Applications] Batch writer started (up to {self.max_batch} per transaction, "
+              f"waits {self.max_wait * 1000:g}ms for stragglers).")
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, user_id, cat_id, answers, key):
+        """
+        Queues one submission and waits for the batch that files it.
+
+        Returns:
+            dict: the submission's result (see ApplicationRepository.submit_applications).
+
+        Raises:
+            WriterBusyError: the queue is full, or the batch didn't finish
+                within `timeout` (it may still commit; a retry with the same
+                idempotency key finds it).
+        """
+        submission = _Submission((user_id, cat_id, answers, key))
+        try:
+            self._queue.put_nowait(submission)
+        except queue.Full:
+            with self._lock:
+                self._counts["rejected"] += 1
+            raise WriterBusyError("Too many applications are being submitted right now.") from None
+        if not submission.done.wait(self.timeout):
+            raise WriterBusyError("Your application is taking longer than usual to save.")
+        return submission.result
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts, queued=self._queue.qsize())
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        # Everything that queued up while the last batch was committing, plus
+        # whatever arrives within max_wait
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        from design_patterns import DatabaseConnection
+        db = DatabaseConnection()
+        try:
+            conn = db.pool.getconn()
+            try:
+                results = write_batch(conn, [submission.params for submission in batch])
+            finally:
+                db.pool.putconn(conn)
+        except Exception as e:
+            print(f"❌ [Applications] Could not write a batch of {len(batch)}: {e}")
+            results = [{"outcome": "error", "app_id": None, "status": None}] * len(batch)
+        with self._lock:
+            self._counts["batches"] += 1
+            self._counts["submissions"] += len(batch)
+            self._counts["largest_batch"] = max(self._counts["largest_batch"], len(batch))
+        for submission, result in zip(batch, results):
+            submission.result = result
+            submission.done.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+
+def build_writer_from_env():
+    return ApplicationWriter(
+        max_batch=int(os.environ.get("APPLICATION_BATCH_SIZE", 100)),
+        max_wait=float(os.environ.get("APPLICATION_BATCH_WAIT_MS", 5)) / 1000,
+        max_queue=int(os.environ.get("APPLICATION_QUEUE_SIZE", 1000)),
+        timeout=float(os.environ.get("APPLICATION_SUBMIT_TIMEOUT", 10)),
+    )
@@ -1,5 +1,204 @@
+import os
+import re
+from collections import Counter
 import psycopg2
-from design_patterns import DatabaseConnection
+from dotenv import load_dotenv
+from design_patterns import DatabaseConnection, DatabaseUnavailableError, PoolTimeoutError
+from cache import repository_cache, RepositoryCache, InMemoryBackend
+from credentials import password_hasher
+from row_models import CatRow, UserRow, ApplicationRow, fetch_rows
+import dashboard_stats
+import query_layer
+
+load_dotenv()
+
+# Gallery pagination: how many cats a single page shows, and the most a client may ask for
+DEFAULT_PAGE_SIZE = int(os.environ.get("GALLERY_PAGE_SIZE", 24))
+MAX_PAGE_SIZE = 100
+
+# Stored on applications that lose out when another applicant adopts the cat
+AUTO_REJECT_REASON = "Another applicant has adopted this cat."
+
+# Adoption decisions give up on a row lock after this long and report a
+# conflict, instead of queueing behind another admin's transaction
+DECISION_LOCK_TIMEOUT_MS = int(os.environ.get("DECISION_LOCK_TIMEOUT_MS", 2000))
+
+# Unknown usernames are remembered this long, so login floods for made-up
+# accounts don't reach the database. Only with a shared cache backend (Redis):
+# registering forgets the entry in every worker at once, whereas per-worker
+# caches would keep rejecting a new user's login in the other workers.
+UNKNOWN_USER_TTL = float(os.environ.get("UNKNOWN_USER_CACHE_TTL", 300))
+
+# Per-worker LRU of user profiles by user_id, so pages that need "who is this"
+# don't query the users table on every request. Writes to a user call
+# UserRepository.invalidate_profile(); other workers catch up within the TTL.
+profile_cache = RepositoryCache(InMemoryBackend(max_entries=int(os.environ.get("PROFILE_CACHE_SIZE", 2048))),
+                                default_ttl=float(os.environ.get("PROFILE_CACHE_TTL", 300)))
+
+# Search: words are split on anything that isn't a letter/digit, which also keeps
+# tsquery/FTS5 operators out of user input
+SEARCH_TERM = re.compile(r"[^\W_]+")
+MAX_SEARCH_TERMS = 8
+
+# Row factories: cursor record (in SELECT order) -> row object, see row_models.py
+_make_cat = CatRow.factory("id", "name", "age", "breed", "story", "status", "vaccination_status",
+                           "image", "image_small", "version")
+_make_login_user = UserRow.factory("id", "username", "password", "role", "full_name")
+_make_profile = UserRow.factory("id", "username", "role", "full_name", "email")
+_make_listed_user = UserRow.factory("id", "full_name", "username", "email", "role")
+_make_pending_application = ApplicationRow.factory(
+    "app_id", "applicant_name", "cat_name", "status", "cat_id", "user_id", "version")
+_make_application_details = ApplicationRow.factory(
+    "app_id", "applicant_name", "applicant_email", "applicant_role", "cat_name", "cat_breed", "cat_age",
+    "cat_image", "status", "cat_id", "user_id", "version")
+_make_notification = ApplicationRow.factory(
+    "app_id", "status", "reason", "applicant_name", "applicant_email", "cat_name", "foster_name", "foster_email")
+
+# The gallery's base query: non-adopted cats after a keyset cursor, with the
+# primary photo's thumbnails (one row per cat, guaranteed by the unique partial
+# index idx_cat_photos_primary). Filters and ORDER BY/LIMIT are appended.
+AVAILABLE_CATS_SQL = """
+    SELECT c.cat_id, c.name, c.age, c.breed, c.bio, c.application_status, c.vaccination_status,
+           p.photo_url, p.thumb_card_url, p.thumb_small_url, c.version
+    FROM cats c
+    LEFT JOIN cat_photos p ON p.cat_id = c.cat_id AND p.is_primary
+    WHERE c.application_status != 'Adopted'
+      AND c.cat_id > %s
+"""
+
+# Hot, fixed queries, executed by name through query_layer (prepared per
+# connection on PostgreSQL, statement-cached on SQLite). SQL assembled at
+# runtime (filters, IN lists, multi-row inserts) still uses cursor.execute().
+query_layer.register({
+    "cats.available_page": AVAILABLE_CATS_SQL + " ORDER BY c.cat_id LIMIT %s",
+    "cats.search": """
+        SELECT c.cat_id, c.name, c.age, c.breed, c.bio, c.application_status, c.vaccination_status,
+               p.photo_url, p.thumb_card_url, p.thumb_small_url, c.version
+        FROM cats c
+        CROSS JOIN to_tsquery('english', %s) AS query
+        LEFT JOIN cat_photos p ON p.cat_id = c.cat_id AND p.is_primary
+        WHERE c.search_vector @@ query
+          AND c.application_status != 'Adopted'
+        ORDER BY ts_rank(c.search_vector, query) DESC, c.cat_id
+        LIMIT %s OFFSET %s
+    """,
+    # Held until commit, so the cat can't disappear while its photo is recorded
+    "cats.lock": "SELECT cat_id FROM cats WHERE cat_id = %s FOR UPDATE",
+    "photos.count_primary": "SELECT COUNT(*) FROM cat_photos WHERE cat_id = %s AND is_primary",
+    "photos.clear_primary": "UPDATE cat_photos SET is_primary = %s WHERE cat_id = %s AND is_primary",
+    # A new primary photo changes the cat's card, so it counts as a write to the cat
+    "cats.bump_version": "UPDATE cats SET version = version + 1 WHERE cat_id = %s",
+    "photos.insert": """
+        INSERT INTO cat_photos (cat_id, photo_url, thumb_card_url, thumb_small_url, is_primary)
+        VALUES (%s, %s, %s, %s, %s)
+        RETURNING photo_id
+    """,
+    "fosters.by_user": "SELECT foster_id FROM foster_users WHERE user_id = %s",
+    # New cat ids, taken before the INSERT so each one is known to belong to its cat
+    "cats.reserve_ids": "SELECT nextval(pg_get_serial_sequence('cats', 'cat_id')) FROM generate_series(1, %s)",
+    "fosters.create": "INSERT INTO foster_users (user_id) VALUES (%s) RETURNING foster_id",
+    "users.create": """
+        INSERT INTO users (username, email, hashed_password, full_name, user_type)
+        VALUES (%s, %s, %s, %s, %s)
+        RETURNING user_id
+    """,
+    "users.by_username": """
+        SELECT user_id, username, hashed_password, user_type, full_name
+        FROM users
+        WHERE username = %s
+    """,
+    "users.by_id": """
+        SELECT user_id, username, user_type, full_name, email
+        FROM users
+        WHERE user_id = %s
+    """,
+    "users.update_password": "UPDATE users SET hashed_password = %s WHERE user_id = %s",
+    "adopters.by_user": "SELECT MIN(adopter_id) FROM adopters WHERE user_id = %s",
+    "adopters.create": "INSERT INTO adopters (user_id) VALUES (%s) RETURNING adopter_id",
+    # Inserts only if the cat is still up for adoption and the adopter has no
+    # pending application for it; a reused idempotency key inserts nothing
+    "applications.submit": """
+        INSERT INTO adoption_applications (adopter_id, cat_id, questionnaire_responses, idempotency_key)
+        SELECT %s, c.cat_id, %s, %s
+        FROM cats c
+        WHERE c.cat_id = %s
+          AND c.application_status != 'Adopted'
+          AND NOT EXISTS (
+              SELECT 1 FROM adoption_applications a
+              WHERE a.adopter_id = %s AND a.cat_id = c.cat_id AND a.application_status = 'Pending')
+        ON CONFLICT (adopter_id, idempotency_key) DO NOTHING
+        RETURNING application_id
+    """,
+    "applications.by_key": """
+        SELECT application_id, cat_id, application_status
+        FROM adoption_applications
+        WHERE adopter_id = %s AND idempotency_key = %s
+    """,
+    "applications.pending_for_cat": """
+        SELECT application_id, cat_id, application_status
+        FROM adoption_applications
+        WHERE adopter_id = %s AND cat_id = %s AND application_status = 'Pending'
+    """,
+    "cats.status": "SELECT application_status FROM cats WHERE cat_id = %s",
+    "admin.list_users": """
+        SELECT user_id, full_name, username, email, user_type
+        FROM users
+        WHERE user_type != 'admin'
+    """,
+    # The joins are needed because of the separation into the `adopters` table
+    "admin.pending_applications": """
+        SELECT a.application_id, u.full_name, c.name, a.application_status, a.cat_id, u.user_id, a.version
+        FROM adoption_applications a
+        JOIN adopters d ON a.adopter_id = d.adopter_id
+        JOIN users u ON d.user_id = u.user_id
+        JOIN cats c ON a.cat_id = c.cat_id
+        WHERE a.application_status = 'Pending'
+    """,
+    "admin.application_details": """
+        SELECT a.application_id,
+               u.full_name, u.email, u.user_type,
+               c.name, c.breed, c.age,
+               (SELECT COALESCE(p.thumb_small_url, p.photo_url) FROM cat_photos p
+                WHERE p.cat_id = c.cat_id ORDER BY p.is_primary DESC, p.photo_id LIMIT 1),
+               a.application_status,
+               c.cat_id,
+               u.user_id,
+               a.version
+        FROM adoption_applications a
+        JOIN adopters d ON a.adopter_id = d.adopter_id
+        JOIN users u ON d.user_id = u.user_id
+        JOIN cats c ON a.cat_id = c.cat_id
+        WHERE a.application_id = %s
+    """,
+}, sqlite={
+    # No row locks: SQLite serializes writers on the whole database
+    "cats.lock": "SELECT cat_id FROM cats WHERE cat_id = %s",
+    # No sequences: continue from the highest id AUTOINCREMENT has handed out
+    "cats.reserve_ids": """
+        WITH RECURSIVE ids(n, cat_id) AS (
+            SELECT 1, COALESCE(MAX(seq), 0) + 1
+            FROM (SELECT MAX(cat_id) AS seq FROM cats
+                  UNION ALL SELECT seq FROM sqlite_sequence WHERE name = 'cats')
+            UNION ALL
+            SELECT n + 1, cat_id + 1 FROM ids WHERE n < %s
+        )
+        SELECT cat_id FROM ids ORDER BY n
+    """,
+    # FTS5: the MATCH expression is built by _query_search; bm25() is
+    # lower-is-better and its weights follow the name/breed/bio column order
+    "cats.search": """
+        SELECT c.cat_id, c.name, c.age, c.breed, c.bio, c.application_status, c.vaccination_status,
+               p.photo_url, p.thumb_card_url, p.thumb_small_url, c.version
+        FROM cats_fts
+        JOIN cats c ON c.cat_id = cats_fts.rowid
+        LEFT JOIN cat_photos p ON p.cat_id = c.cat_id AND p.is_primary
+        WHERE cats_fts MATCH %s
+          AND c.application_status != 'Adopted'
+        ORDER BY bm25(cats_fts, 10.0, 5.0, 1.0), c.cat_id
+        LIMIT %s OFFSET %s
+    """,
+})
+
 class CatRepository:
     """
     Implements the Repository Pattern, acting as the Data Access Layer (DAL) 
@@ -12,51 +211,42 @@ class CatRepository:
         #'self' is NEVER passed as a parameter
         self.conn = conn
 
-    def get_available_cats(self):
-        print("entered get_all_cats in catrepository 1️⃣")
+    def get_available_cats(self, after_id=None, limit=None, gallery=None):
         """
-        Fetches all cats from the database whose application_status is not 'Adopted'.
+        Fetches cats from the database whose application_status is not 'Adopted'.
+
+        Uses keyset pagination on cat_id: only cats with an id greater than
+        `after_id` are returned, at most `limit` of them (no limit if None).
+        Filters added to `gallery` (a CatGallery) are compiled into the WHERE
+        clause; strategies without a SQL form are applied in Python afterwards.
+
+        Results are served from the repository cache ("cats" namespace) and
+        refreshed whenever a write calls CatRepository.invalidate_cache().
         
         Returns:
-            list: A list of dictionaries, where each dictionary represents an available cat.
+            list: A list of CatRow objects (readable like dicts: cat.name or cat["name"]).
         """
         try:
-            cur = self.conn.cursor()
-            print("entered get_available_cats 2️⃣")
-            # SQL Query to select cats that are not adopted
-            sql_query = """
-                SELECT 
-                    cat_id, 
-                    name, 
-                    age, 
-                    breed, 
-                    bio, 
-                    application_status
-                FROM cats
-                WHERE application_status != 'Adopted'
-                ORDER BY cat_id;
-            """
-            cur.execute(sql_query)
-            cat_records = cur.fetchall()
-            cur.close()
-            print("3️⃣ about to enter loop to convert into list of dicts in catrepo getavailablecats")
-
-            # Define column names explicitly for easy dictionary creation
-            column_names = ['id', 'name', 'age', 'breed', 'story', 'status']
-
-            # Convert records into a list of dictionaries for easy rendering in Flask/Jinja
-            cats_list = []
-            for record in cat_records:
-                print("4️⃣ entered loop in catrepository")
-                cat_data = dict(zip(column_names, record))
-                print("4️5️⃣ executed zip in getavailablecats in catrepository")
-                # Temporary addition of a placeholder image (as we don't have cat_photos join yet)
-                cat_data['image'] = f"https://placehold.co/400x200/50c4db/white?text={cat_data['name']}"
-                
-                # NOTE: Age is an integer in the DB, converting for the template display
-                cat_data['age'] = f"{cat_data['age']}" 
-                
-                cats_list.append(cat_data)
+            filter_clause, filter_params, memory_filters = gallery.to_sql() if gallery else ("", [], [])
+            # A LIMIT is only safe when every filter ran in SQL
+            sql_limit = limit if not memory_filters else None
+
+            def load():
+                return self._query_available_cats(after_id, sql_limit, filter_clause, filter_params)
+
+            if memory_filters:
+                # Arbitrary in-memory strategies can't be part of a cache key
+                cats_list = load()
+            else:
+                cache_key = ("available", after_id or 0, sql_limit, filter_clause, tuple(filter_params))
+                cats_list = repository_cache.get_or_load("cats", cache_key, load)
+
+            if memory_filters:
+                # Fallback path: strategies that could not be expressed in SQL
+                for strategy, criteria in memory_filters:
+                    cats_list = strategy.filter(cats_list, criteria)
+                if limit is not None:
+                    cats_list = cats_list[:limit]
              
             return cats_list
 
@@ -68,40 +258,253 @@ class CatRepository:
         except Exception as e:
             print(f"❌ General Error in CatRepository: {e}")
             return []
+
+    def _query_available_cats(self, after_id, limit, filter_clause, filter_params):
+        cur = self.conn.cursor()
+        # (cat_id > cursor lets the primary key index skip straight to the page)
+        if not filter_clause and limit is not None:
+            # The plain gallery page, by far the most common: a named statement
+            query_layer.execute(cur, "cats.available_page", (after_id or 0, limit))
+        else:
+            sql_query = AVAILABLE_CATS_SQL
+            params = [after_id or 0]
+            if filter_clause:
+                sql_query += f" AND {filter_clause}"
+                params.extend(filter_params)
+            sql_query += " ORDER BY c.cat_id"
+            if limit is not None:
+                sql_query += " LIMIT %s"
+                params.append(limit)
+            cur.execute(sql_query, tuple(params))
+        cats = fetch_rows(cur, self._to_cat_row)
+        cur.close()
+        return cats
+
+    @staticmethod
+    def _to_cat_row(record):
+        # Record columns: cat_id, name, age, breed, bio, application_status,
+        # vaccination_status, photo_url, thumb_card_url, thumb_small_url, version
+        cat_id, name, age, breed, bio, status, vaccination_status, photo_url, card_url, small_url, version = record
+        # Pre-sized thumbnails when the photo went through image_pipeline, otherwise
+        # the stored URL, otherwise a placeholder for cats without photos
+        fallback = f"https://placehold.co/400x300/50c4db/white?text={name}"
+        # NOTE: Age is an integer in the DB, converting for the template display ("" when unknown)
+        return _make_cat((cat_id, name, "" if age is None else f"{age}", breed, bio or "", status,
+                          vaccination_status, card_url or photo_url or fallback, small_url or photo_url or fallback, version))
+
+    def add_photo(self, cat_id, urls, primary=False):
+        """
+        Records a processed photo (see image_pipeline.process_upload) for a cat.
+        The cat's first photo always becomes its primary one; `primary=True`
+        replaces the current primary photo.
+
+        Returns:
+            int: the new photo_id, or None on failure (including no such cat:
+            SQLite doesn't enforce the foreign key).
+        """
+        cur = self.conn.cursor()
+        try:
+            query_layer.execute(cur, "cats.lock", (cat_id,))
+            if cur.fetchone() is None:
+                print(f"❌ Not saving photo: there is no cat #{cat_id}")
+                self.conn.rollback()
+                return None
+            query_layer.execute(cur, "photos.count_primary", (cat_id,))
+            has_primary = cur.fetchone()[0] > 0
+            if primary and has_primary:
+                query_layer.execute(cur, "photos.clear_primary", (False, cat_id))
+            query_layer.execute(cur, "photos.insert", (
+                cat_id, urls["photo_url"], urls.get("thumb_card_url"), urls.get("thumb_small_url"),
+                primary or not has_primary))
+            photo_id = cur.fetchone()[0]
+            if primary or not has_primary:
+                query_layer.execute(cur, "cats.bump_version", (cat_id,))
+            self.conn.commit()
+        except Exception as e:
+            print(f"❌ Error saving photo for cat #{cat_id}: {e}")
+            self.conn.rollback()
+            return None
+        finally:
+            cur.close()
+        self.invalidate_cache()
+        return photo_id
+
+    def cat_exists(self, cat_id):
+        cur = query_layer.run(self.conn, "cats.status", (cat_id,))
+        found = cur.fetchone() is not None
+        cur.close()
+        return found
+
+    def add_cats(self, foster_user_id, cats, photo_urls=None):
+        """
+        Inserts a batch of built cats (design_patterns.Cat) for one foster
+        carer in ONE transaction: a single multi-row INSERT for the cats and
+        one for their primary photos. Either every cat is saved or none is.
+
+        Args:
+            foster_user_id (int): users.user_id of the foster; their
+                foster_users row is created on first use.
+            cats (list): Cat objects, e.g. from cat_intake.build_batch().
+            photo_urls (list): per cat, an image_pipeline.process_upload()
+                result or None.
+
+        Returns:
+            list: the new cat_ids in the order of `cats`, or None on failure.
+        """
+        if not cats:
+            return []
+        photo_urls = photo_urls or [None] * len(cats)
+        cur = self.conn.cursor()
+        try:
+            query_layer.execute(cur, "fosters.by_user", (foster_user_id,))
+            row = cur.fetchone()
+            if row is None:
+                query_layer.execute(cur, "fosters.create", (foster_user_id,))
+                row = cur.fetchone()
+            foster_id = row[0]
+
+            # Counters first: on SQLite this write takes the database's write
+            # lock, so no other writer can claim the ids reserved next
+            dashboard_stats.bump(cur, Counter(f"cats:{cat.status}" for cat in cats))
+            # RETURNING doesn't promise VALUES order, so the ids are reserved
+            # up front and inserted explicitly: cat_ids[i] is cats[i]'s id
+            query_layer.execute(cur, "cats.reserve_ids", (len(cats),))
+            cat_ids = [row[0] for row in cur.fetchall()]
+
+            values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(cats))
+            params = []
+            for cat_id, cat in zip(cat_ids, cats):
+                params += [cat_id, foster_id, cat.name, cat.age, cat.breed, cat.story,
+                           "Vaccinated" if cat.vaccinated else "Not Vaccinated", cat.status]
+            cur.execute(f"""
+                INSERT INTO cats (cat_id, foster_id, name, age, breed, bio, vaccination_status, application_status)
+                VALUES {values}
+            """, tuple(params))
+
+            photos = [(cat_id, urls) for cat_id, urls in zip(cat_ids, photo_urls) if urls]
+            if photos:
+                values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(photos))
+                params = []
+                for cat_id, urls in photos:
+                    params += [cat_id, urls["photo_url"], urls.get("thumb_card_url"), urls.get("thumb_small_url"), True]
+                cur.execute(f"""
+                    INSERT INTO cat_photos (cat_id, photo_url, thumb_card_url, thumb_small_url, is_primary)
+                    VALUES {values}
+                """, tuple(params))
+
+            self.conn.commit()
+        except Exception as e:
+            print(f"❌ Error adding {len(cats)} cat(s) for foster user #{foster_user_id}: {e}")
+            self.conn.rollback()
+            return None
+        finally:
+            cur.close()
+        self.invalidate_cache()
+        return cat_ids
+
+    @staticmethod
+    def invalidate_cache():
+        """Call after any write that adds cats or changes their availability."""
+        repository_cache.invalidate("cats")
+
+    def get_available_cats_page(self, after_id=None, page_size=DEFAULT_PAGE_SIZE, gallery=None):
+        """
+        Fetches one page of available cats for the gallery.
+
+        Returns:
+            tuple: (cats, next_cursor) where next_cursor is the cat_id to pass as
+            `after_id` for the following page, or None on the last page.
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        # Ask for one extra row so we know whether another page exists
+        cats = self.get_available_cats(after_id=after_id, limit=page_size + 1, gallery=gallery)
+        if len(cats) > page_size:
+            cats = cats[:page_size]
+            return cats, cats[-1]['id']
+        return cats, None
             
+    def search_cats(self, query, page=1, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Full-text search over the names, breeds and stories of non-adopted cats.
+
+        Every word must match, and each word also matches as a prefix
+        ("calic kit" finds a calico kitten). Results are ranked with name
+        matches above breed matches above story matches, then paginated.
+        Uses the tsvector/GIN index on PostgreSQL and the cats_fts FTS5 table
+        on SQLite (see migration 0004_cat_search).
+
+        Returns:
+            tuple: (cats, has_more) for the requested 1-based page.
+        """
+        terms = SEARCH_TERM.findall((query or "").lower())[:MAX_SEARCH_TERMS]
+        if not terms:
+            return [], False
+        page = max(1, page)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+        def load():
+            return self._query_search(terms, page_size + 1, (page - 1) * page_size)
+
+        try:
+            cats = repository_cache.get_or_load("cats", ("search", tuple(terms), page, page_size), load)
+        except psycopg2.Error as e:
+            print(f"❌ Database Error in CatRepository.search_cats: {e}")
+            if self.conn:
+                self.conn.rollback()
+            return [], False
+        except Exception as e:
+            print(f"❌ General Error in CatRepository.search_cats: {e}")
+            return [], False
+        return cats[:page_size], len(cats) > page_size
+
+    def _query_search(self, terms, limit, offset):
+        cur = self.conn.cursor()
+        if DatabaseConnection().dialect == "sqlite":
+            # FTS5: quoted tokens with * are prefix queries, spaces mean AND
+            expression = " ".join(f'"{term}"*' for term in terms)
+        else:
+            # 'calico:* & kitten:*' - every term, each as a prefix, stemmed like the column
+            expression = " & ".join(f"{term}:*" for term in terms)
+        query_layer.execute(cur, "cats.search", (expression, limit, offset))
+        cats = fetch_rows(cur, self._to_cat_row)
+        cur.close()
+        return cats
+
 # In architectural_patterns.py
 
 class UserRepository:
-    
+
+    def __init__(self):
+        # Set by each method when it checks out a connection
+        self.conn = None
+
     def create_user(self, username, email, password, full_name, user_type):
         """
         Creates a new user in the database.
+        The password is hashed (in the credential process pool) before it is stored.
         Returns the new user_id if successful, or None if failed.
         """
+        # Hash before checking out a connection: it is the slow part
+        hashed_password = password_hasher.hash(password)
         self.conn = DatabaseConnection().get_connection()
         try:
             cur = self.conn.cursor()
             
-            # SQL Query for PostgreSQL
             # Note: We are inserting into 'users'. 
             # Ideally, we should also insert into 'adopters' or 'foster_users' tables 
             # based on user_type, but let's start with the base user.
-            query = """
-                INSERT INTO users (username, email, hashed_password, full_name, user_type)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING user_id;
-            """
-            
-            # Executing the query
-            cur.execute(query, (username, email, password, full_name, user_type))
-            
-            # Commit the transaction (Save changes)
-            self.conn.commit()
+            query_layer.execute(cur, "users.create", (username, email, hashed_password, full_name, user_type))
             
             # Get the generated ID
             new_user_id = cur.fetchone()[0]
+            dashboard_stats.bump(cur, {f"users:{user_type}": 1})
+
+            # Commit the transaction (Save changes)
+            self.conn.commit()
             cur.close()
-            
+
+            # The name may have been looked up (and remembered as unknown) before
+            repository_cache.forget("users", ("unknown", username))
             return new_user_id
 
         except Exception as e:
@@ -110,36 +513,28 @@ class UserRepository:
             return None
         
     def get_user_by_username(self, username):
-        self.conn = DatabaseConnection().get_connection()
         """
         Fetches a user record by their username.
-        Returns a dictionary containing user details or None if not found.
+        Returns a UserRow (id/user_id, username, password, role, full_name) or None if not found.
+        Usernames that don't exist are cached for UNKNOWN_USER_TTL seconds
+        when the cache backend is shared between workers.
         """
+        negative_cache = repository_cache.backend.shared
+        if negative_cache and repository_cache.is_known_missing("users", ("unknown", username)):
+            return None
         try:
-            cur = self.conn.cursor()
-            
             # Select the password (hash) and role (user_type) to verify login
-            query = """
-                SELECT user_id, username, hashed_password, user_type, full_name 
-                FROM users 
-                WHERE username = %s
-            """
-            
-            cur.execute(query, (username,))
-            record = cur.fetchone()
-            cur.close()
+            record = self._lookup("users.by_username", (username,))
 
             if record:
-                # Map the database tuple to a dictionary for easy access in app.py
-                return {
-                    "user_id": record[0],
-                    "username": record[1],
-                    "password": record[2],  # This matches user_data['password'] in app.py
-                    "role": record[3],      # This matches user_data['role'] in app.py
-                    "full_name": record[4]
-                }
+                # user["password"] holds the hash; user["user_id"] is an alias of user["id"]
+                return _make_login_user(record)
+            if negative_cache:
+                repository_cache.remember_missing("users", ("unknown", username), ttl=UNKNOWN_USER_TTL)
             return None
 
+        except (DatabaseUnavailableError, PoolTimeoutError):
+            raise  # an outage, not a missing user: app.py answers 503
         except Exception as e:
             print(f"❌ Error fetching user: {e}")
             # Ensure we don't leave a transaction open if something breaks
@@ -147,83 +542,216 @@ class UserRepository:
                 self.conn.rollback()
             return None
         
-    def get_user_by_id(self, user_id):
-        """Fetches a user record by user ID."""
+    def update_password_hash(self, user_id, hashed_password):
+        """Stores an upgraded hash (legacy plaintext, or a hash made with an older cost)."""
         self.conn = DatabaseConnection().get_connection()
         try:
             cur = self.conn.cursor()
-            
-            # CRITICAL FIX: Use placeholder correctly and pass parameters separately
-            query = f"""
-                SELECT user_id, username, user_type, full_name, email 
-                FROM users 
-                WHERE user_id = {self.placeholder}
-            """
-            cur.execute(query, (user_id,))
-            row = cur.fetchone()
+            query_layer.execute(cur, "users.update_password", (hashed_password, user_id))
+            self.conn.commit()
             cur.close()
-            if row:
-                return {"id": row[0], "username": row[1], "role": row[2], "full_name": row[3], "email": row[4]}
-            return None
+            self.invalidate_profile(user_id)
+            return True
+        except Exception as e:
+            print(f"❌ Error updating password hash: {e}")
+            self.conn.rollback()
+            return False
+
+    def get_user_by_id(self, user_id):
+        """Fetches a user record by user ID."""
+        try:
+            row = self._lookup("users.by_id", (user_id,))
+            return _make_profile(row) if row else None
+        except (DatabaseUnavailableError, PoolTimeoutError):
+            raise
         except Exception as e:
             print(f"Error fetching user by id: {e}")
+            if self.conn:
+                self.conn.rollback()
             return None
+
+    def _lookup(self, statement, params):
+        """
+        Runs a single-row lookup on a read connection (a replica when one is
+        usable). A miss on a replica is asked again on the primary: the user
+        may have signed up a moment ago, and misses get cached.
+        """
+        db = DatabaseConnection()
+        self.conn = db.get_read_connection()
+        cur = query_layer.run(self.conn, statement, params)
+        record = cur.fetchone()
+        cur.close()
+        if record is None and self.conn is not db.get_connection():
+            self.conn = db.get_connection()
+            cur = query_layer.run(self.conn, statement, params)
+            record = cur.fetchone()
+            cur.close()
+        return record
+
+    def get_profile(self, user_id):
+        """Like get_user_by_id(), but served from the profile LRU when possible."""
+        return profile_cache.get_or_load("profiles", (user_id,), lambda: self.get_user_by_id(user_id))
+
+    @staticmethod
+    def invalidate_profile(user_id):
+        """Call after any write that changes a user's row."""
+        profile_cache.forget("profiles", (user_id,))
         
     
 
+class ApplicationRepository:
+    """Adopters' side of adoption_applications: submitting applications."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def submit_applications(self, submissions):
+        """
+        Files a batch of applications in ONE transaction (one commit however
+        many adopters are applying; see application_intake.ApplicationWriter).
+
+        Each application is a single INSERT ... SELECT that checks the cat is
+        still available as part of the insert, so there is no window between
+        "is the cat free?" and the write. A submission whose idempotency key
+        this adopter already used is answered with the application the key
+        created.
+
+        Args:
+            submissions (list): (user_id, cat_id, answers_json, idempotency_key)
+                tuples; the key may be None.
+
+        Returns:
+            list: one dict per submission, in order: {"outcome": ..., "app_id": ...,
+                  "status": ...}. Outcomes: "created", "replayed" (key seen
+                  before), "duplicate" (already a pending application for the
+                  cat), "key_reused" (key seen before for another cat),
+                  "unavailable" (cat adopted), "not_found" (no such cat).
+                  None if the transaction failed.
+        """
+        cur = self.conn.cursor()
+        try:
+            adopter_ids = {}
+            for user_id in sorted({submission[0] for submission in submissions}):
+                query_layer.execute(cur, "adopters.by_user", (user_id,))
+                adopter_id = cur.fetchone()[0]
+                if adopter_id is None:
+                    # Adopters get their adopters row when they first apply
+                    query_layer.execute(cur, "adopters.create", (user_id,))
+                    adopter_id = cur.fetchone()[0]
+                adopter_ids[user_id] = adopter_id
+
+            results = []
+            for user_id, cat_id, answers, key in submissions:
+                adopter_id = adopter_ids[user_id]
+                query_layer.execute(cur, "applications.submit", (adopter_id, answers, key, cat_id, adopter_id))
+                row = cur.fetchone()
+                if row:
+                    results.append({"outcome": "created", "app_id": row[0], "status": "Pending"})
+                else:
+                    # Nothing inserted: find out why (the uncommon path)
+                    results.append(self._explain_skipped(cur, adopter_id, cat_id, key))
+
+            created = sum(result["outcome"] == "created" for result in results)
+            dashboard_stats.bump(cur, {"applications:Pending": created})
+            self.conn.commit()
+            return results
+        except Exception as e:
+            print(f"❌ Error submitting {len(submissions)} application(s): {e}")
+            self.conn.rollback()
+            return None
+        finally:
+            cur.close()
+
+    @staticmethod
+    def _explain_skipped(cur, adopter_id, cat_id, key):
+        if key is not None:
+            query_layer.execute(cur, "applications.by_key", (adopter_id, key))
+            row = cur.fetchone()
+            if row:
+                outcome = "replayed" if row[1] == cat_id else "key_reused"
+                return {"outcome": outcome, "app_id": row[0], "status": row[2]}
+        query_layer.execute(cur, "applications.pending_for_cat", (adopter_id, cat_id))
+        row = cur.fetchone()
+        if row:
+            return {"outcome": "duplicate", "app_id": row[0], "status": row[2]}
+        query_layer.execute(cur, "cats.status", (cat_id,))
+        row = cur.fetchone()
+        return {"outcome": "unavailable" if row else "not_found", "app_id": None, "status": None}
+
+
 # NEW: Repository specifically for Admin tasks
 class AdminRepository:
     """Repository for administrative data fetching and modification."""
     
     def get_all_users(self):
-        self.conn = DatabaseConnection().get_connection()
+        self.conn = DatabaseConnection().get_read_connection()
         """Fetches all users except admins, excludes passwords."""
         try:
-            print("entered get_all_users in adminrepository")
-            cur = self.conn.cursor()
-            query = """
-                SELECT user_id, full_name, username, email, user_type 
-                FROM users 
-                WHERE user_type != 'admin'
-            """
-            cur.execute(query)
-            rows = cur.fetchall()
+            cur = query_layer.run(self.conn, "admin.list_users")
+            users = fetch_rows(cur, _make_listed_user)
             cur.close()
-            users = []
-            for row in rows:
-                users.append({
-                    "id": row[0], "full_name": row[1], "username": row[2], 
-                    "email": row[3], "role": row[4]
-                })
             return users
         except Exception as e:
             print(f"Error getting users: {e}")
             return []
 
+    # Admin exports: kind -> (column names, SELECT). Each query streams in primary key order.
+    EXPORTS = {
+        "cats": (
+            ("cat_id", "name", "age", "breed", "vaccination_status", "application_status", "foster_id", "bio"),
+            """SELECT cat_id, name, age, breed, vaccination_status, application_status, foster_id, bio
+               FROM cats ORDER BY cat_id"""),
+        "users": (
+            ("user_id", "username", "email", "full_name", "user_type"),
+            """SELECT user_id, username, email, full_name, user_type
+               FROM users ORDER BY user_id"""),
+        "applications": (
+            ("application_id", "submission_date", "application_status", "rejection_reason",
+             "cat_id", "cat_name", "applicant_user_id", "applicant_name", "applicant_email"),
+            """SELECT a.application_id, a.submission_date, a.application_status, a.rejection_reason,
+                      c.cat_id, c.name, u.user_id, u.full_name, u.email
+               FROM adoption_applications a
+               JOIN adopters d ON a.adopter_id = d.adopter_id
+               JOIN users u ON d.user_id = u.user_id
+               JOIN cats c ON a.cat_id = c.cat_id
+               ORDER BY a.application_id"""),
+    }
+
+    def stream_export(self, kind, batch_size=2000):
+        """
+        Yields every row of an export (see EXPORTS) as a tuple, `batch_size` at a time.
+
+        Memory stays constant however big the table is: PostgreSQL reads
+        through a server-side (named) cursor, SQLite steps its cursor lazily.
+        The generator checks out its OWN pooled connection and returns it when
+        it is exhausted or closed (client gone), since a streamed response
+        outlives the request's connection.
+        """
+        columns, query = self.EXPORTS[kind]
+        db = DatabaseConnection()
+        conn = db.pool.getconn()
+        try:
+            if db.dialect == "postgresql":
+                cur = conn.cursor(name=f"export_{kind}")  # DECLARE ... CURSOR; FETCH batch_size at a time
+            else:
+                cur = conn.cursor()
+            cur.execute(query)
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+            cur.close()
+        finally:
+            db.pool.putconn(conn)  # rolls back, which also drops the named cursor
+
     def get_pending_applications(self):
-        self.conn = DatabaseConnection().get_connection()
+        self.conn = DatabaseConnection().get_read_connection()
         """Joins Applications, Users, and Cats to get full details for pending apps."""
         try:
-            cur = self.conn.cursor()
-            # The query is complex because of the separation into `adopters` table
-            query = """
-                SELECT 
-                    a.application_id, u.full_name, c.name, a.application_status, a.cat_id, u.user_id
-                FROM adoption_applications a
-                JOIN adopters d ON a.adopter_id = d.adopter_id
-                JOIN users u ON d.user_id = u.user_id
-                JOIN cats c ON a.cat_id = c.cat_id
-                WHERE a.application_status = 'Pending'
-            """
-            cur.execute(query)
-            rows = cur.fetchall()
+            cur = query_layer.run(self.conn, "admin.pending_applications")
+            apps = fetch_rows(cur, _make_pending_application)  # user_id is the main users.user_id
             cur.close()
-            apps = []
-            for row in rows:
-                apps.append({
-                    "app_id": row[0], "applicant_name": row[1], "cat_name": row[2], 
-                    "status": row[3], "cat_id": row[4], "user_id": row[5] # user_id is the main users.user_id
-                })
             return apps
         except Exception as e:
             print(f"Error getting pending applications: {e}")
@@ -233,62 +761,194 @@ class AdminRepository:
         self.conn = DatabaseConnection().get_connection()
         """Gets deep details for the processing page by application ID."""
         try:
-            cur = self.conn.cursor()
-            
-            # Query to fetch all necessary details
-            query = f"""
-                SELECT 
-                    a.application_id, 
-                    u.full_name, u.email, u.user_type, 
-                    c.name, c.breed, c.age, c.image_url, 
-                    a.application_status, 
-                    c.cat_id, 
-                    u.user_id
-                FROM adoption_applications a
-                JOIN adopters d ON a.adopter_id = d.adopter_id
-                JOIN users u ON d.user_id = u.user_id
-                JOIN cats c ON a.cat_id = c.cat_id
-                WHERE a.application_id = {self.placeholder}
-            """
-            cur.execute(query, (app_id,))
+            cur = query_layer.run(self.conn, "admin.application_details", (app_id,))
             row = cur.fetchone()
             cur.close()
-            if row:
-                return {
-                    "id": row[0], "applicant_name": row[1], "applicant_email": row[2],
-                    "applicant_role": row[3], "cat_name": row[4], "cat_breed": row[5],
-                    "cat_age": row[6], "cat_image": row[7], "status": row[8],
-                    "cat_db_id": row[9], "user_db_id": row[10]
-                }
-            return None
+            # The template reads app.id / app.cat_db_id / app.user_db_id (aliases on ApplicationRow)
+            return _make_application_details(row) if row else None
         except Exception as e:
             print(f"Error getting application details: {e}")
             return None
 
-    def update_application_status(self, app_id, new_status, reason=None):
+    def update_application_status(self, app_id, new_status, reason=None, expected_version=None):
         """Updates the status of an application and the related cat status if approved."""
+        expected = {app_id: expected_version} if expected_version is not None else None
+        result = self.decide_applications([app_id], new_status, reason, expected)
+        return result is not None and app_id in result["decided"]
+
+    def decide_applications(self, app_ids, new_status, reason=None, expected_versions=None):
+        """
+        Approves or rejects many pending applications in ONE transaction,
+        with optimistic concurrency control instead of long row locks.
+
+        The rows are read first (no locks), then every write is a
+        compare-and-swap on the row's `version`: it only applies if the row
+        is still the version that was read, and bumps it. If another admin
+        got there first, any CAS misses, or a row lock can't be had within
+        DECISION_LOCK_TIMEOUT_MS, the whole transaction is rolled back and
+        the applications are reported as conflicts for the admin to reload.
+
+        Approving claims the cats first (Available -> Adopted), then approves
+        the applications and auto-rejects every other pending application
+        for those cats. If two selected applications compete for the same
+        cat, the oldest one wins.
+
+        Args:
+            expected_versions (dict): optional {app_id: version} the admin
+                saw; an application that has changed since is a conflict.
+
+        Returns:
+            dict: {"decided": [app_id, ...], "auto_rejected": [app_id, ...],
+                   "notifications": [row, ...], "conflicts": [app_id, ...]}
+                   or None on a database error. `notifications` holds
+                   applicant and foster contact details for every
+                   application whose status changed. When `conflicts` is
+                   non-empty nothing was changed.
+        """
         self.conn = DatabaseConnection().get_connection()
+        app_ids = sorted({int(app_id) for app_id in app_ids})
+        expected_versions = {int(app_id): int(version) for app_id, version in (expected_versions or {}).items()}
+        unchanged = {"decided": [], "auto_rejected": [], "notifications": [], "conflicts": []}
+        if not app_ids:
+            return unchanged
+        id_list = ", ".join(["%s"] * len(app_ids))
+        cur = self.conn.cursor()
         try:
-            cur = self.conn.cursor()
-            
-            # 1. Update Application Status
-            update_app_query = f"UPDATE adoption_applications SET application_status = {self.placeholder}, rejection_reason = {self.placeholder} WHERE application_id = {self.placeholder}"
-            cur.execute(update_app_query, (new_status, reason, app_id))
-            
-            # 2. If Approved, update Cat's status
+            if DatabaseConnection().dialect != "sqlite":
+                # Fail fast rather than queue behind another admin's transaction
+                cur.execute(f"SET LOCAL lock_timeout = {DECISION_LOCK_TIMEOUT_MS}")
+
+            # 1. Snapshot: the applications and their cats as they are now
+            cur.execute(f"""
+                SELECT a.application_id, a.cat_id, a.application_status, a.version,
+                       c.application_status, c.version
+                FROM adoption_applications a
+                JOIN cats c ON a.cat_id = c.cat_id
+                WHERE a.application_id IN ({id_list})
+                ORDER BY a.application_id
+            """, tuple(app_ids))
+            snapshot = cur.fetchall()
+            conflicts = [app_id for app_id, _, _, version, _, _ in snapshot
+                         if app_id in expected_versions and expected_versions[app_id] != version]
+            if conflicts:
+                self.conn.rollback()
+                return {**unchanged, "conflicts": conflicts}
+            pending = [row for row in snapshot if row[2] == 'Pending']
+            auto_rejected = []
+
             if new_status == 'Approved':
-                # First find the cat_id associated with the application
-                find_cat_query = f"SELECT cat_id FROM adoption_applications WHERE application_id = {self.placeholder}"
-                cur.execute(find_cat_query, (app_id,))
-                cat_id = cur.fetchone()[0]
-                
-                # Update Cat status
-                update_cat_query = f"UPDATE cats SET application_status = 'Adopted' WHERE cat_id = {self.placeholder}"
-                cur.execute(update_cat_query, (cat_id,))
-            
+                # The oldest selected pending application per still-available cat
+                winners = {}
+                for app_id, cat_id, _, version, cat_status, cat_version in pending:
+                    if cat_status != 'Adopted' and cat_id not in winners:
+                        winners[cat_id] = (app_id, version, cat_status, cat_version)
+                claims = sorted((cat_id, cat_version) for cat_id, (_, _, _, cat_version) in winners.items())
+                approvals = sorted((app_id, version) for app_id, version, _, _ in winners.values())
+                decided, cat_ids, approved = [], [], []
+
+                if claims:
+                    # 2. Claim the cats: only if nobody has touched them since the snapshot
+                    cur.execute(f"""
+                        UPDATE cats
+                        SET application_status = 'Adopted', version = version + 1
+                        WHERE application_status != 'Adopted'
+                          AND ({" OR ".join(["(cat_id = %s AND version = %s)"] * len(claims))})
+                        RETURNING cat_id
+                    """, tuple(value for claim in claims for value in claim))
+                    cat_ids = sorted(row[0] for row in cur.fetchall())  # a set: RETURNING order is arbitrary
+                    if len(cat_ids) < len(claims):
+                        lost = set(cat_id for cat_id, _ in claims) - set(cat_ids)
+                        self.conn.rollback()
+                        return {**unchanged, "conflicts": sorted(winners[cat_id][0] for cat_id in lost)}
+
+                    # 3. Approve the winning applications, again only if unchanged
+                    cur.execute(f"""
+                        UPDATE adoption_applications
+                        SET application_status = 'Approved', rejection_reason = NULL,
+                            decided_at = CURRENT_TIMESTAMP, version = version + 1
+                        WHERE application_status = 'Pending'
+                          AND ({" OR ".join(["(application_id = %s AND version = %s)"] * len(approvals))})
+                        RETURNING application_id, cat_id, CAST(DATE(decided_at) AS TEXT)
+                    """, tuple(value for approval in approvals for value in approval))
+                    approved = cur.fetchall()
+                    decided = sorted(row[0] for row in approved)
+                    if len(decided) < len(approvals):
+                        self.conn.rollback()
+                        return {**unchanged,
+                                "conflicts": sorted(set(app_id for app_id, _ in approvals) - set(decided))}
+
+                stats = dashboard_stats.status_change("applications", "Pending", "Approved", len(decided))
+                stats.update(f"adoptions:{row[2]}" for row in approved)
+                for _, _, cat_status, _ in winners.values():
+                    stats.update(dashboard_stats.status_change("cats", cat_status or "Available", "Adopted"))
+
+                if cat_ids:
+                    # 4. Competing applications for those cats can no longer succeed
+                    cat_list = ", ".join(["%s"] * len(cat_ids))
+                    cur.execute(f"""
+                        UPDATE adoption_applications
+                        SET application_status = 'Rejected', rejection_reason = %s,
+                            decided_at = CURRENT_TIMESTAMP, version = version + 1
+                        WHERE cat_id IN ({cat_list}) AND application_status = 'Pending'
+                        RETURNING application_id
+                    """, (AUTO_REJECT_REASON, *cat_ids))
+                    auto_rejected = sorted(row[0] for row in cur.fetchall())
+                    stats.update(dashboard_stats.status_change(
+                        "applications", "Pending", "Rejected", len(auto_rejected)))
+            else:
+                decided = []
+                if pending:
+                    cur.execute(f"""
+                        UPDATE adoption_applications
+                        SET application_status = %s, rejection_reason = %s,
+                            decided_at = CURRENT_TIMESTAMP, version = version + 1
+                        WHERE application_status = 'Pending'
+                          AND ({" OR ".join(["(application_id = %s AND version = %s)"] * len(pending))})
+                        RETURNING application_id
+                    """, (new_status, reason, *(value for row in pending for value in (row[0], row[3]))))
+                    decided = sorted(row[0] for row in cur.fetchall())
+                    if len(decided) < len(pending):
+                        self.conn.rollback()
+                        return {**unchanged, "conflicts": sorted(set(row[0] for row in pending) - set(decided))}
+                stats = dashboard_stats.status_change("applications", "Pending", new_status, len(decided))
+
+            # Dashboard counters change in the same transaction as the rows they count
+            dashboard_stats.bump(cur, stats)
+
+            # 5. One read for everyone the observers must notify
+            notifications = self._fetch_notification_rows(cur, decided + auto_rejected)
+
             self.conn.commit()
-            return True
+            if new_status == 'Approved' and decided:
+                # The cats just left the available listing
+                CatRepository.invalidate_cache()
+            return {"decided": decided, "auto_rejected": auto_rejected, "notifications": notifications,
+                    "conflicts": []}
         except Exception as e:
-            print(f"Error updating application status: {e}")
             self.conn.rollback()
-            return False
\ No newline at end of file
+            if getattr(e, "pgcode", None) == "55P03":  # lock_not_available: another decision holds the rows
+                return {**unchanged, "conflicts": app_ids}
+            print(f"Error updating application status: {e}")
+            return None
+        finally:
+            cur.close()
+
+    @staticmethod
+    def _fetch_notification_rows(cur, app_ids):
+        if not app_ids:
+            return []
+        id_list = ", ".join(["%s"] * len(app_ids))
+        cur.execute(f"""
+            SELECT 
+                a.application_id, a.application_status, a.rejection_reason,
+                u.full_name, u.email, c.name, fu.full_name, fu.email
+            FROM adoption_applications a
+            JOIN adopters d ON a.adopter_id = d.adopter_id
+            JOIN users u ON d.user_id = u.user_id
+            JOIN cats c ON a.cat_id = c.cat_id
+            LEFT JOIN foster_users f ON c.foster_id = f.foster_id
+            LEFT JOIN users fu ON f.user_id = fu.user_id
+            WHERE a.application_id IN ({id_list})
+            ORDER BY a.application_id
+        """, tuple(app_ids))
+        return fetch_rows(cur, _make_notification)
@@ -0,0 +1,305 @@
+# benchmark.py
+"""
+Reproducible benchmarks for the Flask routes and repositories.
+
+For every backend and scale, a fresh worker process seeds a database with
+generate_data.py, then times:
+  * routes through Flask's test client (/gallery, /login, /admin/applications,
+    /admin/process/<id>)
+  * repository methods called directly
+and reports p50/p95/p99 latency, throughput and peak traced memory.
+Results are written as JSON so two commits can be compared.
+
+Examples:
+    python benchmark.py --scales 0.1,1,5
+    python benchmark.py --scales 1 --postgres-url postgresql://localhost/whiskers_bench
+    python benchmark.py --compare bench_results/old.json bench_results/new.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_TABLES = ["adoption_applications", "cat_photos", "cats", "adopters", "foster_users", "admin", "users"]
+
+
+# ==========================================
+# MEASUREMENT
+# ==========================================
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def measure(name, kind, fn, iterations, warmup, memory_iterations):
+    """Times `fn` (which returns False on a failed call) and samples its peak memory."""
+    for _ in range(warmup):
+        fn()
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        if fn() is False:
+            errors += 1
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    # Separate pass: tracemalloc slows every allocation, so keep it out of the timings
+    tracemalloc.start()
+    for _ in range(memory_iterations):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "name": name,
+        "kind": kind,
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(iterations / elapsed, 1) if elapsed else 0.0,
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+# ==========================================
+# WORKER (one backend + scale, fresh process)
+# ==========================================
+def _seed(backend, scale, seed):
+    from design_patterns import DatabaseConnection
+    from migrate import apply_migrations
+    from generate_data import generate, BASE_COUNTS
+
+    db = DatabaseConnection()
+    conn = db.get_connection()
+    apply_migrations(conn, db.dialect)
+    if backend == "postgresql":
+        cur = conn.cursor()
+        cur.execute(f"TRUNCATE {', '.join(APP_TABLES)} RESTART IDENTITY CASCADE")
+        conn.commit()
+        cur.close()
+    generate(conn, db.dialect,
+             users=max(10, int(BASE_COUNTS["users"] * scale)),
+             cats=max(10, int(BASE_COUNTS["cats"] * scale)),
+             photos_per_cat=BASE_COUNTS["photos_per_cat"],
+             applications=max(10, int(BASE_COUNTS["applications"] * scale)),
+             seed=seed)
+
+    # Fixtures for the benchmarks: a real username and pending applications to decide on
+    cur = conn.cursor()
+    cur.execute("SELECT username FROM users ORDER BY user_id LIMIT 1")
+    username = cur.fetchone()[0]
+    cur.execute("SELECT application_id FROM adoption_applications "
+                "WHERE application_status = 'Pending' ORDER BY application_id")
+    pending_ids = [row[0] for row in cur.fetchall()]
+    cur.close()
+    db.release_connection()
+    return username, pending_ids
+
+
+def run_worker(args):
+    username, pending_ids = _seed(args.backend, args.scale, args.seed)
+
+    import app as webapp
+    from architectural_patterns import CatRepository, UserRepository, AdminRepository
+    from design_patterns import DatabaseConnection
+
+    flask_app = webapp.create_app()
+    client = flask_app.test_client()
+    admin = flask_app.test_client()
+    with admin.session_transaction() as session:
+        session["role"] = "admin"
+        session["username"] = "bench-admin"
+        session["logged_in"] = True
+
+    decisions = iter(pending_ids)
+
+    def route(client_, method, path, **kwargs):
+        def call():
+            response = client_.open(path, method=method, **kwargs)
+            return response.status_code < 400
+        return call
+
+    def process_next_application():
+        app_id = next(decisions, pending_ids[0] if pending_ids else 1)
+        response = admin.post(f"/admin/process/{app_id}", data={"action": "decline", "reason": "benchmark"})
+        return response.status_code < 400
+
+    def repository(fn):
+        def call():
+            with flask_app.app_context():  # same connection handling as a request
+                fn()
+        return call
+
+    first_pending = pending_ids[0] if pending_ids else 1
+    benchmarks = [
+        ("GET /gallery", "route", route(client, "GET", "/gallery")),
+        ("GET /gallery (filtered)", "route", route(client, "GET", "/gallery?min_age=1&max_age=7&breed=calico")),
+        ("GET /gallery (page 5)", "route", route(client, "GET", "/gallery?after=100")),
+        ("GET /search", "route", route(client, "GET", "/search?q=calico+kit")),
+        ("POST /login", "route", route(client, "POST", "/login",
+                                       data={"username": username, "password": "password123"})),
+        ("GET /admin/applications", "route", route(admin, "GET", "/admin/applications")),
+        ("GET /admin/process/<id>", "route", route(admin, "GET", f"/admin/process/{first_pending}")),
+        ("POST /admin/process/<id>", "route", process_next_application),
+        ("CatRepository.get_available_cats_page", "repository",
+         repository(lambda: CatRepository(DatabaseConnection().get_connection()).get_available_cats_page())),
+        ("UserRepository.get_user_by_username", "repository",
+         repository(lambda: UserRepository().get_user_by_username(username))),
+        ("AdminRepository.get_pending_applications", "repository",
+         repository(lambda: AdminRepository().get_pending_applications())),
+        ("AdminRepository.get_application_details", "repository",
+         repository(lambda: AdminRepository().get_application_details(first_pending))),
+    ]
+    if args.only:
+        benchmarks = [b for b in benchmarks if any(term.lower() in b[0].lower() for term in args.only.split(","))]
+
+    results = []
+    for name, kind, fn in benchmarks:
+        result = measure(name, kind, fn, args.iterations, args.warmup, args.memory_iterations)
+        result.update({"backend": args.backend, "scale": args.scale})
+        results.append(result)
+        print(f"[bench] {name}: p50 {result['p50_ms']}ms", file=sys.stderr)
+
+    with open(args.worker_output, "w") as f:
+        json.dump(results, f)
+
+
+# ==========================================
+# DRIVER
+# ==========================================
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def run_scale(backend, scale, args, workdir):
+    env = os.environ.copy()
+    env["NOTIFICATION_DB"] = os.path.join(workdir, "notifications.db")
+    # The benchmark logs in hundreds of times from one address
+    env["LOGIN_IP_BURST"] = env["LOGIN_USER_BURST"] = str(10 ** 9)
+    if not args.cache:
+        env["CACHE_TTL"] = "0"
+    if backend == "sqlite":
+        env.pop("DATABASE_URL", None)
+        env["SQLITE_PATH"] = os.path.join(workdir, f"bench_{scale}.db")
+    else:
+        env["DATABASE_URL"] = args.postgres_url
+
+    output = os.path.join(workdir, f"result_{backend}_{scale}.json")
+    command = [sys.executable, os.path.abspath(__file__), "--worker",
+               "--backend", backend, "--scale", str(scale), "--seed", str(args.seed),
+               "--iterations", str(args.iterations), "--warmup", str(args.warmup),
+               "--memory-iterations", str(args.memory_iterations), "--worker-output", output]
+    if args.only:
+        command += ["--only", args.only]
+    log_path = os.path.join(workdir, f"worker_{backend}_{scale}.log")
+    with open(log_path, "w") as log:
+        completed = subprocess.run(command, cwd=HERE, env=env, stdout=log, stderr=subprocess.STDOUT)
+    if completed.returncode != 0:
+        with open(log_path) as log:
+            tail = log.read()[-2000:]
+        raise RuntimeError(f"Benchmark worker failed ({backend}, scale {scale}):\n{tail}")
+    with open(output) as f:
+        return json.load(f)
+
+
+def print_table(results):
+    header = f"{'backend':<10} {'scale':>6}  {'benchmark':<42} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9} {'peak KB':>9} {'err':>4}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['backend']:<10} {r['scale']:>6}  {r['name']:<42} {r['p50_ms']:>8.2f}ms {r['p95_ms']:>7.2f}ms "
+              f"{r['p99_ms']:>7.2f}ms {r['throughput_rps']:>9.1f} {r['peak_mem_kb']:>9.1f} {r['errors']:>4}")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = {(r["backend"], r["scale"], r["name"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    print(f"{'benchmark':<52} {'old p50':>10} {'new p50':>10} {'change':>8}   {'old p95':>10} {'new p95':>10}")
+    for r in new:
+        before = old.get((r["backend"], r["scale"], r["name"]))
+        if not before:
+            continue
+        change = (r["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+        label = f"{r['backend']}@{r['scale']} {r['name']}"
+        print(f"{label:<52} {before['p50_ms']:>8.2f}ms {r['p50_ms']:>8.2f}ms {change:>+7.1f}%   "
+              f"{before['p95_ms']:>8.2f}ms {r['p95_ms']:>8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Whiskers & Wishes routes and repositories.")
+    parser.add_argument("--scales", default="0.1,1", help="comma-separated generate_data.py scales")
+    parser.add_argument("--postgres-url", help="also benchmark this (throwaway!) PostgreSQL database")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--memory-iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="comma-separated substrings of benchmark names to run")
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="disable the repository cache")
+    parser.add_argument("--output", help="JSON results path (default bench_results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    # Internal: run a single backend/scale in this process
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", default="sqlite", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=float, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.worker:
+        run_worker(args)
+        return
+
+    backends = ["sqlite"] + (["postgresql"] if args.postgres_url else [])
+    scales = [float(s) for s in args.scales.split(",")]
+    commit = _git_commit()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="whiskers_bench_") as workdir:
+        for backend in backends:
+            for scale in scales:
+                print(f"⏱️  Running {backend} at scale {scale}...")
+                results.extend(run_scale(backend, scale, args, workdir))
+
+    print_table(results)
+    output = args.output or os.path.join(HERE, "bench_results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "iterations": args.iterations,
+                "cache": args.cache,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
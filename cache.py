@@ -0,0 +1,213 @@
+# cache.py
+"""
+Read-through cache for repository queries.
+
+Entries are grouped into namespaces ("cats", ...). Writes call
+`repository_cache.invalidate(namespace)`, which bumps that namespace's
+generation number so every older entry stops matching at once, without
+having to find and delete keys one by one. Because the generation lives in the
+backend too, a shared backend (Redis) invalidates across all gunicorn workers.
+"""
+import os
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Stored in place of a value to remember that a lookup found nothing (a tuple,
+# so it still compares equal after a pickle round trip through Redis)
+_MISSING = ("__repository_cache_missing__",)
+
+
+class CacheBackend(ABC):
+    """Storage used by RepositoryCache. get() returns None on a miss."""
+
+    # True when every worker sees the same entries (so forget() reaches them all)
+    shared = False
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def get_counter(self, key):
+        pass
+
+    @abstractmethod
+    def incr(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+class InMemoryBackend(CacheBackend):
+    """Per-process LRU with a TTL on every entry."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}  # generations live outside the LRU so they are never evicted
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache for multiple workers (needs the optional `redis` package)."""
+
+    shared = True
+
+    def __init__(self, url, prefix="whiskers:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def get_counter(self, key):
+        raw = self._client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key):
+        return self._client.incr(self.prefix + key)
+
+
+class RepositoryCache:
+    """
+    Read-through cache with namespace invalidation and hit/miss counters.
+
+    Cached values are shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, backend, default_ttl=60):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self._stats = {}  # namespace -> {"hits": n, "misses": n, "invalidations": n}
+        self._listeners = {}  # namespace -> [callback]
+        self._lock = threading.Lock()
+
+    def _count(self, namespace, field):
+        with self._lock:
+            counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+            counters[field] += 1
+
+    def _key(self, namespace, key_parts):
+        generation = self.backend.get_counter(f"{namespace}:generation")
+        return f"{namespace}:{generation}:{key_parts!r}"
+
+    def get_or_load(self, namespace, key_parts, loader, ttl=None):
+        """
+        Returns the cached value for (namespace, key_parts), calling `loader()`
+        and storing its result on a miss. Exceptions from the loader propagate
+        and nothing is cached.
+        """
+        key = self._key(namespace, key_parts)
+        value = self.backend.get(key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return value
+        self._count(namespace, "misses")
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value, self.default_ttl if ttl is None else ttl)
+        return value
+
+    def is_known_missing(self, namespace, key_parts):
+        """True if `remember_missing()` recorded this key and it hasn't expired or been invalidated."""
+        missing = self.backend.get(self._key(namespace, key_parts)) == _MISSING
+        self._count(namespace, "hits" if missing else "misses")
+        return missing
+
+    def remember_missing(self, namespace, key_parts, ttl=None):
+        """Caches a negative lookup, so repeated lookups of a nonexistent key skip the database."""
+        self.backend.set(self._key(namespace, key_parts), _MISSING, self.default_ttl if ttl is None else ttl)
+
+    def forget(self, namespace, key_parts):
+        self.backend.delete(self._key(namespace, key_parts))
+
+    def invalidate(self, namespace):
+        """Drops every entry in `namespace` (in all workers, for a shared backend)."""
+        self.backend.incr(f"{namespace}:generation")
+        self._count(namespace, "invalidations")
+        for callback in self._listeners.get(namespace, []):
+            callback(namespace)
+
+    def on_invalidate(self, namespace, callback):
+        """Registers `callback(namespace)` to run whenever the namespace is invalidated."""
+        self._listeners.setdefault(namespace, []).append(callback)
+
+    def stats(self):
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._stats.items()}
+
+
+def build_cache_from_env():
+    backend_name = os.environ.get("CACHE_BACKEND", "memory").lower()
+    if backend_name == "redis":
+        backend = RedisBackend(os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    else:
+        backend = InMemoryBackend(max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", 1024)))
+    return RepositoryCache(backend, default_ttl=float(os.environ.get("CACHE_TTL", 60)))
+
+
+# Shared by all repositories in this process
+repository_cache = build_cache_from_env()
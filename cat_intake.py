@@ -0,0 +1,171 @@
+# cat_intake.py
+"""
+Foster intake: turning a form post or a spreadsheet into cats.
+
+A foster can add one cat with the form, or many at once by uploading a
+spreadsheet (CSV, or .xlsx when openpyxl is installed) together with the
+photos it names. Every row is validated and built with CatBuilder
+BEFORE anything is written. If any row is invalid the foster gets the full
+list of problems and nothing is saved; otherwise
+CatRepository.add_cats() inserts the whole batch in one transaction.
+
+Spreadsheet columns (header row required, case-insensitive):
+    name, age, breed, story, status, vaccinated, photo
+`photo` is the file name of one of the uploaded photos.
+"""
+import csv
+import io
+import os
+from dotenv import load_dotenv
+from design_patterns import CatBuilder
+import image_pipeline
+from image_pipeline import ImageValidationError
+
+load_dotenv()
+
+MAX_CATS_PER_UPLOAD = int(os.environ.get("INTAKE_MAX_CATS", 200))
+COLUMNS = ("name", "age", "breed", "story", "status", "vaccinated", "photo")
+STATUSES = ("Available", "Urgent")
+MAX_AGE = 30
+_YES = ("yes", "y", "true", "1", "vaccinated")
+_NO = ("", "no", "n", "false", "0", "not vaccinated")
+
+
+class IntakeError(ValueError):
+    """The upload as a whole can't be read (shown to the foster)."""
+
+
+# ==========================================
+# 1. READING UPLOADS
+# ==========================================
+def _read_xlsx(data):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise IntakeError("Excel files need the 'openpyxl' package on the server; upload a CSV instead.") from e
+    try:
+        sheet = load_workbook(io.BytesIO(data), read_only=True, data_only=True).worksheets[0]
+    except Exception as e:
+        raise IntakeError("The spreadsheet could not be read.") from e
+    return [["" if value is None else str(value) for value in row] for row in sheet.iter_rows(values_only=True)]
+
+
+def read_spreadsheet(filename, data):
+    """
+    Parses an uploaded .csv or .xlsx file.
+
+    Returns:
+        list: one dict per data row, keyed by the lower-cased header names.
+    """
+    if filename.lower().endswith(".xlsx"):
+        table = _read_xlsx(data)
+    else:
+        try:
+            text = data.decode("utf-8-sig")  # Excel's "CSV UTF-8" starts with a BOM
+        except UnicodeDecodeError as e:
+            raise IntakeError("CSV files must be UTF-8 encoded.") from e
+        table = list(csv.reader(io.StringIO(text)))
+
+    table = [row for row in table if any(cell.strip() for cell in row)]
+    if not table:
+        raise IntakeError("The spreadsheet is empty.")
+    header = [cell.strip().lower() for cell in table[0]]
+    if "name" not in header:
+        raise IntakeError(f"The first row must be a header with at least a 'name' column ({', '.join(COLUMNS)}).")
+    rows = [dict(zip(header, (cell.strip() for cell in row))) for row in table[1:]]
+    if not rows:
+        raise IntakeError("The spreadsheet has a header but no cats.")
+    if len(rows) > MAX_CATS_PER_UPLOAD:
+        raise IntakeError(f"At most {MAX_CATS_PER_UPLOAD} cats can be added per upload (got {len(rows)}).")
+    return rows
+
+
+# ==========================================
+# 2. VALIDATION + BUILDING
+# ==========================================
+def build_cat(row):
+    """
+    Validates one row and builds it with CatBuilder.
+
+    Returns:
+        tuple: (cat, problems) - cat is None when problems is non-empty.
+    """
+    problems = []
+    name = row.get("name", "")
+    if not name:
+        problems.append("name is required")
+    elif len(name) > 50:
+        problems.append("name must be at most 50 characters")
+
+    age = row.get("age", "")
+    try:
+        age = int(float(age)) if age else None  # spreadsheets like to write 3 as 3.0
+        if age is not None and not 0 <= age <= MAX_AGE:
+            raise ValueError
+    except (ValueError, OverflowError):  # OverflowError: "inf", "1e400"
+        problems.append(f"age must be a whole number of years between 0 and {MAX_AGE}")
+
+    breed = row.get("breed", "")
+    if len(breed) > 50:
+        problems.append("breed must be at most 50 characters")
+
+    status = (row.get("status") or "Available").capitalize()
+    if status not in STATUSES:
+        problems.append(f"status must be one of {', '.join(STATUSES)}")
+
+    vaccinated = row.get("vaccinated", "").lower()
+    if vaccinated not in _YES + _NO:
+        problems.append("vaccinated must be yes or no")
+
+    if problems:
+        return None, problems
+    cat = (CatBuilder()
+           .set_name(name)
+           .set_age(age)
+           .set_breed(breed or None)
+           .set_story(row.get("story") or "")
+           .set_status(status)
+           .set_vaccinated(vaccinated in _YES)
+           .build())
+    return cat, []
+
+
+def build_batch(rows, photos, numbered=True):
+    """
+    Validates and builds every row, then processes the photos they name.
+
+    Args:
+        rows (list): dicts from read_spreadsheet() (or the single-cat form).
+        photos (dict): uploaded file name -> bytes.
+        numbered (bool): prefix problems with their spreadsheet row.
+
+    Returns:
+        tuple: (cats, photo_urls, errors). photo_urls[i] is the
+        image_pipeline result for cats[i] or None. errors is a list of
+        "Row n: ..." messages; when it is non-empty nothing should be saved.
+    """
+    cats, wanted, errors = [], [], []
+    for number, row in enumerate(rows, start=2):  # row 1 is the header
+        cat, problems = build_cat(row)
+        photo = row.get("photo", "")
+        if photo and photo not in photos:
+            problems.append(f"photo '{photo}' was not among the uploaded files")
+        if problems:
+            message = "; ".join(problems)
+            prefix = f"Row {number} ({row.get('name') or 'unnamed'}): " if numbered else ""
+            errors.append(f"{prefix}{message[0].upper()}{message[1:]}.")
+        cats.append(cat)
+        wanted.append(photo or None)
+    if errors:
+        return [], [], errors
+
+    # Resize each distinct photo once, even if several rows share it
+    processed = {}
+    for name in {photo for photo in wanted if photo}:
+        try:
+            processed[name] = image_pipeline.process_upload(photos[name])
+        except ImageValidationError as e:
+            errors.append(f"Photo '{name}': {e}")
+    if errors:
+        return [], [], errors
+    return cats, [processed.get(photo) for photo in wanted], []
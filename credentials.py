@@ -0,0 +1,197 @@
+# credentials.py
+"""
+Password hashing and login throttling.
+
+Hashing is deliberately expensive (scrypt by default), so it never runs on
+a request thread's CPU time: PasswordHasher hands every hash and check to a
+small process pool. A request only waits on the result. It has already
+returned its database connection to the pool and does not hold the GIL, so
+gallery requests in the same worker keep running. When more checks are
+waiting than PASSWORD_HASH_MAX_PENDING, new logins fail fast with
+HasherBusyError instead of piling up.
+
+LoginThrottle is an in-memory token bucket per client IP and per username.
+It stops a login storm before it reaches the hasher.
+"""
+import functools
+import hmac
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+from werkzeug.security import check_password_hash, generate_password_hash
+
+load_dotenv()
+
+# werkzeug method string, e.g. "scrypt", "scrypt:65536:8:1" or "pbkdf2:sha256:600000"
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+KNOWN_HASH_PREFIXES = ("scrypt:", "pbkdf2:")
+
+
+class HasherBusyError(RuntimeError):
+    """Too many password checks are already queued; the client should retry later."""
+
+
+# ==========================================
+# 1. HASHING (runs in worker processes)
+# ==========================================
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+@functools.lru_cache(maxsize=None)
+def _method_prefix(method):
+    # e.g. "scrypt" -> "scrypt:32768:8:1"; computed once per worker process
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def _verify(stored, password, method):
+    """Returns (matches, new_hash). new_hash is set when the stored value should be upgraded."""
+    if not stored.startswith(KNOWN_HASH_PREFIXES):
+        # Legacy row holding a plaintext password: compare, then upgrade it to a real hash
+        matches = hmac.compare_digest(stored.encode(), password.encode())
+        return matches, (generate_password_hash(password, method=method) if matches else None)
+
+    if not check_password_hash(stored, password):
+        return False, None
+    if stored.split("$", 1)[0] != _method_prefix(method):
+        # The cost (or algorithm) was raised since this hash was made
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class PasswordHasher:
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=1, max_pending=8, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # fork: the children only run _hash/_verify and never touch the app's state
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"))
+            return self._executor
+
+    def start(self):
+        """Forks the worker processes now, before the app starts its own threads."""
+        if self.workers > 0:
+            self._get_executor().submit(_hash, "", "pbkdf2:sha256:1").result()
+        return self
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)  # PASSWORD_HASH_WORKERS=0: hash inline (tests, single-threaded tools)
+        if not self._pending.acquire(blocking=False):
+            raise HasherBusyError("Too many password checks in progress")
+        try:
+            try:
+                return self._get_executor().submit(fn, *args).result(self.timeout)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool and retry once
+                with self._lock:
+                    self._executor = None
+                return self._get_executor().submit(fn, *args).result(self.timeout)
+        except TimeoutError as e:
+            raise HasherBusyError("Password check timed out") from e
+        finally:
+            self._pending.release()
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method)
+
+    def verify(self, stored, password):
+        """
+        Checks `password` against the stored hash (or legacy plaintext).
+
+        Returns:
+            tuple: (matches, new_hash) - store new_hash when it is not None.
+        """
+        if not stored or password is None:
+            return False, None
+        return self._run(_verify, stored, password, self.method)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# ==========================================
+# 2. LOGIN THROTTLING (token buckets)
+# ==========================================
+class TokenBucket:
+    """`burst` attempts at once, refilled at `per_minute` attempts per minute, per key."""
+
+    def __init__(self, burst, per_minute, max_keys=10000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Spends one token. Returns 0 if allowed, otherwise the seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = self._buckets[key] = [self.burst, now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / self.rate if self.rate else float("inf")
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no information
+        full = [key for key, (tokens, last) in self._buckets.items()
+                if tokens + (now - last) * self.rate >= self.burst]
+        for key in full:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()  # under a flood of distinct keys, forget rather than grow
+
+
+class LoginThrottle:
+    def __init__(self, ip_bucket, user_bucket):
+        self.ip_bucket = ip_bucket
+        self.user_bucket = user_bucket
+
+    def check(self, ip, username):
+        """Returns 0 if this attempt may proceed, otherwise seconds to wait."""
+        wait = self.ip_bucket.take(ip or "-")
+        if wait:
+            return wait
+        return self.user_bucket.take((username or "").lower())
+
+
+def build_hasher_from_env():
+    return PasswordHasher(
+        method=PASSWORD_HASH_METHOD,
+        workers=int(os.environ.get("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2))),
+        max_pending=int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 8)),
+    )
+
+
+def build_throttle_from_env():
+    return LoginThrottle(
+        TokenBucket(burst=int(os.environ.get("LOGIN_IP_BURST", 20)),
+                    per_minute=float(os.environ.get("LOGIN_IP_PER_MINUTE", 10))),
+        TokenBucket(burst=int(os.environ.get("LOGIN_USER_BURST", 5)),
+                    per_minute=float(os.environ.get("LOGIN_USER_PER_MINUTE", 2))),
+    )
+
+
+# Shared by the login/registration code in this process
+password_hasher = build_hasher_from_env()
@@ -0,0 +1,265 @@
+# dashboard_stats.py
+"""
+Denormalized counters for the admin dashboard.
+
+The dashboard_stats table holds one row per counter:
+  * applications:<status>  - adoption applications by status
+  * cats:<status>          - cats by application_status
+  * users:<user_type>      - accounts by role
+  * adoptions:<YYYY-MM-DD> - applications approved that day
+Every write that changes one of these numbers calls bump() with its
+cursor, so the counters change in the same transaction as the rows they
+count. The dashboard reads the whole table with one small query, whatever
+the size of cats or adoption_applications.
+
+reconcile() recounts every counter from the base tables, corrects any
+drift, and drops day counters older than STATS_ADOPTION_DAYS. It covers
+bulk loads, manual SQL and bugs. It takes no table lock: the counters and
+the recount are read from one snapshot, and the corrections are applied
+as increments, so writes keep bumping counters throughout.
+`python dashboard_stats.py reconcile` runs it once (e.g. from cron);
+StatsReconciler runs it in the background every STATS_RECONCILE_MINUTES,
+and a lease row in the table lets only one worker of the deployment run
+each round.
+
+Day counters use the database's date (DATE(decided_at), CURRENT_DATE),
+never the web server's clock.
+"""
+import os
+import threading
+from collections import Counter
+import time
+from datetime import date, timedelta
+from dotenv import load_dotenv
+import query_layer
+
+load_dotenv()
+
+ADOPTION_DAYS = int(os.environ.get("STATS_ADOPTION_DAYS", 35))
+
+query_layer.register({
+    "stats.bump": """
+        INSERT INTO dashboard_stats (stat_key, value) VALUES (%s, %s)
+        ON CONFLICT (stat_key) DO UPDATE SET value = dashboard_stats.value + excluded.value
+    """,
+    "stats.read_all": "SELECT stat_key, value FROM dashboard_stats",
+    "stats.today": "SELECT CAST(CURRENT_DATE AS TEXT)",
+    "stats.create_lease": """
+        INSERT INTO dashboard_stats (stat_key, value) VALUES (%s, 0)
+        ON CONFLICT (stat_key) DO NOTHING
+    """,
+    "stats.claim_lease": "UPDATE dashboard_stats SET value = %s WHERE stat_key = %s AND value <= %s",
+})
+
+# Not a counter: when StatsReconciler last ran (epoch seconds), see claim_round()
+LEASE_KEY = "reconciler:last_run"
+
+# Each query yields (stat_key, value) rows computed from the base tables
+_RECOUNT = (
+    """SELECT 'applications:' || COALESCE(application_status, 'Pending'), COUNT(*)
+       FROM adoption_applications GROUP BY 1""",
+    """SELECT 'cats:' || COALESCE(application_status, 'Available'), COUNT(*)
+       FROM cats GROUP BY 1""",
+    """SELECT 'users:' || user_type, COUNT(*)
+       FROM users GROUP BY 1""",
+    """SELECT 'adoptions:' || CAST(DATE(decided_at) AS TEXT), COUNT(*)
+       FROM adoption_applications
+       WHERE application_status = 'Approved' AND decided_at >= %s GROUP BY 1""",
+)
+
+
+def _today(conn):
+    """Today by the database's clock, the same one DATE(decided_at) uses for the adoptions: keys."""
+    cur = query_layer.run(conn, "stats.today")
+    today = date.fromisoformat(cur.fetchone()[0][:10])
+    cur.close()
+    return today
+
+
+# ==========================================
+# 1. WRITING (inside the caller's transaction)
+# ==========================================
+def bump(cur, deltas):
+    """
+    Adds `deltas` ({stat_key: +/-n}) to the counters using the caller's
+    cursor. The caller commits or rolls back together with its own rows.
+    """
+    # Sorted, so two transactions touching the same counters lock them in the same order
+    changes = sorted((key, value) for key, value in deltas.items() if value)
+    if changes:
+        query_layer.execute_many(cur, "stats.bump", changes)
+
+
+def status_change(prefix, old_status, new_status, count=1):
+    """Deltas for `count` rows moving from one status to another."""
+    deltas = Counter()
+    deltas[f"{prefix}:{old_status}"] -= count
+    deltas[f"{prefix}:{new_status}"] += count
+    return deltas
+
+
+# ==========================================
+# 2. READING
+# ==========================================
+def read_all(conn):
+    cur = query_layer.run(conn, "stats.read_all")
+    stats = {key: value for key, value in cur.fetchall()}
+    cur.close()
+    return stats
+
+
+def summary(conn):
+    """The figures the /admin dashboard shows, from one read of dashboard_stats."""
+    stats = read_all(conn)
+    today = _today(conn)
+
+    def group(prefix):
+        return {key[len(prefix) + 1:]: value for key, value in sorted(stats.items())
+                if key.startswith(prefix + ":") and value}
+
+    week = [(today - timedelta(days=n)).isoformat() for n in range(7)]
+    return {
+        "applications": group("applications"),
+        "cats": group("cats"),
+        "users": group("users"),
+        "pending_applications": stats.get("applications:Pending", 0),
+        "adoptions_this_week": sum(stats.get(f"adoptions:{day}", 0) for day in week),
+    }
+
+
+# ==========================================
+# 3. RECONCILIATION
+# ==========================================
+def reconcile(conn, dialect):
+    """
+    Recounts every counter from the base tables and corrects the drift.
+
+    No lock is taken. The counters and the recount come from one read
+    snapshot, so a bump committed during the recount is in both or in
+    neither. The corrections are then added as increments (like bump()),
+    which stay right whatever was bumped since.
+
+    Returns:
+        dict: {stat_key: correction} for every counter that had drifted.
+    """
+    cur = conn.cursor()
+    try:
+        # 1. One consistent snapshot of the counters and the base tables
+        if dialect == "sqlite":
+            cur.execute("BEGIN")  # a read transaction: later statements see the same data
+        else:
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        cutoff = (_today(conn) - timedelta(days=ADOPTION_DAYS)).isoformat()
+        cur.execute("SELECT stat_key, value FROM dashboard_stats")
+        before = {key: value for key, value in cur.fetchall() if not key.startswith("reconciler:")}
+        after = {}
+        for query in _RECOUNT:
+            cur.execute(query, (cutoff,) if "%s" in query else ())
+            after.update((key, value) for key, value in cur.fetchall())
+        conn.commit()
+
+        drift = {}
+        for key in before.keys() | after.keys():
+            if key.startswith("adoptions:") and key < f"adoptions:{cutoff}":
+                continue  # pruned below, not drift
+            if after.get(key, 0) != before.get(key, 0):
+                drift[key] = after.get(key, 0) - before.get(key, 0)
+
+        # 2. A short write: the corrections as increments, then drop old day counters
+        bump(cur, drift)
+        cur.execute("DELETE FROM dashboard_stats WHERE stat_key LIKE 'adoptions:%%' AND stat_key < %s",
+                    (f"adoptions:{cutoff}",))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return drift
+
+
+def claim_round(conn, interval):
+    """
+    True if this process should run the reconciliation round that is due:
+    an atomic compare-and-set on the lease row, so however many workers
+    try, one wins per `interval`.
+    """
+    now = int(time.time())
+    cur = conn.cursor()
+    try:
+        query_layer.execute(cur, "stats.create_lease", (LEASE_KEY,))
+        # A little slack, so the winner's own next timer isn't beaten by its claim time
+        query_layer.execute(cur, "stats.claim_lease", (now, LEASE_KEY, now - int(interval * 0.9)))
+        claimed = cur.rowcount == 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return claimed
+
+
+class StatsReconciler:
+    """
+    Tries reconcile() at start and then every `interval` seconds, on a
+    daemon thread. Every gunicorn worker has one, but only the worker that
+    claims the round (claim_round) actually recounts.
+    """
+
+    def __init__(self, interval=3600):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stats-reconciler", daemon=True)
+        self._thread.start()
+        print(f"[Stats] Dashboard counters reconciled every {self.interval / 60:g} min.")
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run_once(self):
+        from design_patterns import DatabaseConnection
+        db = DatabaseConnection()
+        conn = db.pool.getconn()
+        try:
+            if not claim_round(conn, self.interval):
+                return None  # another worker has this round
+            drift = reconcile(conn, db.dialect)
+        finally:
+            db.pool.putconn(conn)
+        if drift:
+            print(f"⚠️ [Stats] Corrected {len(drift)} drifted counter(s): {drift}")
+        return drift
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ [Stats] Reconciliation failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+
+def build_reconciler_from_env():
+    return StatsReconciler(interval=float(os.environ.get("STATS_RECONCILE_MINUTES", 60)) * 60)
+
+
+if __name__ == "__main__":
+    import sys
+    from design_patterns import DatabaseConnection
+
+    db = DatabaseConnection()
+    conn = db.get_connection()
+    if len(sys.argv) > 1 and sys.argv[1] == "reconcile":
+        drift = reconcile(conn, db.dialect)
+        print(f"✅ Reconciled; {len(drift)} counter(s) corrected: {drift}" if drift else "✅ All counters were accurate.")
+    else:
+        print(summary(conn))
+    db.release_connection()
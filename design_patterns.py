@@ -5,11 +5,337 @@ from functools import wraps
 from dotenv import load_dotenv
 from flask import session
 import psycopg2
+from query_stats import InstrumentedConnection, query_stats
+from query_layer import DialectConnection, SQLITE_STATEMENT_CACHE
 # ==========================================
 # 1. SINGLETON PATTERN (Database Connection)
 # ==========================================
 
+import itertools
+import random
 import threading
+import time
+from collections import deque
+from flask import g, has_app_context, has_request_context, request
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the timeout expired."""
+
+
+class DatabaseUnavailableError(Exception):
+    """Raised when the database could not be reached, even after retrying."""
+
+
+def connect_with_retry(connect, attempts=3, base_delay=0.2, max_delay=2.0):
+    """
+    Wraps a `connect()` callable so transient failures (database restarting,
+    network blip) are retried with exponential backoff and jitter instead of
+    failing the first request that needs a connection.
+    """
+    def connect_retrying():
+        for attempt in range(1, attempts + 1):
+            try:
+                return connect()
+            except (psycopg2.OperationalError, sqlite3.OperationalError) as e:
+                if attempt == attempts:
+                    raise DatabaseUnavailableError(
+                        f"Database unreachable after {attempts} attempts: {e}") from e
+                delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                print(f"[Pool] Connection attempt {attempt} failed ({e}); retrying in {delay:.2f}s.")
+                time.sleep(delay)
+    return connect_retrying
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of DB-API connections.
+
+    Connections are opened lazily up to `max_size`, `min_size` of them are kept
+    warm, and every checkout is health-checked so a dropped socket never reaches
+    a repository.
+    """
+    def __init__(self, connect, min_size=1, max_size=10, timeout=5.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = deque()
+        self._size = 0  # connections currently open (idle + checked out)
+        self._closed = False
+        self._cond = threading.Condition()
+        # Checkouts that had to wait for a connection: [count, seconds, max seconds, timeouts]
+        self._waits = [0, 0.0, 0.0, 0]
+
+    def fill(self):
+        """Opens connections until `min_size` are available."""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def getconn(self, timeout=None):
+        """Checks out a healthy connection, waiting up to `timeout` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            conn = None
+            waited = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        if timeout > 0:
+                            self._record_wait(time.monotonic() - started, timed_out=True)
+                        raise PoolTimeoutError(
+                            f"No database connection available within {timeout}s (max_size={self.max_size})")
+                    waited = True
+                    self._cond.wait(remaining)
+                if waited:
+                    self._record_wait(time.monotonic() - started)
+
+            if conn is None:
+                # We reserved a slot above, now open the connection outside the lock
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._is_healthy(conn):
+                return conn
+            print("[Pool] Discarding broken connection found on checkout.")
+            self._discard(conn)
+
+    def putconn(self, conn, discard=False):
+        """Returns a connection to the pool, rolling back anything left open."""
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            if not discard and not self._closed:
+                self._idle.append(conn)
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._discard(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(conn):
+        if getattr(conn, "closed", 0):  # psycopg2 exposes a non-zero `closed` once the socket is gone
+            return False
+        conn = getattr(conn, "raw", conn)  # keep health checks out of the query stats
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            conn.rollback()  # don't leave the health check's implicit transaction open
+            return True
+        except Exception:
+            return False
+
+    def _record_wait(self, seconds, timed_out=False):
+        # Called with self._cond held
+        self._waits[0] += 1
+        self._waits[1] += seconds
+        self._waits[2] = max(self._waits[2], seconds)
+        self._waits[3] += timed_out
+
+    def stats(self):
+        with self._cond:
+            waits, wait_seconds, max_wait, timeouts = self._waits
+            return {"size": self._size, "idle": len(self._idle), "max_size": self.max_size,
+                    "waits": waits, "wait_seconds": wait_seconds, "max_wait_seconds": max_wait,
+                    "timeouts": timeouts}
+
+
+# Seconds a PostgreSQL standby is behind: 0 when it has replayed everything it
+# received (or is not a standby at all), NULL when it can't tell
+_POSTGRES_LAG_SQL = """
+    SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END
+"""
+
+
+def postgres_replica_lag(conn):
+    cur = getattr(conn, "raw", conn).cursor()  # keep lag checks out of the query stats
+    try:
+        cur.execute(_POSTGRES_LAG_SQL)
+        lag = cur.fetchone()[0]
+    finally:
+        cur.close()
+        conn.rollback()
+    return float("inf") if lag is None else float(lag)
+
+
+def sqlite_file_lag(primary_path, replica_path):
+    """
+    Local stand-in for replication lag: a replica file is a copy of the
+    primary (e.g. `sqlite3 whiskers_wishes.db ".backup replica1.db"`), and it
+    lags by however long the primary has been written to since the copy.
+    """
+    def modified(path):
+        return max((os.path.getmtime(p) for p in (path, path + "-wal") if os.path.exists(p)), default=0.0)
+
+    def measure(conn):
+        return max(0.0, modified(primary_path) - modified(replica_path))
+    return measure
+
+
+class Replica:
+    """A read replica: its own connection pool plus what we last learned about its lag."""
+
+    def __init__(self, name, pool, measure_lag):
+        self.name = name
+        self.pool = pool
+        self.measure_lag = measure_lag
+        self.lag = 0.0          # seconds behind the primary at the last check
+        self.checked_at = None  # time.monotonic() of the last lag check
+        self.down_until = 0.0   # skipped until then after a connection failure
+        self.reads = 0
+        self._checking = threading.Lock()
+
+
+class ReplicaSet:
+    """
+    Picks a replica for each unit of read-only work.
+
+    Replicas are tried round-robin. One is skipped while it is down (for
+    `retry_after` seconds after a failed connection), busy (its pool has no
+    free connection right now) or more than `max_lag` seconds behind, which
+    is re-measured at most every `check_interval` seconds on a connection
+    that is being checked out anyway. When no replica qualifies the caller
+    falls back to the primary.
+    """
+    def __init__(self, replicas, max_lag=5.0, check_interval=2.0, retry_after=30.0):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self.fallbacks = 0  # reads sent to the primary because no replica qualified
+        self._turn = itertools.count()
+
+    def checkout(self):
+        """Returns (replica, connection), or None when the primary should serve the read."""
+        start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            now = time.monotonic()
+            if replica.down_until > now:
+                continue
+            try:
+                conn = replica.pool.getconn(timeout=0)  # never queue behind a busy replica
+            except PoolTimeoutError:
+                continue
+            except Exception as e:
+                self._mark_down(replica, e)
+                continue
+            due = replica.checked_at is None or now - replica.checked_at >= self.check_interval
+            if due and replica._checking.acquire(blocking=False):
+                try:
+                    replica.lag = replica.measure_lag(conn)
+                    replica.checked_at = now
+                except Exception as e:
+                    replica.pool.putconn(conn, discard=True)
+                    self._mark_down(replica, e)
+                    continue
+                finally:
+                    replica._checking.release()
+            if replica.lag > self.max_lag:
+                replica.pool.putconn(conn)
+                continue
+            replica.reads += 1
+            return replica, conn
+        self.fallbacks += 1
+        return None
+
+    def _mark_down(self, replica, error):
+        replica.down_until = time.monotonic() + self.retry_after
+        print(f"[Replicas] {replica.name} unavailable ({error}); reading from the primary "
+              f"for the next {self.retry_after:g}s.")
+
+    def stats(self):
+        now = time.monotonic()
+        return [{"name": r.name, "lag": r.lag, "up": r.down_until <= now, "reads": r.reads, **r.pool.stats()}
+                for r in self.replicas]
+
+
+def build_replica_set(dialect, primary_path=None):
+    """
+    Replicas from DATABASE_REPLICA_URLS (PostgreSQL) or SQLITE_REPLICA_PATHS
+    (local SQLite files), both comma-separated. Returns None when none are set.
+    """
+    if dialect == "postgresql":
+        targets = [url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    else:
+        targets = [path.strip() for path in os.environ.get("SQLITE_REPLICA_PATHS", "").split(",") if path.strip()]
+    if not targets:
+        return None
+
+    replicas = []
+    for number, target in enumerate(targets, start=1):
+        if dialect == "postgresql":
+            connect = lambda url=target: InstrumentedConnection(
+                DialectConnection(psycopg2.connect(url), "postgresql"), query_stats)
+            measure_lag = postgres_replica_lag
+        else:
+            # Read-only, so a routing mistake fails loudly instead of writing to a copy
+            connect = lambda path=target: InstrumentedConnection(DialectConnection(
+                sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False,
+                                cached_statements=SQLITE_STATEMENT_CACHE), "sqlite"), query_stats)
+            measure_lag = sqlite_file_lag(primary_path, target)
+        # One attempt: a replica that is down is skipped, not waited for
+        pool = ConnectionPool(connect_with_retry(connect, attempts=1), min_size=0,
+                              max_size=int(os.environ.get("DB_POOL_MAX_SIZE", 10)))
+        replicas.append(Replica(f"replica{number}", pool, measure_lag))
+    return ReplicaSet(replicas,
+                      max_lag=float(os.environ.get("REPLICA_MAX_LAG_SECONDS", 5)),
+                      check_interval=float(os.environ.get("REPLICA_LAG_CHECK_SECONDS", 2)),
+                      retry_after=float(os.environ.get("REPLICA_RETRY_SECONDS", 30)))
+
 
 class DatabaseConnection:
     _instance = None
@@ -27,22 +353,53 @@ class DatabaseConnection:
                     temp_instance = super(DatabaseConnection, cls).__new__(cls)
                     
                     # 3. Connection Logic
+                    # The Singleton now owns a pool instead of one shared connection,
+                    # so concurrent requests no longer serialize on a single socket.
+                    # Nothing connects here: the pool opens connections on first use
+                    # (with retries), so importing the app never waits on the database.
                     try:
                         db_url = os.environ.get("DATABASE_URL")
+                        # Every connection is wrapped twice: DialectConnection renders the
+                        # repositories' %s SQL for the backend and keeps its prepared
+                        # statements (query_layer.py); InstrumentedConnection times queries.
+                        sqlite_path = None
                         if db_url:
                             # Render / PostgreSQL
-                            temp_instance.connection = psycopg2.connect(db_url)
-                            print("[Singleton] Connected to Render PostgreSQL Database.")
+                            temp_instance.dialect = "postgresql"
+                            connect = lambda: InstrumentedConnection(
+                                DialectConnection(psycopg2.connect(db_url), "postgresql"), query_stats)
                         else:
                             # Local / SQLite
-                            temp_instance.connection = sqlite3.connect('whiskers_wishes.db', check_same_thread=False)
-                            print("[Singleton] Connected to Local SQLite Database.")
+                            temp_instance.dialect = "sqlite"
+                            sqlite_path = os.environ.get("SQLITE_PATH", "whiskers_wishes.db")
+                            connect = lambda: InstrumentedConnection(DialectConnection(
+                                sqlite3.connect(sqlite_path, check_same_thread=False,
+                                                cached_statements=SQLITE_STATEMENT_CACHE), "sqlite"), query_stats)
+
+                        connect = connect_with_retry(
+                            connect,
+                            attempts=int(os.environ.get("DB_CONNECT_ATTEMPTS", 3)),
+                            base_delay=float(os.environ.get("DB_CONNECT_BACKOFF", 0.2)),
+                        )
+                        temp_instance.pool = ConnectionPool(
+                            connect,
+                            min_size=int(os.environ.get("DB_POOL_MIN_SIZE", 1)),
+                            max_size=int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+                            timeout=float(os.environ.get("DB_POOL_TIMEOUT", 5)),
+                        )
+                        temp_instance._local = threading.local()
+                        # Optional read replicas for read-only repository methods
+                        temp_instance.replicas = build_replica_set(temp_instance.dialect, sqlite_path)
+                        temp_instance.sticky_seconds = float(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+                        print(f"[Singleton] Connection pool configured ({temp_instance.dialect}, "
+                              f"max {temp_instance.pool.max_size} connections, opened on demand"
+                              f"{f', {len(temp_instance.replicas.replicas)} read replica(s)' if temp_instance.replicas else ''}).")
                         
                         # 4. Only assign the instance IF connection succeeded
                         cls._instance = temp_instance
                         
                     except Exception as e:
-                        print(f"[Singleton] Error connecting to database: {e}")
+                        print(f"[Singleton] Error configuring the database connection pool: {e}")
                         # If we fail, we return None or raise the error. 
                         # cls._instance remains None, so we can try again next request.
                         raise e
@@ -50,7 +407,85 @@ class DatabaseConnection:
         return cls._instance
 
     def get_connection(self):
-        return self.connection
+        """
+        Returns the connection checked out for the current unit of work.
+
+        Inside Flask every request gets its own connection (stored on `g`) which is
+        handed back to the pool automatically on teardown. Outside Flask (scripts)
+        the connection is bound to the calling thread until `release_connection()`.
+        """
+        if has_app_context():
+            conn = g.get("_db_conn")
+            if conn is None:
+                conn = self.pool.getconn()
+                g._db_conn = conn
+                if self.replicas and has_request_context() and request.method not in ("GET", "HEAD", "OPTIONS"):
+                    # A write request: this user's next pages read their own writes from the primary
+                    session["_db_primary_until"] = time.time() + self.sticky_seconds
+            return conn
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.pool.getconn()
+            self._local.conn = conn
+        return conn
+
+    def get_read_connection(self):
+        """
+        The connection for a read-only repository method.
+
+        A replica (see ReplicaSet) when any are configured, else the primary.
+        Reads stay on the primary once the current unit of work has checked
+        out the primary (so they see its own writes) and, for
+        REPLICA_STICKY_SECONDS after a write request, for that user's session.
+        Released together with the primary by release_connection().
+        """
+        if self.replicas is None or self._reads_pinned_to_primary():
+            return self.get_connection()
+        store = g if has_app_context() else self._local
+        checkout = getattr(store, "_db_read", None)
+        if checkout is None:
+            checkout = self.replicas.checkout()
+            if checkout is None:
+                return self.get_connection()
+            store._db_read = checkout
+        return checkout[1]
+
+    def _reads_pinned_to_primary(self):
+        if has_app_context():
+            if g.get("_db_conn") is not None:
+                return True
+            return has_request_context() and session.get("_db_primary_until", 0) > time.time()
+        return getattr(self._local, "conn", None) is not None
+
+    def release_connection(self, exc=None):
+        """Returns the current request's (or thread's) connections to their pools."""
+        if has_app_context():
+            conn = g.pop("_db_conn", None)
+            read = g.pop("_db_read", None)
+        else:
+            conn = getattr(self._local, "conn", None)
+            read = getattr(self._local, "_db_read", None)
+            self._local.conn = None
+            self._local._db_read = None
+        if conn is not None:
+            self.pool.putconn(conn)
+        if read is not None:
+            replica, read_conn = read
+            replica.pool.putconn(read_conn)
+
+    def warm(self):
+        """Opens DB_POOL_MIN_SIZE connections ahead of the first request. Returns False on failure."""
+        try:
+            self.pool.fill()
+            return True
+        except Exception as e:
+            print(f"[Singleton] Could not pre-open connections (will retry on first use): {e}")
+            return False
+
+    def init_app(self, app):
+        """Hooks the pool into Flask so each request's connection is returned when it ends."""
+        app.teardown_appcontext(self.release_connection)
 
 # ==========================================
 # 2. FACTORY METHOD PATTERN (User Creation)
@@ -88,6 +523,9 @@ class UserFactory:
 # 3. BUILDER PATTERN (Cat Profile Creation)
 # ==========================================
 class Cat:
+    # Fixed fields: no per-instance __dict__ (see row_models.py for the repository rows)
+    __slots__ = ("name", "age", "story", "status", "image", "breed", "vaccinated")
+
     def __init__(self):
         # Updated to match the fields in your app.py
         self.name = None
@@ -137,38 +575,142 @@ class CatBuilder:
         self.cat.breed = breed
         return self
 
+    def set_vaccinated(self, vaccinated):
+        self.cat.vaccinated = vaccinated
+        return self
+
     def build(self):
         return self.cat
 
 # ==========================================
 # 4. STRATEGY PATTERN (Filtering Cats)
 # ==========================================
+def _cat_field(cat, field):
+    # The in-memory fallback sees dicts, repository rows and Cat objects
+    if isinstance(cat, dict):
+        return cat.get(field)
+    return getattr(cat, field, None)
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 class FilterStrategy(ABC):
     @abstractmethod
     def filter(self, cats, criteria):
+        """In-memory fallback: filters an already loaded list of cats."""
         pass
 
+    def to_sql(self, criteria):
+        """
+        Returns a (clause, params) pair that CatRepository can add to its WHERE,
+        or None if this strategy can only run in memory.
+        """
+        return None
+
 class AgeFilter(FilterStrategy):
     def filter(self, cats, age_limit):
-        # Assumes 'cats' is a list of Cat objects
-        return [cat for cat in cats if cat.age == age_limit]
+        # Assumes 'cats' is a list of Cat objects or repository dicts
+        return [cat for cat in cats if _as_int(_cat_field(cat, "age")) == _as_int(age_limit)]
+
+    def to_sql(self, age_limit):
+        return "age = %s", [int(age_limit)]
+
+class AgeRangeFilter(FilterStrategy):
+    """Criteria is a (min_age, max_age) tuple; either end may be None."""
+    def filter(self, cats, age_range):
+        min_age, max_age = age_range
+        result = []
+        for cat in cats:
+            age = _as_int(_cat_field(cat, "age"))
+            if age is None:
+                continue
+            if min_age is not None and age < min_age:
+                continue
+            if max_age is not None and age > max_age:
+                continue
+            result.append(cat)
+        return result
+
+    def to_sql(self, age_range):
+        min_age, max_age = age_range
+        clauses, params = [], []
+        if min_age is not None:
+            clauses.append("age >= %s")
+            params.append(int(min_age))
+        if max_age is not None:
+            clauses.append("age <= %s")
+            params.append(int(max_age))
+        return " AND ".join(clauses) or "1 = 1", params
 
 class StatusFilter(FilterStrategy):
     def filter(self, cats, status):
-        return [cat for cat in cats if cat.status == status]
+        return [cat for cat in cats if _cat_field(cat, "status") == status]
+
+    def to_sql(self, status):
+        return "application_status = %s", [status]
+
+class BreedFilter(FilterStrategy):
+    """Case-insensitive breed match (backed by an index on LOWER(breed))."""
+    def filter(self, cats, breed):
+        return [cat for cat in cats if (_cat_field(cat, "breed") or "").lower() == breed.lower()]
+
+    def to_sql(self, breed):
+        return "LOWER(breed) = %s", [breed.lower()]
+
+class VaccinationFilter(FilterStrategy):
+    def filter(self, cats, vaccination_status):
+        return [cat for cat in cats if _cat_field(cat, "vaccination_status") == vaccination_status]
+
+    def to_sql(self, vaccination_status):
+        return "vaccination_status = %s", [vaccination_status]
 
 class CatGallery:
-    def __init__(self, cats):
-        self.cats = cats
+    """
+    Strategy context. Filters added with add_filter() are combined with AND:
+    CatRepository pushes the SQL-capable ones into its WHERE clause and only
+    falls back to in-memory filtering for strategies without to_sql().
+    """
+    def __init__(self, cats=None):
+        self.cats = cats if cats is not None else []
         self.strategy = None
+        self.filters = []  # list of (strategy, criteria)
 
     def set_strategy(self, strategy: FilterStrategy):
         self.strategy = strategy
 
-    def get_filtered_cats(self, criteria):
-        if not self.strategy:
-            return self.cats
-        return self.strategy.filter(self.cats, criteria)
+    def add_filter(self, strategy: FilterStrategy, criteria):
+        self.filters.append((strategy, criteria))
+        return self
+
+    def get_filtered_cats(self, criteria=None, cats=None):
+        cats = self.cats if cats is None else cats
+        if self.strategy:
+            cats = self.strategy.filter(cats, criteria)
+        for strategy, strategy_criteria in self.filters:
+            cats = strategy.filter(cats, strategy_criteria)
+        return cats
+
+    def to_sql(self):
+        """
+        Composes every SQL-capable filter into one parameterized clause.
+
+        Returns:
+            tuple: (clause, params, memory_filters) - clause is "" when nothing
+            could be pushed down; memory_filters still have to run in Python.
+        """
+        clauses, params, memory_filters = [], [], []
+        for strategy, criteria in self.filters:
+            sql = strategy.to_sql(criteria)
+            if sql is None:
+                memory_filters.append((strategy, criteria))
+                continue
+            clause, clause_params = sql
+            clauses.append(f"({clause})")
+            params.extend(clause_params)
+        return " AND ".join(clauses), params, memory_filters
 
 # ==========================================
 # 5. OBSERVER PATTERN (Application Status)
@@ -201,10 +743,16 @@ class AdoptionSubject:
 
 # Concrete Observer: User Notification System
 class UserNotificationObserver(Observer):
-    def __init__(self, username, email, user_type):
+    """
+    Sends the decision email. With a `queue` (notifications.NotificationQueue)
+    the email is only enqueued, so the admin's request never waits on SMTP;
+    without one it is printed as before.
+    """
+    def __init__(self, username, email, user_type, queue=None):
         self.username = username
         self.email = email
         self.user_type = user_type
+        self.queue = queue
 
     def update(self, status, reason=None):
         # Logic: 
@@ -212,12 +760,20 @@ class UserNotificationObserver(Observer):
         # 2. Notify ONLY Adopter if 'Rejected' (with reason)
         
         if status == "Approved":
-            print(f"📧 EMAIL TO {self.user_type.upper()} ({self.email}): "
-                  f"Great news, {self.username}! The adoption has been APPROVED.")
+            subject = "Your adoption has been approved"
+            body = f"Great news, {self.username}! The adoption has been APPROVED."
         
         elif status == "Rejected" and self.user_type == "adopter":
-             print(f"📧 EMAIL TO ADOPTER ({self.email}): "
-                   f"Dear {self.username}, your adoption request was declined. Reason: {reason}")
+            subject = "Update on your adoption request"
+            body = f"Dear {self.username}, your adoption request was declined. Reason: {reason}"
+
+        else:
+            return
+
+        if self.queue is not None:
+            self.queue.enqueue(self.email, subject, body)
+        else:
+            print(f"📧 EMAIL TO {self.user_type.upper()} ({self.email}): {body}")
 
 
 # ==========================================
@@ -235,9 +791,29 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def foster_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Only foster carers add cats: each cat belongs to its foster's account
+        if not session.get("logged_in") or session.get("role") != "foster":
+            return "<h1>Access Denied: Foster account required.</h1>", 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+def adopter_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Applications are filed under the adopter's own account
+        if not session.get("logged_in") or session.get("role") != "adopter":
+            return {"error": "An adopter account is required to apply."}, 403
+        return f(*args, **kwargs)
+    return decorated_function
+
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        # Sessions are stored server-side (session_store.py), so the role written
+        # at login can be trusted as-is: no database lookup per admin request
         user_role = session.get("role")
         # Check for both "Admin" (hardcoded) and "admin" (database)
         if str(user_role).lower() != "admin":
@@ -0,0 +1,258 @@
+# generate_data.py
+"""
+Synthetic data generator for load testing.
+
+Produces realistic users (adopters and fosters), cats, cat photos and adoption
+applications at a configurable scale and bulk-loads them:
+  * PostgreSQL: COPY ... FROM STDIN (default) or psycopg2 execute_values
+  * SQLite:     executemany
+in batched transactions, printing rows/second per table.
+
+Examples:
+    python generate_data.py --scale 10
+    python generate_data.py --users 200000 --cats 100000 --applications 300000 --batch-size 10000
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from werkzeug.security import generate_password_hash
+import dashboard_stats
+
+load_dotenv()
+
+# Row counts for --scale 1; every count is multiplied by the scale
+BASE_COUNTS = {"users": 1000, "cats": 2000, "photos_per_cat": 2, "applications": 3000}
+FOSTER_SHARE = 0.2  # fraction of generated users that are foster carers
+
+FIRST_NAMES = ["Ayesha", "Rahim", "Nadia", "Tanvir", "Sara", "Imran", "Farhana", "Arif", "Mim", "Sabbir",
+               "Emily", "James", "Olivia", "Noah", "Mia", "Lucas", "Zara", "Omar", "Lina", "Hugo"]
+LAST_NAMES = ["Rahman", "Hossain", "Islam", "Ahmed", "Chowdhury", "Khan", "Smith", "Garcia", "Chen", "Silva"]
+CAT_NAMES = ["Mochi", "Luna", "Oscar", "Milo", "Nala", "Simba", "Cleo", "Tiger", "Bella", "Pumpkin", "Shadow",
+             "Biscuit", "Ginger", "Pepper", "Olive", "Socks", "Misty", "Coco", "Tofu", "Noodle", "Kiwi", "Maple"]
+BREEDS = ["Domestic Shorthair", "Domestic Longhair", "Calico", "Tuxedo", "Tabby", "Siamese", "Persian",
+          "Maine Coon", "Bengal", "Ragdoll", "Tortoiseshell", "British Shorthair"]
+ORIGINS = ["Found in a cardboard box during a storm", "Rescued from a busy market street",
+           "Surrendered by a family who moved abroad", "Born in our foster network",
+           "Brought in by a kind neighbour", "Found hiding under a parked car"]
+PERSONALITIES = ["a tiny survivor with a huge heart", "calm and loves birdwatching from the window",
+                 "playful and obsessed with string", "a wise soul who wants a warm lap",
+                 "shy at first but a cuddle monster once settled", "curious and great with other cats"]
+HOME_TYPES = ["apartment", "house with garden", "shared flat", "townhouse"]
+
+
+def _age():
+    # Shelters are kitten-heavy: half under a year, a long tail of seniors
+    roll = random.random()
+    if roll < 0.5:
+        return 0
+    if roll < 0.85:
+        return random.randint(1, 7)
+    return random.randint(8, 18)
+
+
+def generate_users(count, first_id):
+    users, adopters, fosters = [], [], []
+    # Hashing is deliberately slow, so every synthetic account shares one hash
+    password_hash = generate_password_hash("password123")
+    for i in range(count):
+        user_id = first_id + i
+        first, last = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+        user_type = "foster" if random.random() < FOSTER_SHARE else "adopter"
+        users.append((user_id, f"{first.lower()}_{user_id}", f"{first.lower()}.{last.lower()}.{user_id}@example.com",
+                      password_hash, f"{first} {last}", None, user_type))
+        if user_type == "foster":
+            fosters.append(user_id)
+        else:
+            adopters.append(user_id)
+    return users, adopters, fosters
+
+
+def generate_cats(count, first_id, foster_ids):
+    cats = []
+    for i in range(count):
+        cat_id = first_id + i
+        status = random.choices(["Available", "Urgent", "Adopted"], weights=[70, 10, 20])[0]
+        vaccination = random.choices(["Vaccinated", "Not Vaccinated"], weights=[60, 40])[0]
+        bio = f"{random.choice(ORIGINS)}, {random.choice(CAT_NAMES)} is {random.choice(PERSONALITIES)}."
+        cats.append((cat_id, random.choice(foster_ids), random.choice(CAT_NAMES), _age(),
+                     random.choice(BREEDS), bio, vaccination, status))
+    return cats
+
+
+def generate_photos(cats, per_cat, first_id):
+    photos, photo_id = [], first_id
+    for cat in cats:
+        for n in range(per_cat):
+            photos.append((photo_id, cat[0], f"https://placehold.co/400x300/50c4db/white?text={cat[2]}+{n + 1}",
+                           n == 0))
+            photo_id += 1
+    return photos
+
+
+def generate_applications(count, first_id, adopter_ids, cats):
+    applications = []
+    now = datetime.now()
+    open_cats = [cat[0] for cat in cats if cat[7] != "Adopted"] or [cat[0] for cat in cats]
+    for i in range(count):
+        status = random.choices(["Pending", "Approved", "Rejected"], weights=[60, 15, 25])[0]
+        answers = json.dumps({"home_type": random.choice(HOME_TYPES),
+                              "other_pets": random.randint(0, 3),
+                              "hours_alone_per_day": random.randint(0, 10)})
+        submitted = now - timedelta(minutes=random.randint(0, 90 * 24 * 60))
+        # Decisions follow within a week of submission
+        decided = None if status == "Pending" else min(now, submitted + timedelta(minutes=random.randint(0, 7 * 24 * 60)))
+        applications.append((first_id + i, random.choice(adopter_ids), random.choice(open_cats),
+                             random.choice([0, 500, 1000, 1500]), submitted.strftime("%Y-%m-%d %H:%M:%S"),
+                             answers, status, decided and decided.strftime("%Y-%m-%d %H:%M:%S")))
+    return applications
+
+
+# ==========================================
+# BULK LOADING
+# ==========================================
+TABLES = {
+    "users": ("user_id", ["user_id", "username", "email", "hashed_password", "full_name", "profile_info", "user_type"]),
+    "adopters": ("adopter_id", ["adopter_id", "user_id"]),
+    "foster_users": ("foster_id", ["foster_id", "user_id"]),
+    "cats": ("cat_id", ["cat_id", "foster_id", "name", "age", "breed", "bio", "vaccination_status", "application_status"]),
+    "cat_photos": ("photo_id", ["photo_id", "cat_id", "photo_url", "is_primary"]),
+    "adoption_applications": ("application_id", ["application_id", "adopter_id", "cat_id", "vaccination_fee",
+                                                 "submission_date", "questionnaire_responses", "application_status",
+                                                 "decided_at"]),
+}
+
+
+class BulkLoader:
+    def __init__(self, conn, dialect, batch_size=5000, method="copy"):
+        self.conn = conn
+        self.dialect = dialect
+        self.batch_size = batch_size
+        self.method = method
+        self.report = []
+
+    def next_id(self, table):
+        id_column = TABLES[table][0]
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT COALESCE(MAX({id_column}), 0) FROM {table}")
+        value = cur.fetchone()[0] + 1
+        cur.close()
+        return value
+
+    def load(self, table, rows):
+        columns = TABLES[table][1]
+        started = time.perf_counter()
+        cur = self.conn.cursor()
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                if self.dialect == "postgresql" and self.method == "copy":
+                    self._copy(cur, table, columns, batch)
+                elif self.dialect == "postgresql":
+                    from psycopg2.extras import execute_values
+                    execute_values(cur, f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s", batch,
+                                   page_size=self.batch_size)
+                else:
+                    placeholders = ", ".join("?" for _ in columns)
+                    cur.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", batch)
+                self.conn.commit()  # one transaction per batch
+            if self.dialect == "postgresql" and rows:
+                # Explicit ids bypass the SERIAL sequence, so move it past them
+                id_column = TABLES[table][0]
+                cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{id_column}'), "
+                            f"(SELECT MAX({id_column}) FROM {table}))")
+                self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cur.close()
+        elapsed = time.perf_counter() - started
+        rate = len(rows) / elapsed if elapsed else float("inf")
+        self.report.append((table, len(rows), elapsed))
+        print(f"   ✅ {table:<22} {len(rows):>9,} rows in {elapsed:7.2f}s  ({rate:,.0f} rows/s)")
+
+    @staticmethod
+    def _copy(cur, table, columns, batch):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            # COPY's CSV format reads an unquoted empty field as NULL
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def generate(conn, dialect, users, cats, photos_per_cat, applications, batch_size=5000, method="copy", seed=None):
+    """Generates and loads a dataset. Returns [(table, rows, seconds), ...]."""
+    if seed is not None:
+        random.seed(seed)
+    loader = BulkLoader(conn, dialect, batch_size=batch_size, method=method)
+
+    user_rows, adopter_user_ids, foster_user_ids = generate_users(users, loader.next_id("users"))
+    if not foster_user_ids:
+        foster_user_ids = [adopter_user_ids.pop()] if adopter_user_ids else []
+    loader.load("users", user_rows)
+
+    first_adopter = loader.next_id("adopters")
+    adopter_rows = [(first_adopter + i, user_id) for i, user_id in enumerate(adopter_user_ids)]
+    loader.load("adopters", adopter_rows)
+
+    first_foster = loader.next_id("foster_users")
+    foster_rows = [(first_foster + i, user_id) for i, user_id in enumerate(foster_user_ids)]
+    loader.load("foster_users", foster_rows)
+
+    if foster_rows:
+        cat_rows = generate_cats(cats, loader.next_id("cats"), [row[0] for row in foster_rows])
+        loader.load("cats", cat_rows)
+        loader.load("cat_photos", generate_photos(cat_rows, photos_per_cat, loader.next_id("cat_photos")))
+        if adopter_rows and cat_rows:
+            loader.load("adoption_applications", generate_applications(
+                applications, loader.next_id("adoption_applications"), [row[0] for row in adopter_rows], cat_rows))
+
+    from architectural_patterns import CatRepository
+    CatRepository.invalidate_cache()
+    # Bulk loads bypass the per-write counter updates: recount once at the end
+    dashboard_stats.reconcile(conn, dialect)
+    return loader.report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and bulk-load synthetic Whiskers & Wishes data.")
+    parser.add_argument("--scale", type=float, default=1, help="multiplier for the default row counts")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--cats", type=int)
+    parser.add_argument("--photos-per-cat", type=int)
+    parser.add_argument("--applications", type=int)
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per transaction")
+    parser.add_argument("--method", choices=["copy", "values"], default="copy",
+                        help="PostgreSQL load method (SQLite always uses executemany)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible datasets")
+    args = parser.parse_args()
+
+    from design_patterns import DatabaseConnection
+    from migrate import apply_migrations
+
+    db = DatabaseConnection()
+    conn = db.get_connection()
+    apply_migrations(conn, db.dialect)
+
+    counts = {
+        "users": args.users if args.users is not None else int(BASE_COUNTS["users"] * args.scale),
+        "cats": args.cats if args.cats is not None else int(BASE_COUNTS["cats"] * args.scale),
+        "photos_per_cat": args.photos_per_cat if args.photos_per_cat is not None else BASE_COUNTS["photos_per_cat"],
+        "applications": (args.applications if args.applications is not None
+                         else int(BASE_COUNTS["applications"] * args.scale)),
+    }
+    print(f"Generating {counts} on {db.dialect}...")
+    started = time.perf_counter()
+    report = generate(conn, db.dialect, counts["users"], counts["cats"], counts["photos_per_cat"],
+                      counts["applications"], batch_size=args.batch_size, method=args.method, seed=args.seed)
+    elapsed = time.perf_counter() - started
+    total = sum(rows for _, rows, _ in report)
+    print(f"✅ Loaded {total:,} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/s overall).")
+    db.release_connection()
@@ -0,0 +1,133 @@
+# image_pipeline.py
+"""
+Cat photo storage and thumbnails.
+
+Uploads are validated, stored on local disk under MEDIA_ROOT and resized
+ONCE, at upload time, into WebP renditions:
+  * card  - 400x300, the gallery card image
+  * small - 96x96, avatars in admin tables
+The original is kept (re-encoded, EXIF stripped) for future sizes.
+
+Files are named after a hash of the upload, so a URL never changes meaning
+and /media can be served with a one-year `immutable` cache header.
+Needs the optional Pillow package (pip install Pillow).
+"""
+import hashlib
+import io
+import os
+from dotenv import load_dotenv
+from flask import send_from_directory
+
+load_dotenv()
+
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "uploads"))
+MEDIA_URL = "/media/"
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", 10)) * 1024 * 1024
+# Whole request: foster intake posts many photos at once
+MAX_REQUEST_BYTES = int(os.environ.get("MAX_REQUEST_MB", 200)) * 1024 * 1024
+MAX_SOURCE_PIXELS = 40_000_000  # refuse decompression bombs before resizing
+
+# rendition name -> (width, height); every rendition is center-cropped to fill the box
+THUMBNAIL_SIZES = {"card": (400, 300), "small": (96, 96)}
+WEBP_QUALITY = 80
+ORIGINAL_MAX_SIDE = 2000
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+CACHE_SECONDS = 365 * 24 * 3600
+
+
+class ImageValidationError(ValueError):
+    """The upload is not an image we accept (shown to the user)."""
+
+
+def _pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError as e:
+        raise RuntimeError("Photo uploads require the 'Pillow' package (pip install Pillow)") from e
+    Image.MAX_IMAGE_PIXELS = MAX_SOURCE_PIXELS
+    return Image, ImageOps
+
+
+def _open(data):
+    Image, ImageOps = _pillow()
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ImageValidationError(f"Photos must be smaller than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+    try:
+        probe = Image.open(io.BytesIO(data))
+        probe.verify()  # cheap structural check; verify() leaves the image unusable
+        image = Image.open(io.BytesIO(data))
+        if image.format not in ALLOWED_FORMATS:
+            raise ImageValidationError(f"Unsupported image format: {image.format}.")
+        image = ImageOps.exif_transpose(image)  # phone photos: apply the rotation, drop EXIF
+        image.load()
+    except ImageValidationError:
+        raise
+    except Exception as e:
+        raise ImageValidationError("The uploaded file is not a readable image.") from e
+    return image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+
+def _save_webp(image, path):
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)  # readers never see a half-written file
+
+
+def process_upload(data, created=None):
+    """
+    Stores an uploaded photo and its thumbnails.
+
+    Args:
+        data (bytes): the raw upload.
+        created (list): if given, the paths of the files this call wrote
+            are appended to it (see discard_files).
+
+    Returns:
+        dict: {"photo_url", "thumb_card_url", "thumb_small_url"} relative to MEDIA_URL.
+    """
+    Image, ImageOps = _pillow()
+    image = _open(data)
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    folder = os.path.join(MEDIA_ROOT, digest[:2])  # shard so no directory grows huge
+    os.makedirs(folder, exist_ok=True)
+
+    urls = {}
+    original = image.copy()
+    original.thumbnail((ORIGINAL_MAX_SIDE, ORIGINAL_MAX_SIDE), Image.LANCZOS)
+    renditions = {"photo_url": ("original", original)}
+    for name, size in THUMBNAIL_SIZES.items():
+        renditions[f"thumb_{name}_url"] = (name, ImageOps.fit(image, size, Image.LANCZOS))
+
+    for column, (name, rendition) in renditions.items():
+        filename = f"{digest}_{name}.webp"
+        path = os.path.join(folder, filename)
+        if not os.path.exists(path):  # the same photo uploaded twice is stored once
+            _save_webp(rendition, path)
+            if created is not None:
+                created.append(path)
+        urls[column] = f"{MEDIA_URL}{digest[:2]}/{filename}"
+    return urls
+
+
+def discard_files(paths):
+    """Removes files process_upload() wrote for a photo that was then not saved."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def init_app(app):
+    """Serves MEDIA_ROOT at /media/ with long-lived cache headers."""
+    app.config.setdefault("MAX_CONTENT_LENGTH", MAX_REQUEST_BYTES)
+
+    @app.route(MEDIA_URL + "<path:filename>", endpoint="media")
+    def media(filename):
+        response = send_from_directory(MEDIA_ROOT, filename, max_age=CACHE_SECONDS)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
@@ -0,0 +1,185 @@
+# migrate.py
+"""
+Versioned schema migrations for PostgreSQL and SQLite.
+
+Migrations live in migrations/<dialect>/NNNN_name.up.sql with a matching
+NNNN_name.down.sql. Applied versions are recorded in the schema_version table,
+so running the same command twice is a no-op.
+
+Usage:
+    python migrate.py status
+    python migrate.py up [target_version]
+    python migrate.py down [steps]
+"""
+import os
+import re
+import sqlite3
+import sys
+from dotenv import load_dotenv
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.(up|down)\.sql$")
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class Migration:
+    def __init__(self, version, name, up_path, down_path=None):
+        self.version = version
+        self.name = name
+        self.up_path = up_path
+        self.down_path = down_path
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def load_migrations(dialect):
+    """Returns the migrations for a dialect ('postgresql' or 'sqlite'), oldest first."""
+    folder = os.path.join(MIGRATIONS_DIR, dialect)
+    found = {}
+    for filename in sorted(os.listdir(folder)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version, name, direction = int(match.group(1)), match.group(2), match.group(3)
+        migration = found.setdefault(version, Migration(version, name, None))
+        setattr(migration, f"{direction}_path", os.path.join(folder, filename))
+    for migration in found.values():
+        if migration.up_path is None:
+            raise ValueError(f"Migration {migration} has no .up.sql file")
+    return [found[v] for v in sorted(found)]
+
+
+def _split_sqlite(sql):
+    # sqlite3 runs one statement per execute(); complete_statement() knows
+    # about trigger bodies, so we only split where a statement really ends.
+    statements, buffer = [], ""
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    leftover = "\n".join(l for l in buffer.splitlines() if not l.strip().startswith("--")).strip()
+    if leftover:
+        statements.append(leftover)
+    return statements
+
+
+def _run_script(conn, dialect, path):
+    with open(path, encoding="utf-8") as f:
+        sql = f.read()
+    cur = conn.cursor()
+    if dialect == "sqlite":
+        for statement in _split_sqlite(sql):
+            cur.execute(statement)
+    else:
+        cur.execute(sql)
+    cur.close()
+
+
+def _begin(conn, dialect):
+    # psycopg2 opens a transaction on the first statement; the sqlite3 module
+    # does not for DDL, so start one explicitly to keep each migration atomic.
+    if dialect == "sqlite":
+        cur = conn.cursor()
+        cur.execute("BEGIN")
+        cur.close()
+
+
+def applied_versions(conn):
+    cur = conn.cursor()
+    cur.execute(SCHEMA_VERSION_TABLE)
+    conn.commit()
+    cur.execute("SELECT version FROM schema_version ORDER BY version")
+    versions = [row[0] for row in cur.fetchall()]
+    cur.close()
+    return versions
+
+
+def apply_migrations(conn, dialect, target=None):
+    """Applies every pending migration up to `target` (all if None). Returns the versions applied."""
+    done = set(applied_versions(conn))
+    placeholder = "?" if dialect == "sqlite" else "%s"
+    applied = []
+    for migration in load_migrations(dialect):
+        if target is not None and migration.version > target:
+            break
+        if migration.version in done:
+            continue
+        try:
+            _begin(conn, dialect)
+            _run_script(conn, dialect, migration.up_path)
+            cur = conn.cursor()
+            cur.execute(f"INSERT INTO schema_version (version, name) VALUES ({placeholder}, {placeholder})",
+                        (migration.version, migration.name))
+            cur.close()
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration {migration} failed: {e}")
+            raise
+        print(f"   ✅ Applied {migration}")
+        applied.append(migration.version)
+    return applied
+
+
+def rollback_migrations(conn, dialect, steps=1):
+    """Reverts the most recently applied `steps` migrations. Returns the versions reverted."""
+    migrations = {m.version: m for m in load_migrations(dialect)}
+    placeholder = "?" if dialect == "sqlite" else "%s"
+    reverted = []
+    for version in reversed(applied_versions(conn)[-steps:] if steps > 0 else []):
+        migration = migrations.get(version)
+        if migration is None or migration.down_path is None:
+            raise ValueError(f"Cannot roll back version {version}: no .down.sql file")
+        try:
+            _begin(conn, dialect)
+            _run_script(conn, dialect, migration.down_path)
+            cur = conn.cursor()
+            cur.execute(f"DELETE FROM schema_version WHERE version = {placeholder}", (version,))
+            cur.close()
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Rollback of {migration} failed: {e}")
+            raise
+        print(f"   ↩️  Rolled back {migration}")
+        reverted.append(version)
+    return reverted
+
+
+def migration_status(conn, dialect):
+    done = set(applied_versions(conn))
+    return [(m, m.version in done) for m in load_migrations(dialect)]
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    from design_patterns import DatabaseConnection
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "up"
+    argument = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    db = DatabaseConnection()
+    conn = db.get_connection()
+    try:
+        if command == "up":
+            applied = apply_migrations(conn, db.dialect, target=argument)
+            print(f"✅ Database is up to date ({len(applied)} migration(s) applied).")
+        elif command == "down":
+            rollback_migrations(conn, db.dialect, steps=argument or 1)
+        elif command == "status":
+            for migration, is_applied in migration_status(conn, db.dialect):
+                print(f"   [{'x' if is_applied else ' '}] {migration}")
+        else:
+            print(__doc__)
+            sys.exit(1)
+    finally:
+        db.release_connection()
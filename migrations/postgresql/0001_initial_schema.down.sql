@@ -0,0 +1,7 @@
+DROP TABLE IF EXISTS adoption_applications;
+DROP TABLE IF EXISTS cat_photos;
+DROP TABLE IF EXISTS cats;
+DROP TABLE IF EXISTS adopters;
+DROP TABLE IF EXISTS foster_users;
+DROP TABLE IF EXISTS admin;
+DROP TABLE IF EXISTS users;
@@ -0,0 +1,2 @@
+DROP INDEX IF EXISTS idx_cats_search;
+ALTER TABLE cats DROP COLUMN IF EXISTS search_vector;
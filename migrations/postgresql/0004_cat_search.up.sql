@@ -0,0 +1,9 @@
+-- Full-text search over cat names, breeds and stories (weighted in that order)
+ALTER TABLE cats ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(breed, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(bio, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_cats_search ON cats USING GIN (search_vector);
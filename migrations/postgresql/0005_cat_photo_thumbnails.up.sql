@@ -0,0 +1,11 @@
+-- Image pipeline: pre-generated WebP thumbnails and one primary photo per cat
+ALTER TABLE cat_photos ADD COLUMN is_primary BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE cat_photos ADD COLUMN thumb_card_url VARCHAR(255);
+ALTER TABLE cat_photos ADD COLUMN thumb_small_url VARCHAR(255);
+
+-- Existing cats: their first photo becomes the primary one
+UPDATE cat_photos SET is_primary = TRUE
+WHERE photo_id IN (SELECT MIN(photo_id) FROM cat_photos GROUP BY cat_id);
+
+-- Listing queries join exactly this row
+CREATE UNIQUE INDEX IF NOT EXISTS idx_cat_photos_primary ON cat_photos (cat_id) WHERE is_primary;
@@ -0,0 +1,2 @@
+ALTER TABLE adoption_applications DROP COLUMN decided_at;
+DROP TABLE IF EXISTS dashboard_stats;
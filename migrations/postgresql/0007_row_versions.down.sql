@@ -0,0 +1,2 @@
+ALTER TABLE adoption_applications DROP COLUMN IF EXISTS version;
+ALTER TABLE cats DROP COLUMN IF EXISTS version;
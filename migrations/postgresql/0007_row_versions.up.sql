@@ -0,0 +1,5 @@
+-- Row versions for optimistic concurrency: every write to a cat or an
+-- application bumps its version, and decisions only apply if the version
+-- is still the one that was read (see AdminRepository.decide_applications)
+ALTER TABLE cats ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE adoption_applications ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
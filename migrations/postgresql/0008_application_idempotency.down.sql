@@ -0,0 +1,2 @@
+DROP INDEX IF EXISTS idx_applications_idempotency;
+ALTER TABLE adoption_applications DROP COLUMN idempotency_key;
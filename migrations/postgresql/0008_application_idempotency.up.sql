@@ -0,0 +1,6 @@
+-- Adopter submissions (see application_intake.py): a retried submission
+-- carries the same Idempotency-Key and is answered with the application the
+-- first attempt created instead of inserting a second one. Keys are scoped
+-- per adopter; applications without a key (NULL) never conflict.
+ALTER TABLE adoption_applications ADD COLUMN idempotency_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_idempotency ON adoption_applications (adopter_id, idempotency_key);
@@ -0,0 +1,11 @@
+DROP INDEX IF EXISTS idx_cat_photos_cat_id;
+DROP INDEX IF EXISTS idx_admin_user_id;
+DROP INDEX IF EXISTS idx_foster_users_user_id;
+DROP INDEX IF EXISTS idx_users_user_type;
+DROP INDEX IF EXISTS idx_adopters_user_id;
+DROP INDEX IF EXISTS idx_applications_adopter_id;
+DROP INDEX IF EXISTS idx_applications_cat_id;
+DROP INDEX IF EXISTS idx_applications_status;
+DROP INDEX IF EXISTS idx_cats_breed_lower;
+DROP INDEX IF EXISTS idx_cats_status;
+DROP INDEX IF EXISTS idx_cats_available;
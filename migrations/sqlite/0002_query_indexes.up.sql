@@ -0,0 +1,21 @@
+-- Indexes for the hot queries in architectural_patterns.py
+
+-- Gallery: keyset pages over non-adopted cats (partial index, adopted cats are never listed)
+CREATE INDEX IF NOT EXISTS idx_cats_available ON cats (cat_id) WHERE application_status <> 'Adopted';
+-- Gallery filters: status and case-insensitive breed
+CREATE INDEX IF NOT EXISTS idx_cats_status ON cats (application_status, cat_id);
+CREATE INDEX IF NOT EXISTS idx_cats_breed_lower ON cats (LOWER(breed));
+
+-- Pending applications page and its joins
+CREATE INDEX IF NOT EXISTS idx_applications_status ON adoption_applications (application_status);
+CREATE INDEX IF NOT EXISTS idx_applications_cat_id ON adoption_applications (cat_id);
+CREATE INDEX IF NOT EXISTS idx_applications_adopter_id ON adoption_applications (adopter_id);
+CREATE INDEX IF NOT EXISTS idx_adopters_user_id ON adopters (user_id);
+
+-- Admin user list (WHERE user_type != 'admin') and role tables
+CREATE INDEX IF NOT EXISTS idx_users_user_type ON users (user_type);
+CREATE INDEX IF NOT EXISTS idx_foster_users_user_id ON foster_users (user_id);
+CREATE INDEX IF NOT EXISTS idx_admin_user_id ON admin (user_id);
+
+-- Photo lookups per cat
+CREATE INDEX IF NOT EXISTS idx_cat_photos_cat_id ON cat_photos (cat_id);
@@ -0,0 +1 @@
+ALTER TABLE adoption_applications DROP COLUMN rejection_reason;
@@ -0,0 +1,2 @@
+-- AdminRepository stores the reason an application was declined
+ALTER TABLE adoption_applications ADD COLUMN rejection_reason TEXT;
@@ -0,0 +1,4 @@
+DROP TRIGGER IF EXISTS cats_fts_update;
+DROP TRIGGER IF EXISTS cats_fts_delete;
+DROP TRIGGER IF EXISTS cats_fts_insert;
+DROP TABLE IF EXISTS cats_fts;
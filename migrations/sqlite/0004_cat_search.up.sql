@@ -0,0 +1,23 @@
+-- Full-text search over cat names, breeds and stories (FTS5 external-content index)
+CREATE VIRTUAL TABLE IF NOT EXISTS cats_fts USING fts5(
+    name, breed, bio,
+    content='cats', content_rowid='cat_id',
+    tokenize='porter unicode61', prefix='2 3'
+);
+
+-- Keep the index in step with the cats table
+CREATE TRIGGER IF NOT EXISTS cats_fts_insert AFTER INSERT ON cats BEGIN
+    INSERT INTO cats_fts (rowid, name, breed, bio) VALUES (new.cat_id, new.name, new.breed, new.bio);
+END;
+
+CREATE TRIGGER IF NOT EXISTS cats_fts_delete AFTER DELETE ON cats BEGIN
+    INSERT INTO cats_fts (cats_fts, rowid, name, breed, bio) VALUES ('delete', old.cat_id, old.name, old.breed, old.bio);
+END;
+
+CREATE TRIGGER IF NOT EXISTS cats_fts_update AFTER UPDATE OF name, breed, bio ON cats BEGIN
+    INSERT INTO cats_fts (cats_fts, rowid, name, breed, bio) VALUES ('delete', old.cat_id, old.name, old.breed, old.bio);
+    INSERT INTO cats_fts (rowid, name, breed, bio) VALUES (new.cat_id, new.name, new.breed, new.bio);
+END;
+
+-- Index the cats that already exist
+INSERT INTO cats_fts (cats_fts) VALUES ('rebuild');
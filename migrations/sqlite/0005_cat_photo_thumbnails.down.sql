@@ -0,0 +1,4 @@
+DROP INDEX IF EXISTS idx_cat_photos_primary;
+ALTER TABLE cat_photos DROP COLUMN thumb_small_url;
+ALTER TABLE cat_photos DROP COLUMN thumb_card_url;
+ALTER TABLE cat_photos DROP COLUMN is_primary;
@@ -0,0 +1,9 @@
+-- Denormalized admin dashboard counters (see dashboard_stats.py); filled by
+-- the reconciler on first start, then kept current by every write
+CREATE TABLE IF NOT EXISTS dashboard_stats (
+    stat_key VARCHAR(64) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+-- When an application was approved or rejected (lets reconciliation rebuild adoptions per day)
+ALTER TABLE adoption_applications ADD COLUMN decided_at TIMESTAMP;
@@ -0,0 +1,2 @@
+ALTER TABLE adoption_applications DROP COLUMN version;
+ALTER TABLE cats DROP COLUMN version;
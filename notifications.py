@@ -0,0 +1,359 @@
+# notifications.py
+"""
+Background delivery for adoption-decision emails.
+
+Observers enqueue jobs into a durable SQLite-backed queue and return
+immediately; a small pool of worker threads drains the queue in batches,
+retries failed sends with exponential backoff, and moves jobs that keep
+failing to the dead-letter state ('dead') for inspection.
+
+Run `python notifications.py smtp-sink` for a local SMTP stand-in that
+prints every message it receives (point SMTP_HOST/SMTP_PORT at it).
+"""
+import os
+import smtplib
+import socketserver
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# ==========================================
+# 1. DURABLE QUEUE (SQLite table)
+# ==========================================
+class NotificationQueue:
+    def __init__(self, path="notifications.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # lets several gunicorn workers share the file
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS notification_jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                recipient TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                claimed_at REAL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notification_jobs_due ON notification_jobs (status, next_attempt_at)")
+
+    def enqueue(self, recipient, subject, body):
+        """Stores a job and wakes a worker. Returns the job_id."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO notification_jobs (recipient, subject, body, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (recipient, subject, body, now, now))
+            job_id = cur.lastrowid
+        self._wakeup.set()
+        return job_id
+
+    def claim_batch(self, limit):
+        """Atomically moves up to `limit` due jobs to 'sending' and returns them."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")  # a write lock, so two processes never claim the same job
+            try:
+                rows = self._conn.execute(
+                    "SELECT job_id, recipient, subject, body, attempts FROM notification_jobs "
+                    "WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY job_id LIMIT ?",
+                    (now, limit)).fetchall()
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE notification_jobs SET status = 'sending', claimed_at = ? WHERE job_id = ?",
+                        [(now, row[0]) for row in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [{"job_id": r[0], "recipient": r[1], "subject": r[2], "body": r[3], "attempts": r[4]}
+                for r in rows]
+
+    def mark_sent(self, job_ids):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE notification_jobs SET status = 'sent', attempts = attempts + 1, last_error = NULL "
+                "WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+
+    def mark_failed(self, job, error, max_attempts, base_backoff):
+        """Schedules a retry with exponential backoff, or dead-letters the job."""
+        attempts = job["attempts"] + 1
+        if attempts >= max_attempts:
+            status, next_attempt_at = "dead", time.time()
+        else:
+            status, next_attempt_at = "queued", time.time() + base_backoff * (2 ** (attempts - 1))
+        with self._lock:
+            self._conn.execute(
+                "UPDATE notification_jobs SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE job_id = ?",
+                (status, attempts, next_attempt_at, str(error)[:500], job["job_id"]))
+        return status
+
+    def requeue_stale(self, older_than=300):
+        """Returns jobs stuck in 'sending' (e.g. a worker died mid-batch) to the queue."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE notification_jobs SET status = 'queued' "
+                "WHERE status = 'sending' AND claimed_at <= ?", (time.time() - older_than,))
+            return cur.rowcount
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM notification_jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def wait_for_work(self, timeout):
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+
+# ==========================================
+# 2. MAILERS
+# ==========================================
+class ConsoleMailer:
+    """Default when no SMTP server is configured: prints the email like before."""
+
+    def send_batch(self, messages, on_result=None):
+        for index, message in enumerate(messages):
+            print(f"📧 EMAIL TO {message['To']}: {message.get_content().strip()}")
+            if on_result:
+                on_result(index, None)
+        return [None] * len(messages)
+
+
+class SMTPMailer:
+    """Sends a whole batch over one SMTP session instead of reconnecting per email."""
+
+    def __init__(self, host, port=25, username=None, password=None, use_tls=False, timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send_batch(self, messages, on_result=None):
+        """
+        Returns one entry per message: None if sent, otherwise the exception.
+        `on_result(index, error)` is called as soon as each message's fate is
+        known, so a caller can record deliveries before a later failure.
+        """
+        results = []
+
+        def record(error):
+            results.append(error)
+            if on_result:
+                on_result(len(results) - 1, error)
+
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                try:
+                    smtp.send_message(message)
+                    record(None)
+                except smtplib.SMTPException as e:
+                    record(e)
+        finally:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()  # the messages were accepted (or not) before QUIT; nothing to retry
+        return results
+
+
+def build_mailer_from_env():
+    host = os.environ.get("SMTP_HOST")
+    if not host:
+        return ConsoleMailer()
+    return SMTPMailer(
+        host,
+        port=int(os.environ.get("SMTP_PORT", 25)),
+        username=os.environ.get("SMTP_USERNAME"),
+        password=os.environ.get("SMTP_PASSWORD"),
+        use_tls=os.environ.get("SMTP_USE_TLS", "").lower() in ("1", "true", "yes"),
+    )
+
+
+# ==========================================
+# 3. WORKER POOL
+# ==========================================
+class NotificationWorkerPool:
+    def __init__(self, queue, mailer, workers=2, batch_size=20, poll_interval=1.0,
+                 max_attempts=5, base_backoff=2.0, sender="no-reply@whiskerswishes.com"):
+        self.queue = queue
+        self.mailer = mailer
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.sender = sender
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self.queue.requeue_stale()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"notification-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[Notifications] {self.workers} delivery worker(s) started.")
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self.queue._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delivered = self.drain_once()
+            except Exception as e:
+                print(f"❌ [Notifications] Worker error: {e}")
+                delivered = 0
+            if not delivered:
+                self.queue.wait_for_work(self.poll_interval)
+
+    def _build_message(self, job):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = job["recipient"]
+        message["Subject"] = job["subject"]
+        message.set_content(job["body"])
+        return message
+
+    def drain_once(self):
+        """Claims and sends one batch. Returns how many jobs were processed."""
+        jobs = self.queue.claim_batch(self.batch_size)
+        if not jobs:
+            return 0
+        outcomes = {}  # index -> None (sent) or the exception
+
+        def on_result(index, error):
+            outcomes[index] = error
+            if error is None:
+                # Recorded right away, so a failure later in the batch can't resend it
+                self.queue.mark_sent([jobs[index]["job_id"]])
+
+        try:
+            results = self.mailer.send_batch([self._build_message(job) for job in jobs], on_result=on_result)
+            for index, error in enumerate(results):
+                if index not in outcomes:
+                    on_result(index, error)
+        except Exception as e:
+            # The connection failed (server unreachable, dropped mid-batch): only
+            # the messages not delivered yet are retried
+            for index in range(len(jobs)):
+                outcomes.setdefault(index, e)
+
+        for index, job in enumerate(jobs):
+            error = outcomes[index]
+            if error is not None:
+                status = self.queue.mark_failed(job, error, self.max_attempts, self.base_backoff)
+                if status == "dead":
+                    print(f"☠️ [Notifications] Job #{job['job_id']} to {job['recipient']} dead-lettered: {error}")
+        return len(jobs)
+
+
+def build_worker_pool_from_env(queue):
+    return NotificationWorkerPool(
+        queue,
+        build_mailer_from_env(),
+        workers=int(os.environ.get("NOTIFICATION_WORKERS", 2)),
+        batch_size=int(os.environ.get("NOTIFICATION_BATCH_SIZE", 20)),
+        max_attempts=int(os.environ.get("NOTIFICATION_MAX_ATTEMPTS", 5)),
+        sender=os.environ.get("NOTIFICATION_SENDER", "no-reply@whiskerswishes.com"),
+    )
+
+
+# ==========================================
+# 4. LOCAL SMTP STAND-IN (for tests / development)
+# ==========================================
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self._reply("220 localhost Whiskers & Wishes SMTP stand-in")
+        mail_from, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            upper = command.upper()
+            if upper.startswith(("HELO", "EHLO")):
+                self._reply("250 localhost")
+            elif upper.startswith("MAIL FROM:"):
+                mail_from, recipients = command[10:].strip(), []
+                self._reply("250 OK")
+            elif upper.startswith("RCPT TO:"):
+                recipients.append(command[8:].strip())
+                self._reply("250 OK")
+            elif upper == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    if data_line.startswith(b".."):
+                        data_line = data_line[1:]  # undo SMTP dot-stuffing
+                    lines.append(data_line)
+                self.server.messages.append(
+                    {"from": mail_from, "to": recipients, "data": b"".join(lines).decode(errors="replace")})
+                if self.server.verbose:
+                    print(f"📨 [SMTP sink] {mail_from} -> {', '.join(recipients)}")
+                self._reply("250 OK: queued")
+            elif upper in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif upper == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server that keeps received messages in `.messages`."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=1025, verbose=False):
+        super().__init__((host, port), _SMTPSinkHandler)
+        self.messages = []
+        self.verbose = verbose
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "smtp-sink":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 1025
+        print(f"📨 SMTP stand-in listening on 127.0.0.1:{port} (Ctrl+C to stop)")
+        LocalSMTPServer(port=port, verbose=True).serve_forever()
+    else:
+        print(NotificationQueue(os.environ.get("NOTIFICATION_DB", "notifications.db")).counts())
@@ -0,0 +1,97 @@
+# page_cache.py
+"""
+Rendered-output caching on top of the repository cache.
+
+  * Fragment cache: each cat card is rendered once per (cat_id, row version)
+    and the HTML reused by every page that shows the cat. Templates call
+    `{{ cat_card(cat) }}`. The version is the row's `version` column when
+    present, otherwise a hash of the card's fields, so an edited cat gets a
+    new key and stale cards simply age out of the LRU.
+  * Page cache: `@cache_page()` stores whole GET responses for anonymous
+    visitors and answers conditional requests (If-None-Match /
+    If-Modified-Since) with 304 Not Modified. Cached pages are dropped
+    whenever the "cats" namespace is invalidated.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Response, make_response, render_template, request, session
+from markupsafe import Markup
+from cache import repository_cache
+
+CARD_TEMPLATE = "_cat_card.html"
+
+
+# ==========================================
+# FRAGMENTS
+# ==========================================
+def fragment_version(cat):
+    """The row version if the row carries one, otherwise a hash of its contents."""
+    if cat.get("version") is not None:
+        return cat["version"]
+    return hashlib.blake2b(repr(sorted(cat.items())).encode(), digest_size=8).hexdigest()
+
+
+def cat_card(cat):
+    """Renders (or reuses) the HTML card for one cat."""
+    html = repository_cache.get_or_load(
+        "fragments", ("cat_card", cat.get("id"), fragment_version(cat)),
+        lambda: render_template(CARD_TEMPLATE, cat=cat))
+    return Markup(html)
+
+
+# ==========================================
+# WHOLE PAGES
+# ==========================================
+def _is_anonymous():
+    return not session.get("logged_in")
+
+
+def cache_page(ttl=None):
+    """
+    Caches a view's 200 responses for anonymous GET/HEAD requests, keyed by
+    path and query string. Logged-in users always get a fresh render, since
+    their pages include per-user navigation.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD") or not _is_anonymous():
+                return view(*args, **kwargs)
+
+            uncacheable = []
+
+            def render():
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    uncacheable.append(response)  # redirects, errors, streams: hand back as-is
+                    return None
+                body = response.get_data()
+                return {
+                    "body": body,
+                    "mimetype": response.mimetype,
+                    "etag": hashlib.blake2b(body, digest_size=16).hexdigest(),
+                    "last_modified": datetime.now(timezone.utc).replace(microsecond=0),
+                }
+
+            key = (request.endpoint, request.full_path)
+            entry = repository_cache.get_or_load("pages", key, render, ttl=ttl)
+            if entry is None:
+                return uncacheable[0]
+
+            response = Response(entry["body"], mimetype=entry["mimetype"])
+            response.set_etag(entry["etag"])
+            response.last_modified = entry["last_modified"]
+            # Browsers and proxies may keep a copy but must revalidate it (cheap: usually a 304)
+            response.cache_control.public = True
+            response.cache_control.no_cache = True
+            response.vary.add("Cookie")
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Exposes `cat_card()` to templates and ties cached pages to the cat data."""
+    app.jinja_env.globals["cat_card"] = cat_card
+    repository_cache.on_invalidate("cats", lambda namespace: repository_cache.invalidate("pages"))
@@ -0,0 +1,192 @@
+# query_layer.py
+"""
+Dialect-aware SQL execution with prepared-statement caching.
+
+SQL in this project is written once, in psycopg2's format style (`%s`
+placeholders, `%%` for a literal percent sign). DatabaseConnection wraps
+every pooled connection in a DialectConnection, which renders that SQL for
+the backend in use: unchanged on PostgreSQL, `?` placeholders on SQLite.
+So the same repository code runs on both.
+
+Hot, fixed queries are registered by name with register() and executed with
+execute()/run():
+  * PostgreSQL: once a statement has run PREPARE_THRESHOLD times on a
+    pooled connection it is PREPAREd there (parsed and planned once), and
+    later calls send only `EXECUTE name (params)`.
+  * SQLite: each name always renders to the same SQL text, so sqlite3's
+    per-connection statement cache (SQLITE_STATEMENT_CACHE entries) reuses
+    the compiled statement.
+Queries built at runtime (IN lists, optional filters) just call
+cursor.execute() and still get the placeholder translation.
+
+Set DB_PREPARED_STATEMENTS=0 behind a transaction-pooling proxy (e.g.
+PgBouncer in transaction mode), where server-side statements don't survive
+between transactions.
+"""
+import os
+import re
+from functools import lru_cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PREPARED_STATEMENTS = os.environ.get("DB_PREPARED_STATEMENTS", "1").lower() not in ("0", "false", "no")
+PREPARE_THRESHOLD = int(os.environ.get("DB_PREPARE_THRESHOLD", 5))
+SQLITE_STATEMENT_CACHE = int(os.environ.get("SQLITE_STATEMENT_CACHE", 256))
+
+_FORMAT_PARAM = re.compile(r"%([s%])")
+_NAME = re.compile(r"[a-z][a-z0-9_.]*")
+
+
+# ==========================================
+# 1. PLACEHOLDER RENDERING
+# ==========================================
+@lru_cache(maxsize=2048)
+def to_qmark(sql):
+    """`%s` -> `?` and `%%` -> `%` (SQLite)."""
+    return _FORMAT_PARAM.sub(lambda m: "?" if m.group(1) == "s" else "%", sql)
+
+
+@lru_cache(maxsize=512)
+def to_numbered(sql):
+    """`%s` -> `$1, $2, ...` and `%%` -> `%` (the body of a PostgreSQL PREPARE)."""
+    counter = iter(range(1, 10000))
+    return _FORMAT_PARAM.sub(lambda m: f"${next(counter)}" if m.group(1) == "s" else "%", sql)
+
+
+# ==========================================
+# 2. NAMED STATEMENTS
+# ==========================================
+class Statement:
+    def __init__(self, name, sql, sqlite=None):
+        self.name = name
+        self.sql = " ".join(sql.split())  # stable text: one cache entry, readable query stats
+        self.sqlite_sql = " ".join(sqlite.split()) if sqlite else self.sql
+        self.params = self.sql.replace("%%", "").count("%s")
+        # Server-side name: letters, digits and underscores only
+        self.prepared_name = "q_" + name.replace(".", "_")
+
+    def prepare_sql(self):
+        return f"PREPARE {self.prepared_name} AS {to_numbered(self.sql)}"
+
+    def execute_sql(self):
+        if not self.params:
+            return f"EXECUTE {self.prepared_name}"
+        return f"EXECUTE {self.prepared_name} ({', '.join(['%s'] * self.params)})"
+
+
+STATEMENTS = {}
+
+
+def register(statements, sqlite=None):
+    """
+    Registers named statements: {name: sql}. `sqlite` may give SQLite-only
+    variants {name: sql} for the few queries whose SQL differs by backend.
+    """
+    sqlite = sqlite or {}
+    for name, sql in statements.items():
+        if not _NAME.fullmatch(name):
+            raise ValueError(f"Invalid statement name: {name!r}")
+        if name in STATEMENTS:
+            raise ValueError(f"Statement {name!r} is already registered")
+        STATEMENTS[name] = Statement(name, sql, sqlite.get(name))
+
+
+# ==========================================
+# 3. CONNECTION / CURSOR WRAPPERS
+# ==========================================
+class DialectCursor:
+    def __init__(self, cursor, owner):
+        self._cursor = cursor
+        self.owner = owner
+
+    def execute(self, sql, params=None):
+        if params is not None and self.owner.dialect == "sqlite":
+            sql = to_qmark(sql)
+        result = self._cursor.execute(sql) if params is None else self._cursor.execute(sql, params)
+        return self if result is self._cursor else result
+
+    def executemany(self, sql, seq_of_params):
+        if self.owner.dialect == "sqlite":
+            sql = to_qmark(sql)
+        result = self._cursor.executemany(sql, seq_of_params)
+        return self if result is self._cursor else result
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class DialectConnection:
+    """A pooled connection plus its per-connection prepared-statement state."""
+
+    def __init__(self, conn, dialect):
+        self.raw = conn
+        self.dialect = dialect
+        self.prepared = set()  # statement names PREPAREd on this connection
+        self.uses = {}         # statement name -> executions before it was prepared
+
+    def cursor(self, *args, **kwargs):
+        return DialectCursor(self.raw.cursor(*args, **kwargs), self)
+
+    def forget_prepared(self):
+        self.prepared.clear()
+        self.uses.clear()
+
+    def __enter__(self):
+        return self.raw.__enter__()
+
+    def __exit__(self, *exc):
+        return self.raw.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+def _is_missing_prepared_statement(error):
+    return getattr(error, "pgcode", None) == "26000"  # invalid_sql_statement_name
+
+
+# ==========================================
+# 4. EXECUTING NAMED STATEMENTS
+# ==========================================
+def execute(cur, name, params=()):
+    """Runs the registered statement `name` on `cur` (a pooled connection's cursor)."""
+    statement = STATEMENTS[name]
+    owner = cur.owner
+    if owner.dialect == "sqlite":
+        cur.execute(statement.sqlite_sql, params)  # rendered to `?` style by DialectCursor
+        return cur
+    if not PREPARED_STATEMENTS:
+        cur.execute(statement.sql, params)
+        return cur
+
+    if name not in owner.prepared:
+        uses = owner.uses[name] = owner.uses.get(name, 0) + 1
+        if uses < PREPARE_THRESHOLD:
+            cur.execute(statement.sql, params)
+            return cur
+        cur.execute(statement.prepare_sql())
+        owner.prepared.add(name)
+    try:
+        cur.execute(statement.execute_sql(), params)
+    except Exception as e:
+        if _is_missing_prepared_statement(e):
+            # Something (DISCARD ALL, a proxy) dropped the session's statements; re-prepare next time
+            owner.forget_prepared()
+        raise
+    return cur
+
+
+def execute_many(cur, name, seq_of_params):
+    """executemany() for a registered statement (always unprepared: one round trip per row anyway)."""
+    statement = STATEMENTS[name]
+    cur.executemany(statement.sqlite_sql if cur.owner.dialect == "sqlite" else statement.sql, seq_of_params)
+    return cur
+
+
+def run(conn, name, params=()):
+    """Opens a cursor on `conn`, runs statement `name` and returns the cursor (caller fetches and closes)."""
+    return execute(conn.cursor(), name, params)
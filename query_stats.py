@@ -0,0 +1,302 @@
+# query_stats.py
+"""
+Query instrumentation for every pooled connection.
+
+DatabaseConnection wraps each new connection in InstrumentedConnection, whose
+cursors time execute() plus the fetches that follow it, count rows, and hand
+a record to the process-wide `query_stats`:
+  * aggregated per statement (count, total/max time, rows, errors)
+  * summed per Flask request (exposed as a Server-Timing header)
+  * written to the slow-query log when slower than SLOW_QUERY_MS
+`query_stats.render_prometheus()` produces the /admin/metrics payload.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from dotenv import load_dotenv
+from flask import g, has_request_context, request
+
+load_dotenv()
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    if isinstance(sql, bytes):
+        sql = sql.decode(errors="replace")
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def params_shape(params):
+    """Describes parameters without their values, e.g. '(int, str)' or 'executemany x500'."""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(type(p).__name__ for p in params) + ")"
+
+
+class QueryRecord:
+    __slots__ = ("sql", "shape", "duration", "rows", "error")
+
+    def __init__(self, sql, shape):
+        self.sql = sql
+        self.shape = shape
+        self.duration = 0.0
+        self.rows = 0
+        self.error = False
+
+
+class QueryStats:
+    def __init__(self, slow_threshold_ms=200, slow_log_path="slow_queries.log"):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.slow_log_path = slow_log_path
+        self._lock = threading.Lock()
+        self._statements = {}  # sql -> [count, total_seconds, max_seconds, rows, errors]
+        self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._requests = [0, 0, 0.0]  # requests, queries, seconds
+        self._slow_logger = None
+
+    # --- recording ---
+    def record(self, rec):
+        with self._lock:
+            entry = self._statements.get(rec.sql)
+            if entry is None:
+                entry = self._statements[rec.sql] = [0, 0.0, 0.0, 0, 0]
+            entry[0] += 1
+            entry[1] += rec.duration
+            entry[2] = max(entry[2], rec.duration)
+            entry[3] += rec.rows
+            entry[4] += rec.error
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if rec.duration <= bound:
+                    self._buckets[i] += 1
+                    break
+            else:
+                self._buckets[-1] += 1
+
+        if has_request_context():
+            per_request = g.setdefault("_query_totals", [0, 0.0])
+            per_request[0] += 1
+            per_request[1] += rec.duration
+
+        if rec.duration >= self.slow_threshold:
+            self._log_slow(rec)
+
+    def finish_request(self):
+        """Folds the current request's totals into the aggregate. Returns (queries, seconds)."""
+        count, seconds = g.pop("_query_totals", [0, 0.0])
+        with self._lock:
+            self._requests[0] += 1
+            self._requests[1] += count
+            self._requests[2] += seconds
+        return count, seconds
+
+    def init_app(self, app):
+        """Adds a Server-Timing header to every response and aggregates per-request totals."""
+        @app.after_request
+        def add_server_timing(response):
+            count, seconds = g.get("_query_totals", [0, 0.0])
+            response.headers["Server-Timing"] = f'db;dur={seconds * 1000:.2f};desc="{count} queries"'
+            return response
+
+        @app.teardown_request
+        def fold_request_totals(exc=None):
+            self.finish_request()
+
+    def _log_slow(self, rec):
+        if self._slow_logger is None:
+            logger = logging.getLogger("whiskers.slow_queries")
+            if not logger.handlers:
+                handler = logging.FileHandler(self.slow_log_path)
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                logger.addHandler(handler)
+                logger.setLevel(logging.WARNING)
+                logger.propagate = False
+            self._slow_logger = logger
+        path = request.path if has_request_context() else "-"
+        self._slow_logger.warning(
+            f"{rec.duration * 1000:.1f}ms rows={rec.rows} params={rec.shape} path={path} "
+            f"{'ERROR ' if rec.error else ''}sql={rec.sql[:2000]}")
+
+    # --- reporting ---
+    def snapshot(self):
+        with self._lock:
+            return {sql: list(values) for sql, values in self._statements.items()}
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+            self._requests = [0, 0, 0.0]
+
+    def render_prometheus(self, extra_lines=()):
+        def label(value):
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")[:300]
+
+        with self._lock:
+            statements = sorted(self._statements.items())
+            buckets = list(self._buckets)
+            requests, request_queries, request_seconds = self._requests
+
+        lines = [
+            "# HELP whiskers_db_statement_calls_total Executions per SQL statement.",
+            "# TYPE whiskers_db_statement_calls_total counter",
+        ]
+        lines += [f'whiskers_db_statement_calls_total{{query="{label(sql)}"}} {v[0]}' for sql, v in statements]
+        lines += ["# HELP whiskers_db_statement_seconds_total Time spent per SQL statement (execute + fetch).",
+                  "# TYPE whiskers_db_statement_seconds_total counter"]
+        lines += [f'whiskers_db_statement_seconds_total{{query="{label(sql)}"}} {v[1]:.6f}' for sql, v in statements]
+        lines += ["# HELP whiskers_db_statement_max_seconds Slowest execution seen per SQL statement.",
+                  "# TYPE whiskers_db_statement_max_seconds gauge"]
+        lines += [f'whiskers_db_statement_max_seconds{{query="{label(sql)}"}} {v[2]:.6f}' for sql, v in statements]
+        lines += ["# HELP whiskers_db_statement_rows_total Rows returned or affected per SQL statement.",
+                  "# TYPE whiskers_db_statement_rows_total counter"]
+        lines += [f'whiskers_db_statement_rows_total{{query="{label(sql)}"}} {v[3]}' for sql, v in statements]
+        lines += ["# HELP whiskers_db_statement_errors_total Failed executions per SQL statement.",
+                  "# TYPE whiskers_db_statement_errors_total counter"]
+        lines += [f'whiskers_db_statement_errors_total{{query="{label(sql)}"}} {v[4]}' for sql, v in statements]
+
+        lines += ["# HELP whiskers_db_query_duration_seconds Latency of all queries.",
+                  "# TYPE whiskers_db_query_duration_seconds histogram"]
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, buckets):
+            cumulative += count
+            lines.append(f'whiskers_db_query_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += buckets[-1]
+        lines.append(f'whiskers_db_query_duration_seconds_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"whiskers_db_query_duration_seconds_count {cumulative}")
+        lines.append(f"whiskers_db_query_duration_seconds_sum {sum(v[1] for _, v in statements):.6f}")
+
+        lines += ["# HELP whiskers_http_requests_total Requests that finished (with or without queries).",
+                  "# TYPE whiskers_http_requests_total counter",
+                  f"whiskers_http_requests_total {requests}",
+                  "# HELP whiskers_http_request_queries_total Queries issued by requests.",
+                  "# TYPE whiskers_http_request_queries_total counter",
+                  f"whiskers_http_request_queries_total {request_queries}",
+                  "# HELP whiskers_http_request_query_seconds_total Database time spent by requests.",
+                  "# TYPE whiskers_http_request_query_seconds_total counter",
+                  f"whiskers_http_request_query_seconds_total {request_seconds:.6f}"]
+        lines += list(extra_lines)
+        return "\n".join(lines) + "\n"
+
+
+# ==========================================
+# CONNECTION / CURSOR WRAPPERS
+# ==========================================
+class InstrumentedCursor:
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._record = None
+
+    def _finish(self):
+        if self._record is not None:
+            self._stats.record(self._record)
+            self._record = None
+
+    def _run(self, method, sql, params, shape):
+        self._finish()
+        rec = self._record = QueryRecord(normalize_sql(sql), shape)
+        started = time.perf_counter()
+        try:
+            result = method(sql) if params is None else method(sql, params)
+        except Exception:
+            rec.error = True
+            raise
+        finally:
+            rec.duration += time.perf_counter() - started
+            if rec.error:
+                self._finish()
+        if self._cursor.rowcount is not None and self._cursor.rowcount > 0:
+            rec.rows = self._cursor.rowcount
+        # sqlite3's execute() returns the cursor; hand back ourselves instead
+        return self if result is self._cursor else result
+
+    def execute(self, sql, params=None):
+        return self._run(self._cursor.execute, sql, params, params_shape(params))
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        return self._run(self._cursor.executemany, sql, seq_of_params, f"executemany x{len(seq_of_params)}")
+
+    def _timed_fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._record is not None:
+                self._record.duration += time.perf_counter() - started
+
+    def fetchone(self):
+        row = self._timed_fetch(self._cursor.fetchone)
+        if row is not None and self._record is not None and self._cursor.rowcount in (None, -1):
+            self._record.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed_fetch(self._cursor.fetchmany, *args)
+        if self._record is not None and self._cursor.rowcount in (None, -1):
+            self._record.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(self._cursor.fetchall)
+        if self._record is not None and self._cursor.rowcount in (None, -1):
+            self._record.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Delegates everything to the real connection; only cursors are wrapped."""
+
+    def __init__(self, conn, stats):
+        self.raw = conn
+        self._stats = stats
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.raw.cursor(*args, **kwargs), self._stats)
+
+    def __enter__(self):
+        return self.raw.__enter__()
+
+    def __exit__(self, *exc):
+        return self.raw.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+query_stats = QueryStats(
+    slow_threshold_ms=float(os.environ.get("SLOW_QUERY_MS", 200)),
+    slow_log_path=os.environ.get("SLOW_QUERY_LOG", "slow_queries.log"),
+)
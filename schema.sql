@@ -1,3 +1,11 @@
+-- ==========================================
+-- Reference copy of the full PostgreSQL schema after every migration.
+-- The migration files in migrations/<dialect>/ are the source of truth
+-- (SQLite differs, e.g. full-text search uses an FTS5 table); create or
+-- upgrade a database with `python init_db.py` / `python migrate.py`.
+-- Keep this file in sync whenever a migration is added.
+-- ==========================================
+
 -- 1. Users Table
 CREATE TABLE users (
     user_id SERIAL PRIMARY KEY, -- Changed from INTEGER AUTOINCREMENT
@@ -41,6 +49,13 @@ CREATE TABLE cats (
     bio TEXT,
     vaccination_status VARCHAR(50) DEFAULT 'Not Vaccinated',
     application_status VARCHAR(50) DEFAULT 'Available',
+    version INTEGER NOT NULL DEFAULT 1, -- added by migration 0007
+    -- added by migration 0004: weighted full-text search over name, breed and bio
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(breed, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(bio, '')), 'C')
+    ) STORED,
     FOREIGN KEY (foster_id) REFERENCES foster_users(foster_id) ON DELETE CASCADE
 );
 
@@ -49,6 +64,9 @@ CREATE TABLE cat_photos (
     photo_id SERIAL PRIMARY KEY,
     cat_id INTEGER NOT NULL,
     photo_url VARCHAR(255) NOT NULL,
+    is_primary BOOLEAN NOT NULL DEFAULT FALSE, -- added by migration 0005
+    thumb_card_url VARCHAR(255), -- added by migration 0005
+    thumb_small_url VARCHAR(255), -- added by migration 0005
     FOREIGN KEY (cat_id) REFERENCES cats(cat_id) ON DELETE CASCADE
 );
 
@@ -61,6 +79,34 @@ CREATE TABLE adoption_applications (
     submission_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- Changed from DATETIME
     questionnaire_responses TEXT,
     application_status VARCHAR(20) DEFAULT 'Pending',
+    rejection_reason TEXT, -- added by migration 0003
+    decided_at TIMESTAMP, -- added by migration 0006
+    version INTEGER NOT NULL DEFAULT 1, -- added by migration 0007
+    idempotency_key VARCHAR(64), -- added by migration 0008
     FOREIGN KEY (adopter_id) REFERENCES adopters(adopter_id) ON DELETE CASCADE,
     FOREIGN KEY (cat_id) REFERENCES cats(cat_id) ON DELETE CASCADE
-);
\ No newline at end of file
+);
+
+-- 8. Dashboard Counters (added by migration 0006, see dashboard_stats.py)
+CREATE TABLE dashboard_stats (
+    stat_key VARCHAR(64) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+-- ==========================================
+-- Indexes (migrations 0002, 0004, 0005 and 0008)
+-- ==========================================
+CREATE INDEX idx_cats_available ON cats (cat_id) WHERE application_status <> 'Adopted';
+CREATE INDEX idx_cats_status ON cats (application_status, cat_id);
+CREATE INDEX idx_cats_breed_lower ON cats (LOWER(breed));
+CREATE INDEX idx_applications_status ON adoption_applications (application_status);
+CREATE INDEX idx_applications_cat_id ON adoption_applications (cat_id);
+CREATE INDEX idx_applications_adopter_id ON adoption_applications (adopter_id);
+CREATE INDEX idx_adopters_user_id ON adopters (user_id);
+CREATE INDEX idx_users_user_type ON users (user_type);
+CREATE INDEX idx_foster_users_user_id ON foster_users (user_id);
+CREATE INDEX idx_admin_user_id ON admin (user_id);
+CREATE INDEX idx_cat_photos_cat_id ON cat_photos (cat_id);
+CREATE INDEX idx_cats_search ON cats USING GIN (search_vector);
+CREATE UNIQUE INDEX idx_cat_photos_primary ON cat_photos (cat_id) WHERE is_primary;
+CREATE UNIQUE INDEX idx_applications_idempotency ON adoption_applications (adopter_id, idempotency_key);
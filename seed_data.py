@@ -4,11 +4,14 @@
 # 1. IMPORTS
 # ==========================================
 import os
+from collections import Counter
 import psycopg2 # Used for the Render connection (if needed)
 import sqlite3 # Used for the local connection (if needed)
 from dotenv import load_dotenv
 from design_patterns import CatBuilder 
 from design_patterns import DatabaseConnection # <-- ⭐️ Import the Singleton Class
+from architectural_patterns import CatRepository
+import dashboard_stats
 from werkzeug.security import generate_password_hash 
 
 # Load environment variables
@@ -42,7 +45,7 @@ def seed_data(conn):
     try:
         cur = conn.cursor()
 
-        print(f"Connected to DB ({conn.info.host if isinstance(conn, psycopg2.extensions.connection) else 'SQLite'}). Starting data insertion...")
+        print(f"Connected to DB ({conn.info.host if DatabaseConnection().dialect == 'postgresql' else 'SQLite'}). Starting data insertion...")
 
         # --- A. INSERT FOSTER USER ---
         # 1. Insert into users table
@@ -85,8 +88,14 @@ def seed_data(conn):
                 cat.status          
             ))
             inserted_count += 1
+
+        # Dashboard counters, committed together with the new rows
+        new_cats = Counter(f"cats:{cat.status}" for cat in cats_data)
+        dashboard_stats.bump(cur, {**new_cats, f"users:{FOSTER_USER_DATA['user_type']}": 1})
             
         conn.commit()
+        # New cats must show up in the gallery right away
+        CatRepository.invalidate_cache()
         print(f"   ✅ Successfully inserted {inserted_count} sample cats.")
 
     except Exception as e:
@@ -109,4 +118,7 @@ if __name__ == "__main__":
     # 2. Execute the seeding function
     seed_data(conn)
 
+    # 3. Hand the connection back to the pool
+    db_conn_instance.release_connection()
+
     print("\nSeeding script finished.")
\ No newline at end of file
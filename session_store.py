@@ -0,0 +1,222 @@
+# session_store.py
+"""
+Server-side sessions.
+
+The cookie carries only a random session id. The session data (user_id,
+role, ...) lives in a SessionBackend:
+  * SQLiteSessionBackend - a local SQLite file (default, shared by every
+    gunicorn worker on the machine)
+  * MemorySessionBackend - per process, for tests and single-process runs
+SESSION_BACKEND picks one; other stores (Redis, the main database) only need
+the same six methods.
+
+Because the server owns the data, `role` in the session can be trusted
+without a database lookup, and `revoke_user_sessions(user_id)` logs a user
+out everywhere at once. Sessions that were read but not changed are never
+written back, so a plain page view costs one indexed read of the session
+file and no write.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from flask import current_app, g, session
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from architectural_patterns import UserRepository
+
+load_dotenv()
+
+SESSION_LIFETIME = timedelta(days=int(os.environ.get("SESSION_LIFETIME_DAYS", 7)))
+
+
+# ==========================================
+# 1. BACKENDS
+# ==========================================
+class MemorySessionBackend:
+    def __init__(self):
+        self._sessions = {}  # sid -> (data, user_id, expires_at)
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None or entry[2] < time.time():
+                self._sessions.pop(sid, None)
+                return None
+            return dict(entry[0])
+
+    def create(self, sid, data, user_id, expires_at):
+        with self._lock:
+            self._sessions[sid] = (dict(data), user_id, expires_at)
+
+    def update(self, sid, data, user_id, expires_at):
+        with self._lock:
+            if sid not in self._sessions:
+                return False
+            self._sessions[sid] = (dict(data), user_id, expires_at)
+            return True
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def delete_for_user(self, user_id):
+        with self._lock:
+            sids = [sid for sid, entry in self._sessions.items() if entry[1] == user_id]
+            for sid in sids:
+                del self._sessions[sid]
+            return len(sids)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, entry in self._sessions.items() if entry[2] < now]
+            for sid in expired:
+                del self._sessions[sid]
+            return len(expired)
+
+
+class SQLiteSessionBackend:
+    def __init__(self, path="sessions.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # lets several gunicorn workers share the file
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                user_id INTEGER,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id)")
+
+    def load(self, sid):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE sid = ? AND expires_at >= ?", (sid, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def create(self, sid, data, user_id, expires_at):
+        with self._lock:
+            self._conn.execute("INSERT INTO sessions (sid, data, user_id, expires_at) VALUES (?, ?, ?, ?)",
+                               (sid, json.dumps(data), user_id, expires_at))
+
+    def update(self, sid, data, user_id, expires_at):
+        """Returns False if the session no longer exists (revoked or expired meanwhile)."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE sessions SET data = ?, user_id = ?, expires_at = ? WHERE sid = ?",
+                (json.dumps(data), user_id, expires_at, sid)).rowcount > 0
+
+    def delete(self, sid):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def delete_for_user(self, user_id):
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,)).rowcount
+
+    def purge_expired(self):
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),)).rowcount
+
+
+def build_session_backend_from_env():
+    if os.environ.get("SESSION_BACKEND", "sqlite").lower() == "memory":
+        return MemorySessionBackend()
+    return SQLiteSessionBackend(os.environ.get("SESSION_DB", "sessions.db"))
+
+
+# ==========================================
+# 2. FLASK INTEGRATION
+# ==========================================
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.previous_sid = None
+
+    def regenerate(self):
+        """Gives the session a fresh id (call on login so a planted id can't be reused)."""
+        if not self.new:
+            self.previous_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.new = True
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.backend.load(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.previous_sid:
+            self.backend.delete(session.previous_sid)
+            session.previous_sid = None
+
+        if not session:
+            if session.modified and not session.new:
+                # session.clear() on logout: drop the stored row and the cookie
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not session.modified:
+            return  # nothing changed; skip the write
+
+        expires = datetime.now(timezone.utc) + SESSION_LIFETIME
+        if session.new:
+            self.backend.create(session.sid, dict(session), session.get("user_id"), expires.timestamp())
+        elif not self.backend.update(session.sid, dict(session), session.get("user_id"), expires.timestamp()):
+            # Revoked while this request ran: don't bring it back
+            response.delete_cookie(name, domain=domain, path=path)
+            return
+        response.set_cookie(
+            name, session.sid, expires=expires, httponly=self.get_cookie_httponly(app),
+            domain=domain, path=path, secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app))
+
+
+def revoke_user_sessions(user_id):
+    """Logs `user_id` out of every browser. Returns how many sessions were removed."""
+    return current_app.session_interface.backend.delete_for_user(user_id)
+
+
+def current_user():
+    """
+    The logged-in user's profile dict, or None. Served from the per-worker
+    profile LRU, so it normally costs no database round trip.
+    """
+    if "current_user" not in g:
+        user_id = session.get("user_id")
+        g.current_user = UserRepository().get_profile(user_id) if user_id else None
+    return g.current_user
+
+
+def init_app(app, backend=None):
+    app.session_interface = ServerSideSessionInterface(backend or build_session_backend_from_env())
+    app.config.setdefault("SESSION_COOKIE_SAMESITE", "Lax")
+    app.session_interface.backend.purge_expired()
+    app.jinja_env.globals["current_user"] = current_user
@@ -0,0 +1,669 @@
+# soak_test.py
+"""
+Concurrency soak test against a real multi-worker server.
+
+Seeds a throwaway database with generate_data.py, starts
+`gunicorn "app:create_app()"` with N workers x T threads, and lets many
+virtual users hammer it at once with a configurable mix of:
+  * gallery   - anonymous gallery pages (random keyset cursor, some filtered)
+  * search    - anonymous full-text searches
+  * register  - new accounts (password hashing + a user insert)
+  * login     - logging in to accounts registered during the run
+  * apply     - adopters submitting applications (POST /applications) for
+                a few popular cats, sometimes retrying with the same
+                Idempotency-Key, to exercise the coalescing batch writer
+  * decide    - admins listing pending applications and approving/declining
+                them via /admin/process/<id>, all racing for the same few
+                applications (--hot-applications) to expose lock contention
+
+While it runs it prints one line per --interval: throughput, error rate,
+p50/p95/p99 latency and time spent waiting for a pooled DB connection.
+At the end it reports per-route latency (and how much of it was database
+time, from Server-Timing), then the lock-wait/serialization hotspots read
+from /admin/metrics: pool waits and timeouts, and the SQL statements with
+the most total time or the worst max-vs-mean spread. With several
+--clients stages it also shows where throughput stops scaling.
+
+Examples:
+    python soak_test.py --workers 4 --threads 4 --clients 8,16,32 --duration 30
+    python soak_test.py --mix gallery=50,search=10,register=5,login=20,decide=15 --hot-applications 3
+    python soak_test.py --mix gallery=40,apply=60 --hot-cats 3   # a viral kitten post
+    python soak_test.py --postgres-url postgresql://localhost/whiskers_soak --workers 8
+    python soak_test.py --url http://127.0.0.1:8000 --metrics-token secret   # an already running server
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from benchmark import percentile, _git_commit
+from generate_data import BASE_COUNTS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIX = "gallery=50,search=15,register=5,login=15,apply=5,decide=10"
+SCENARIOS = ("gallery", "search", "register", "login", "apply", "decide")
+SEARCH_WORDS = ["calico", "kitten", "tabby", "shy", "playful", "persian", "luna", "string", "lap", "bengal"]
+ADMIN_LOGIN = {"username": "Admin", "password": "67890"}  # the built-in admin account
+_PENDING_LINK = re.compile(rb'name="app_ids" value="(\d+)"')
+_CAT_CARD = re.compile(rb'data-cat-id="(\d+)"')
+_DB_TIMING = re.compile(r"db;dur=([\d.]+)")
+_METRIC_LINE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+# ==========================================
+# HTTP CLIENT (keep-alive + cookies, no redirects)
+# ==========================================
+class Client:
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self._conn = None
+
+    def request(self, method, path, form=None):
+        """Returns (status, headers, body). Raises OSError/HTTPException on transport failures."""
+        body = urlencode(form, doseq=True) if form is not None else None
+        headers = {"Accept": "text/html"}
+        if body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+
+        for attempt in (1, 2):
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request(method, path, body, headers)
+                response = self._conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt == 2 or not reused:
+                    raise  # only a stale keep-alive connection is worth one retry
+        for header in response.headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                if morsel.value and morsel["max-age"] != "0":
+                    self.cookies[name] = morsel.value
+                else:
+                    self.cookies.pop(name, None)
+        if response.will_close:
+            self.close()
+        return response.status, response.headers, data
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# ==========================================
+# RESULTS
+# ==========================================
+def classify(status):
+    if status is None or (status >= 500 and status != 503):
+        return "error"
+    if status in (429, 503):
+        return "throttled"  # the app shedding load on purpose (login throttle, busy hasher, pool 503)
+    if status == 409:
+        return "conflict"
+    if status >= 400:
+        return "client"
+    return "ok"
+
+
+class Recorder:
+    """Thread-safe log of finished requests: (finished_at, label, seconds, outcome, db_ms)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def add(self, label, seconds, status, headers):
+        db_ms = None
+        if headers is not None:
+            match = _DB_TIMING.search(headers.get("Server-Timing", ""))
+            db_ms = float(match.group(1)) if match else None
+        with self._lock:
+            self.samples.append((time.monotonic(), label, seconds, classify(status), db_ms))
+
+    def since(self, started):
+        with self._lock:
+            return [s for s in self.samples if s[0] >= started]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(s[2] for s in samples)
+    outcomes = defaultdict(int)
+    for s in samples:
+        outcomes[s[3]] += 1
+    db = [s[4] for s in samples if s[4] is not None]
+    mean = sum(latencies) / len(latencies) if latencies else 0.0
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "ok": outcomes["ok"], "client": outcomes["client"], "conflict": outcomes["conflict"],
+        "throttled": outcomes["throttled"], "errors": outcomes["error"],
+        "error_rate": round(outcomes["error"] / len(samples) * 100, 2) if samples else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        "mean_ms": round(mean * 1000, 1),
+        # Share of the latency spent in SQL; the rest is Python, hashing, templating or queueing
+        "db_share": round(sum(db) / (mean * 1000 * len(db)) * 100, 1) if db and mean else None,
+    }
+
+
+# ==========================================
+# /admin/metrics (one scrape reaches one worker)
+# ==========================================
+def parse_metrics(text):
+    """Prometheus text -> {(name, labels): value}."""
+    values = {}
+    for line in text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match:
+            values[(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return values
+
+
+class MetricsSampler:
+    """
+    Keeps the latest /admin/metrics snapshot of every worker it has reached.
+    Scrapes go through the server's load balancing, so each round makes
+    several of them to reach every worker.
+    """
+    def __init__(self, base_url, token, workers):
+        self.base_url = base_url
+        self.token = token
+        self.scrapes_per_round = max(1, workers * 3)
+        self.latest = {}   # pid -> metrics
+        self.baseline = {}  # pid -> metrics at the start of the measured run
+        self.failures = 0
+
+    def scrape(self):
+        parts = urlsplit(self.base_url)
+        for _ in range(self.scrapes_per_round):
+            try:
+                # A fresh connection each time, so the server can hand it to any worker
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+                conn.request("GET", "/admin/metrics", headers={"Authorization": f"Bearer {self.token}"})
+                response = conn.getresponse()
+                text = response.read().decode()
+                conn.close()
+            except (OSError, http.client.HTTPException):
+                self.failures += 1
+                continue
+            if response.status != 200:
+                self.failures += 1
+                continue
+            metrics = parse_metrics(text)
+            pid = metrics.get(("whiskers_worker_pid", ""))
+            if pid is not None:
+                self.latest[int(pid)] = metrics
+
+    def mark_baseline(self):
+        self.scrape()
+        self.baseline = dict(self.latest)
+
+    def total(self, name, labels=""):
+        """Sum over workers of (latest - baseline) for a counter."""
+        return sum(m.get((name, labels), 0.0) - self.baseline.get(pid, {}).get((name, labels), 0.0)
+                   for pid, m in self.latest.items())
+
+    def maximum(self, name, labels=""):
+        return max((m.get((name, labels), 0.0) for m in self.latest.values()), default=0.0)
+
+    def statements(self):
+        """Per-statement deltas summed over workers: {sql: {calls, seconds, max, errors}}."""
+        totals = defaultdict(lambda: {"calls": 0.0, "seconds": 0.0, "max": 0.0, "errors": 0.0})
+        fields = {"whiskers_db_statement_calls_total": "calls",
+                  "whiskers_db_statement_seconds_total": "seconds",
+                  "whiskers_db_statement_errors_total": "errors"}
+        for pid, metrics in self.latest.items():
+            before = self.baseline.get(pid, {})
+            for (name, labels), value in metrics.items():
+                if not labels.startswith('query="'):
+                    continue
+                sql = labels[len('query="'):-1]
+                if name in fields:
+                    totals[sql][fields[name]] += value - before.get((name, labels), 0.0)
+                elif name == "whiskers_db_statement_max_seconds":
+                    totals[sql]["max"] = max(totals[sql]["max"], value)
+        return {sql: t for sql, t in totals.items() if t["calls"] > 0}
+
+
+# ==========================================
+# VIRTUAL USERS
+# ==========================================
+class Shared:
+    """State the virtual users share: accounts registered so far and pending applications."""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.lock = threading.Lock()
+        self.accounts = []
+        self.pending = []
+        self.hot_cats = []
+        self.pending_checked = 0.0
+        self._counter = 0
+
+    def next_username(self):
+        with self.lock:
+            self._counter += 1
+            return f"soak_{self.run_id}_{self._counter}"
+
+
+class VirtualUser:
+    def __init__(self, number, args, shared, recorder):
+        self.number = number
+        self.args = args
+        self.shared = shared
+        self.recorder = recorder
+        self.visitor = Client(args.url)
+        self.admin = None  # logged in on first decision
+        self.adopter = None  # registered and logged in on first application
+        self.random = random.Random(args.seed * 1000 + number)
+
+    def call(self, client, label, method, path, form=None):
+        started = time.perf_counter()
+        status, headers, body = None, None, b""
+        try:
+            status, headers, body = client.request(method, path, form)
+        except (OSError, http.client.HTTPException):
+            client.close()
+        self.recorder.add(label, time.perf_counter() - started, status, headers)
+        return status, body
+
+    # --- scenarios ---
+    def gallery(self):
+        after = self.random.randint(0, self.args.cat_ids)
+        path = f"/gallery?after={after}"
+        if self.random.random() < 0.3:
+            path += f"&min_age={self.random.randint(0, 3)}&max_age={self.random.randint(4, 12)}"
+        self.call(self.visitor, "GET /gallery", "GET", path)
+
+    def search(self):
+        words = self.random.sample(SEARCH_WORDS, self.random.randint(1, 2))
+        self.call(self.visitor, "GET /search", "GET", "/search?" + urlencode({"q": " ".join(words)}))
+
+    def register(self):
+        username = self.shared.next_username()
+        status, _ = self.call(self.visitor, "POST /register", "POST", "/register", {
+            "role": "adopter", "full_name": f"Soak User {username}", "username": username,
+            "email": f"{username}@soak.example.com", "password": "soak-password", "confirm_password": "soak-password",
+        })
+        if status != 302:
+            return None
+        with self.shared.lock:
+            self.shared.accounts.append(username)
+        return username
+
+    def login(self):
+        with self.shared.lock:
+            username = self.random.choice(self.shared.accounts) if self.shared.accounts else None
+        if username is None:
+            self.register()
+            return
+        status, _ = self.call(self.visitor, "POST /login", "POST", "/login",
+                              {"username": username, "password": "soak-password"})
+        if status == 302:
+            self.call(self.visitor, "GET / (logged in)", "GET", "/")
+            self.call(self.visitor, "GET /logout", "GET", "/logout")
+
+    def apply(self):
+        if self.adopter is None:
+            username = self.register()
+            if username is None:
+                return
+            client = Client(self.args.url)
+            status, _ = self.call(client, "POST /login (adopter)", "POST", "/login",
+                                  {"username": username, "password": "soak-password"})
+            if status != 302:
+                client.close()
+                return
+            self.adopter = client
+        with self.shared.lock:
+            hot = self.shared.hot_cats
+        if not hot:
+            # The first cats in the gallery: still available, and everyone wants them
+            status, body = self.call(self.visitor, "GET /gallery", "GET", "/gallery")
+            hot = [int(i) for i in _CAT_CARD.findall(body)][:self.args.hot_cats]
+            if not hot:
+                return
+            with self.shared.lock:
+                self.shared.hot_cats = hot
+        form = {"cat_id": self.random.choice(hot),
+                "home_type": self.random.choice(["apartment", "house with garden", "shared flat", "townhouse"]),
+                "other_pets": self.random.randint(0, 3), "hours_alone_per_day": self.random.randint(0, 10),
+                "idempotency_key": secrets.token_hex(8)}
+        self.call(self.adopter, "POST /applications", "POST", "/applications", form)
+        if self.random.random() < 0.1:
+            # A client that never saw the response and retries: must not file a second application
+            self.call(self.adopter, "POST /applications (retry)", "POST", "/applications", form)
+
+    def decide(self):
+        if self.admin is None:
+            self.admin = Client(self.args.url)
+            self.call(self.admin, "POST /login (admin)", "POST", "/login", ADMIN_LOGIN)
+        status, body = self.call(self.admin, "GET /admin/applications", "GET", "/admin/applications")
+        if status == 200:
+            with self.shared.lock:
+                self.shared.pending = [int(i) for i in _PENDING_LINK.findall(body)]
+        with self.shared.lock:
+            # Everyone picks from the same few applications, so admins really race each other
+            hot = self.shared.pending[:self.args.hot_applications]
+        if not hot:
+            return
+        app_id = self.random.choice(hot)
+        if self.random.random() < self.args.approve_ratio:
+            form = {"action": "approve"}
+        else:
+            form = {"action": "decline", "reason": "Soak test"}
+        self.call(self.admin, "POST /admin/process/<id>", "POST", f"/admin/process/{app_id}", form)
+
+    def run(self, scenarios, weights, deadline, stop):
+        while time.monotonic() < deadline and not stop.is_set():
+            getattr(self, self.random.choices(scenarios, weights)[0])()
+            if self.args.think_ms:
+                time.sleep(self.random.uniform(0, 2 * self.args.think_ms) / 1000)
+        self.visitor.close()
+        if self.admin:
+            self.admin.close()
+        if self.adopter:
+            self.adopter.close()
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario in --mix: {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ==========================================
+# SERVER (seeded database + gunicorn)
+# ==========================================
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url, process, log_path, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            status, _, _ = Client(url, timeout=2).request("GET", "/login")
+            if status == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.3)
+    with open(log_path) as log:
+        tail = log.read()[-3000:]
+    raise RuntimeError(f"Server did not come up:\n{tail}")
+
+
+def start_server(args, workdir):
+    """Seeds a database and starts gunicorn on it. Returns (process, url, metrics token, log path)."""
+    env = os.environ.copy()
+    token = secrets.token_urlsafe(16)
+    env.update({
+        "NOTIFICATION_DB": os.path.join(workdir, "notifications.db"),
+        "SESSION_DB": os.path.join(workdir, "sessions.db"),
+        "SLOW_QUERY_LOG": os.path.join(workdir, "slow_queries.log"),
+        "MEDIA_ROOT": os.path.join(workdir, "media"),
+        "METRICS_TOKEN": token,
+        # Every virtual user logs in from 127.0.0.1
+        "LOGIN_IP_BURST": str(10 ** 9), "LOGIN_IP_PER_MINUTE": str(10 ** 9),
+    })
+    env.pop("SMTP_HOST", None)  # never email real people from a soak test
+    if args.postgres_url:
+        env["DATABASE_URL"] = args.postgres_url
+    else:
+        env.pop("DATABASE_URL", None)
+        env["SQLITE_PATH"] = os.path.join(workdir, "soak.db")
+
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w") as log:
+        print(f"🌱 Seeding {'PostgreSQL' if args.postgres_url else 'SQLite'} at scale {args.scale}...")
+        seeded = subprocess.run([sys.executable, "generate_data.py", "--scale", str(args.scale),
+                                 "--seed", str(args.seed)], cwd=HERE, env=env, stdout=log, stderr=subprocess.STDOUT)
+    if seeded.returncode != 0:
+        with open(log_path) as log:
+            raise RuntimeError(f"Seeding failed:\n{log.read()[-3000:]}")
+
+    port = _free_port()
+    command = [sys.executable, "-m", "gunicorn", "app:create_app()",
+               "--bind", f"127.0.0.1:{port}", "--workers", str(args.workers), "--threads", str(args.threads),
+               "--timeout", "120", "--graceful-timeout", "5"]
+    log = open(log_path, "a")
+    process = subprocess.Popen(command, cwd=HERE, env=env, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_up(url, process, log_path)
+    except Exception:
+        stop_server(process)
+        raise
+    print(f"🚀 gunicorn up at {url}: {args.workers} worker(s) x {args.threads} thread(s) (log: {log_path})")
+    return process, url, token, log_path
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# ==========================================
+# DRIVER
+# ==========================================
+def run_stage(args, clients, duration, scenarios, weights, shared, recorder, sampler):
+    started = time.monotonic()
+    deadline = started + duration
+    stop = threading.Event()
+    users = [VirtualUser(n, args, shared, recorder) for n in range(clients)]
+    threads = [threading.Thread(target=user.run, args=(scenarios, weights, deadline, stop), daemon=True)
+               for user in users]
+    for thread in threads:
+        thread.start()
+
+    timeline = []
+    window_start = started
+    last_wait = sampler.total("whiskers_db_pool_wait_seconds_total") if sampler else 0.0
+    try:
+        while time.monotonic() < deadline:
+            time.sleep(max(0.0, min(window_start + args.interval, deadline) - time.monotonic()))
+            now = time.monotonic()
+            window = summarize(recorder.since(window_start), now - window_start)
+            line = {"t": round(now - started, 1), "clients": clients, **window}
+            if sampler:
+                sampler.scrape()
+                wait = sampler.total("whiskers_db_pool_wait_seconds_total")
+                line["pool_wait_s"] = round(wait - last_wait, 3)
+                last_wait = wait
+            timeline.append(line)
+            print(f"   [{line['t']:>6.1f}s] {clients:>4} clients {window['rps']:>8.1f} req/s  "
+                  f"err {window['error_rate']:>5.2f}%  p50 {window['p50_ms']:>7.1f}ms  p95 {window['p95_ms']:>7.1f}ms  "
+                  f"p99 {window['p99_ms']:>7.1f}ms" + (f"  pool wait {line['pool_wait_s']:.2f}s" if sampler else ""))
+            window_start = now
+    except KeyboardInterrupt:
+        stop.set()
+        raise
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    samples = recorder.since(started)
+    by_label = defaultdict(list)
+    for sample in samples:
+        by_label[sample[1]].append(sample)
+    return {
+        "clients": clients,
+        "seconds": round(elapsed, 1),
+        "overall": summarize(samples, elapsed),
+        "routes": {label: summarize(rows, elapsed) for label, rows in sorted(by_label.items())},
+        "timeline": timeline,
+    }
+
+
+def hotspots(sampler, top):
+    pool = {
+        "waits": int(sampler.total("whiskers_db_pool_waits_total")),
+        "wait_seconds": round(sampler.total("whiskers_db_pool_wait_seconds_total"), 3),
+        "max_wait_seconds": round(sampler.maximum("whiskers_db_pool_max_wait_seconds"), 3),
+        "timeouts": int(sampler.total("whiskers_db_pool_timeouts_total")),
+        "workers_seen": len(sampler.latest),
+    }
+    statements = []
+    for sql, t in sampler.statements().items():
+        mean = t["seconds"] / t["calls"]
+        statements.append({"sql": sql, "calls": int(t["calls"]), "seconds": round(t["seconds"], 3),
+                           "mean_ms": round(mean * 1000, 2), "max_ms": round(t["max"] * 1000, 1),
+                           "errors": int(t["errors"]),
+                           # A max far above the mean usually means the statement waited on a lock
+                           "spread": round(t["max"] / mean, 1) if mean else 0.0})
+    by_time = sorted(statements, key=lambda s: s["seconds"], reverse=True)[:top]
+    by_spread = sorted((s for s in statements if s["max_ms"] >= 50 and s["calls"] >= 5),
+                       key=lambda s: s["spread"], reverse=True)[:top]
+    return {"pool": pool, "by_time": by_time, "by_spread": by_spread}
+
+
+def print_report(stages, spots):
+    for stage in stages:
+        print(f"\n📊 {stage['clients']} clients, {stage['seconds']}s")
+        header = (f"{'route':<28} {'reqs':>7} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} "
+                  f"{'db%':>5} {'4xx':>5} {'409':>5} {'429/503':>7} {'err':>5}")
+        print(header)
+        print("-" * len(header))
+        for label, r in list(stage["routes"].items()) + [("ALL", stage["overall"])]:
+            db_share = f"{r['db_share']:.0f}" if r["db_share"] is not None else "-"
+            print(f"{label:<28} {r['requests']:>7} {r['rps']:>8.1f} {r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms "
+                  f"{r['p99_ms']:>7.1f}ms {r['max_ms']:>7.1f}ms {db_share:>5} {r['client']:>5} {r['conflict']:>5} "
+                  f"{r['throttled']:>7} {r['errors']:>5}")
+
+    if len(stages) > 1:
+        print("\n📈 Scaling")
+        previous = None
+        for stage in stages:
+            r = stage["overall"]
+            note = ""
+            if previous and r["rps"] < previous["rps"] * 1.1:
+                note = "  ⚠️ throughput flat: past the ceiling"
+            print(f"   {stage['clients']:>4} clients  {r['rps']:>8.1f} req/s  p99 {r['p99_ms']:>8.1f}ms  "
+                  f"err {r['error_rate']:>5.2f}%{note}")
+            previous = r
+
+    if spots:
+        pool = spots["pool"]
+        print(f"\n🔒 Connection pool ({pool['workers_seen']} worker(s) reached): {pool['waits']} waits, "
+              f"{pool['wait_seconds']}s waiting, longest {pool['max_wait_seconds']}s, {pool['timeouts']} timeouts")
+        print("\n🐢 Statements by total time")
+        for s in spots["by_time"]:
+            print(f"   {s['seconds']:>8.3f}s {s['calls']:>7}x  mean {s['mean_ms']:>7.2f}ms  max {s['max_ms']:>8.1f}ms  "
+                  f"err {s['errors']:>3}  {s['sql'][:90]}")
+        if spots["by_spread"]:
+            print("\n⏳ Likely lock waits (max far above mean)")
+            for s in spots["by_spread"]:
+                print(f"   x{s['spread']:>7.1f}  mean {s['mean_ms']:>7.2f}ms  max {s['max_ms']:>8.1f}ms  {s['sql'][:90]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test Whiskers & Wishes under concurrent load.")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="threads per worker")
+    parser.add_argument("--clients", default="8,16,32", help="comma-separated concurrent virtual users per stage")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per stage")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between progress lines")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--hot-applications", type=int, default=3,
+                        help="admins pick among this many oldest pending applications")
+    parser.add_argument("--hot-cats", type=int, default=5,
+                        help="adopters apply for the first this many cats in the gallery")
+    parser.add_argument("--approve-ratio", type=float, default=0.3, help="share of decisions that approve")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's actions")
+    parser.add_argument("--scale", type=float, default=0.5, help="generate_data.py scale for the seeded database")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--postgres-url", help="seed and use this (throwaway!) PostgreSQL database")
+    parser.add_argument("--url", help="test an already running server instead (no seeding)")
+    parser.add_argument("--metrics-token", help="METRICS_TOKEN of the server given with --url")
+    parser.add_argument("--top", type=int, default=8, help="statements to list per hotspot table")
+    parser.add_argument("--output", help="JSON results path (default soak_results/<commit>.json)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    scenarios, weights = list(mix), list(mix.values())
+    stages = [int(c) for c in args.clients.split(",")]
+    args.cat_ids = int(BASE_COUNTS["cats"] * args.scale)
+
+    with tempfile.TemporaryDirectory(prefix="whiskers_soak_") as workdir:
+        process = None
+        token = args.metrics_token
+        if not args.url:
+            process, args.url, token, _ = start_server(args, workdir)
+        try:
+            sampler = MetricsSampler(args.url, token, args.workers) if token else None
+            if sampler:
+                sampler.mark_baseline()
+            else:
+                print("ℹ️  No metrics token: pool and statement hotspots are skipped.")
+            shared = Shared(run_id=secrets.token_hex(3))
+            recorder = Recorder()
+            results = []
+            for clients in stages:
+                print(f"🔥 {clients} clients for {args.duration:g}s ({args.mix})")
+                results.append(run_stage(args, clients, args.duration, scenarios, weights, shared, recorder, sampler))
+            spots = None
+            if sampler:
+                sampler.scrape()
+                spots = hotspots(sampler, args.top)
+        finally:
+            if process:
+                stop_server(process)
+
+    print_report(results, spots)
+    output = args.output or os.path.join(HERE, "soak_results", f"{_git_commit()}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "backend": "postgresql" if args.postgres_url else ("external" if process is None else "sqlite"),
+                "workers": args.workers, "threads": args.threads, "mix": mix,
+                "hot_applications": args.hot_applications, "scale": args.scale,
+            },
+            "stages": results,
+            "hotspots": spots,
+        }, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()